@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Row Mapping Benchmark
+Compares the old dict(row) product mapping with the index-based mapper on
+real asyncpg records shaped like catalog product rows.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/bench_row_mapping.py [--rows 10000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.catalog import PRODUCT_MAPPER, Category, Product  # noqa: E402
+
+
+SYNTHETIC_ROWS = """
+    SELECT
+        g AS id,
+        'SKU' || g AS code,
+        'Produk ' || g AS name,
+        'Deskripsi produk ' || g AS description,
+        (g * 1000)::bigint AS price_cents,
+        g % 50 AS stock,
+        g % 7 AS sold_count,
+        (g % 8) + 1 AS category_id,
+        'Kategori ' || ((g % 8) + 1) AS category_name,
+        'kategori-' || ((g % 8) + 1) AS category_slug,
+        '🗂️' AS category_emoji
+    FROM generate_series(1, $1) AS g;
+"""
+
+
+def legacy_mapping(rows):
+    """The per-row dict copy used by catalog.py before the mapper."""
+    products = []
+    for row in rows:
+        data = dict(row)
+        category = None
+        if data.get("category_id"):
+            category = Category(
+                id=data["category_id"],
+                name=data["category_name"],
+                slug=data["category_slug"],
+                emoji=data["category_emoji"],
+            )
+        products.append(
+            Product(
+                id=data["id"],
+                code=data["code"],
+                name=data["name"],
+                description=data["description"],
+                price_cents=data["price_cents"],
+                stock=data["stock"],
+                sold_count=data["sold_count"],
+                category=category,
+            )
+        )
+    return products
+
+
+def measure(label, func, rows, repeat):
+    func(rows)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(rows)
+    per_call_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    tracemalloc.start()
+    result = func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    categories = len({id(product.category) for product in result})
+    print(
+        f"{label:<8} {per_call_ms:8.2f} ms/call  peak {peak / 1024:8.1f} KiB  "
+        f"{categories} Category objects"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        print("❌ DATABASE_URL belum di-set.")
+        sys.exit(1)
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await conn.fetch(SYNTHETIC_ROWS, args.rows)
+    finally:
+        await conn.close()
+
+    print(f"📊 {len(rows)} rows, {args.repeat} runs")
+    measure("dict", legacy_mapping, rows, args.repeat)
+    measure("mapper", PRODUCT_MAPPER.many, rows, args.repeat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -30,6 +30,7 @@ from src.services.users import block_user, list_users, unblock_user, get_user_by
 from src.services.voucher import add_voucher, delete_voucher, list_vouchers
 from src.services.terms import set_product_terms, clear_product_terms
 from src.services.owner_alerts import notify_owners
+from src.services.postgres import Priority, admitted_at
 from src.bot.admin.messages import AdminMessages
 
 logger = logging.getLogger(__name__)
@@ -343,6 +344,7 @@ def _format_product_line(product: Product) -> str:
     )
 
 
+@admitted_at(Priority.BACKGROUND)
 async def render_product_overview(limit: int = 10) -> str:
     products = await list_products(limit=limit)
     if not products:
@@ -351,6 +353,7 @@ async def render_product_overview(limit: int = 10) -> str:
     return "🛒 Produk Aktif:\n\n" + "\n\n".join(lines)
 
 
+@admitted_at(Priority.BACKGROUND)
 async def render_order_overview(limit: int = 10) -> str:
     orders = await list_orders(limit=limit)
     if not orders:
@@ -368,6 +371,7 @@ async def render_order_overview(limit: int = 10) -> str:
     return "📋 <b>Daftar Order Terbaru:</b>\n" + "\n".join(lines)
 
 
+@admitted_at(Priority.BACKGROUND)
 async def render_user_overview(limit: int = 10) -> str:
     users = await list_users(limit=limit)
     if not users:
@@ -381,6 +385,7 @@ async def render_user_overview(limit: int = 10) -> str:
     return "👥 User Terbaru:\n" + "\n".join(lines)
 
 
+@admitted_at(Priority.BACKGROUND)
 async def render_user_order_history(telegram_id: int) -> str:
     """Render the order history for a specific user."""
     user = await get_user_by_telegram_id(telegram_id)
@@ -415,6 +420,7 @@ async def list_categories_overview() -> str:
     return "📂 Daftar Kategori:\n" + "\n".join(lines)
 
 
+@admitted_at(Priority.BACKGROUND)
 async def render_voucher_overview(limit: int = 20) -> str:
     vouchers = await list_vouchers(limit=limit)
     if not vouchers:
@@ -7,26 +7,30 @@ import html
 import json
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Sequence, Tuple
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
 from zoneinfo import ZoneInfo
 
 from telegram import (
     CallbackQuery,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
     Message,
     ReplyKeyboardMarkup,
     ReplyKeyboardRemove,
     Update,
     User,
 )
-from telegram.constants import ParseMode
+from telegram.constants import ChatType, ParseMode
 from telegram.error import Forbidden, TelegramError
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
     CommandHandler,
     ContextTypes,
+    InlineQueryHandler,
     MessageHandler,
     ConversationHandler,
     filters,
@@ -34,6 +38,7 @@ from telegram.ext import (
 
 from src.bot.antispam import AntiSpamDecision, AntiSpamGuard
 from src.bot import keyboards, messages
+from src.bot.render_cache import RenderCache, RenderedView
 from src.core.config import get_settings
 from src.core.currency import format_rupiah, calculate_gateway_fee
 from src.core.qr import qris_to_image
@@ -66,18 +71,31 @@ from src.core.telemetry import TelemetryTracker
 from src.services.cart import Cart, CartManager
 from src.services.catalog import (
     Product,
+    ProductPage,
     add_product,
     delete_product,
     edit_product,
     get_product,
     list_categories,
     list_products,
-    list_products_by_category,
+    list_products_page,
+    search_products,
 )
 from src.services.locks import LockNotAcquired, distributed_lock
 from src.services.payment import PaymentError, PaymentService
 from src.services.pakasir import PakasirClient
+from src.services.postgres import (
+    PoolBusy,
+    Priority,
+    admitted_at,
+    get_pool,
+    priority,
+    update_session,
+)
+from src.services.queries import query_stats
+from src.services.slow_queries import list_slow_queries
 from src.services.stats import get_bot_statistics
+from src.services.telegram_sender import TelegramSender, set_telegram_sender
 from src.services.calculator import (
     load_config,
     calculate_refund,
@@ -258,21 +276,20 @@ def _build_customer_service_message(settings) -> str:
     return "\n".join(lines)
 
 
-def _build_stock_overview_message(
-    products: Sequence[Product],
-    *,
-    tz_name: str,
-) -> str:
+def _stock_overview_body(products: Sequence[Product]) -> str:
+    lines = []
+    for idx, product in enumerate(products, start=1):
+        lines.append(f"<b>— {idx}. {html.escape(product.name)} ➜ {product.stock}x</b>")
+    return "\n".join(lines) if lines else "<i>Belum ada produk.</i>"
+
+
+def _build_stock_overview_message(body: str, *, tz_name: str) -> str:
     now_utc = datetime.now(timezone.utc)
     try:
         local_dt = now_utc.astimezone(ZoneInfo(tz_name))
     except Exception:
         local_dt = now_utc
     timestamp = local_dt.strftime("%d/%m/%Y %H:%M")
-    lines = []
-    for idx, product in enumerate(products, start=1):
-        lines.append(f"<b>— {idx}. {html.escape(product.name)} ➜ {product.stock}x</b>")
-    body = "\n".join(lines) if lines else "<i>Belum ada produk.</i>"
     return (
         "📦 <b>Informasi Stok</b>\n"
         f"- Tanggal: {timestamp}\n\n"
@@ -340,9 +357,8 @@ async def _send_welcome_message(
     """Send welcome message with inline keyboard for quick actions."""
     settings = get_settings()
     stats = await get_bot_statistics()
-    products = await list_products()
-
-    context.user_data["product_list"] = products
+    page = await list_products_page(page_size=PRODUCTS_PER_PAGE)
+    _store_products(context, page.products)
 
     mention = user.first_name or "Sahabat"
     welcome_text = messages.welcome_message(
@@ -377,7 +393,9 @@ async def _send_welcome_message(
     if is_admin:
         reply_keyboard = admin_main_menu()
     else:
-        reply_keyboard = keyboards.main_reply_keyboard(range(1, min(len(products), 6)))
+        reply_keyboard = keyboards.main_reply_keyboard(
+            range(1, len(page.products) + 1)
+        )
 
     await target_message.reply_text(
         welcome_text,
@@ -475,6 +493,14 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     await _send_welcome_message(update, context, user)
 
+    # Deep link from inline search results: /start product_<id>
+    payload = context.args[0] if context.args else ""
+    if payload.startswith("product_") and payload[8:].isdigit():
+        product = await get_product(int(payload[8:]))
+        if product is not None:
+            cart = await get_cart_manager(context).get_cart(user.id)
+            await show_product_detail(update.message, context, product, cart)
+
 
 def get_cart_manager(context: ContextTypes.DEFAULT_TYPE) -> CartManager:
     """Retrieve shared CartManager instance."""
@@ -496,24 +522,84 @@ def get_anti_spam(context: ContextTypes.DEFAULT_TYPE) -> AntiSpamGuard:
     return context.application.bot_data["anti_spam"]  # type: ignore[return-value]
 
 
+def get_render_cache(context: ContextTypes.DEFAULT_TYPE) -> RenderCache:
+    """Retrieve shared rendered-view cache."""
+    return context.application.bot_data["render_cache"]  # type: ignore[return-value]
+
+
+PRODUCTS_PER_PAGE = 5
+
+
+def _store_product_ids(
+    context: ContextTypes.DEFAULT_TYPE,
+    product_ids: Sequence[int],
+    start_number: int = 1,
+) -> None:
+    # Only the ids of the products on screen, keyed by their displayed number.
+    context.user_data["product_list"] = dict(
+        enumerate(product_ids, start=start_number)
+    )
+
+
 def _store_products(
-    context: ContextTypes.DEFAULT_TYPE, products: Sequence[Product]
+    context: ContextTypes.DEFAULT_TYPE,
+    products: Sequence[Product],
+    start_number: int = 1,
 ) -> None:
-    context.user_data["product_list"] = list(products)
+    _store_product_ids(context, [product.id for product in products], start_number)
+
+
+async def _render_stock_overview(context: ContextTypes.DEFAULT_TYPE) -> str:
+    """Stock overview text; the product lines are cached per catalog version."""
+    render_cache = get_render_cache(context)
+    view = render_cache.get(("stock",))
+    if view is None:
+        # Customer view: exclude zero-stock products
+        products = await list_products(limit=10, exclude_zero_stock=True)
+        view = RenderedView(
+            text=_stock_overview_body(products),
+            keyboard=keyboards.stock_refresh_keyboard(),
+            product_ids=tuple(product.id for product in products),
+        )
+        render_cache.put(("stock",), view)
+    _store_product_ids(context, view.product_ids)
+    return _build_stock_overview_message(
+        view.text, tz_name=get_settings().bot_timezone
+    )
 
 
 async def handle_product_list(
     message: Message,
     context: ContextTypes.DEFAULT_TYPE,
-    products: Sequence[Product],
     title: str,
-    page: int = 0,
+    *,
+    category_slug: str | None = None,
+    after: int | None = None,
+    before: int | None = None,
+    page_number: int = 1,
 ) -> None:
-    """Send formatted product list to user with pagination."""
+    """Send one keyset page of the product list to the user."""
     try:
-        _store_products(context, products)
+        page_number = max(1, page_number)
+        render_cache = get_render_cache(context)
+        key = ("products", category_slug, after, before, page_number, title)
+        view = render_cache.get(key)
+        if view is not None:
+            _store_product_ids(context, view.product_ids, view.start_number)
+            await message.reply_text(
+                view.text, reply_markup=view.keyboard, parse_mode=ParseMode.HTML
+            )
+            return
 
-        if not products:
+        page = await list_products_page(
+            after=after,
+            before=before,
+            category_slug=category_slug,
+            page_size=PRODUCTS_PER_PAGE,
+            exclude_zero_stock=True,
+        )
+        if not page.products:
+            _store_products(context, [])
             await message.reply_text(
                 "📦 <b>Belum Ada Produk</b>\n\n"
                 "Saat ini belum ada produk yang tersedia.\n"
@@ -522,59 +608,29 @@ async def handle_product_list(
             )
             return
 
+        start_number = (page_number - 1) * PRODUCTS_PER_PAGE + 1
+        _store_products(context, page.products, start_number)
+
         header = messages.product_list_heading(title)
         lines = [
-            messages.product_list_line(index, product)
-            for index, product in enumerate(products, start=1)
+            messages.product_list_line(number, product)
+            for number, product in enumerate(page.products, start=start_number)
         ]
+        text = f"{header}\n" + "\n".join(lines)
+        text += f"\n\n📄 <b>Halaman {page_number}</b>"
 
-        # Pagination: 5 products per page
-        items_per_page = 5
-        total_pages = (len(products) + items_per_page - 1) // items_per_page
-        page = max(0, min(page, total_pages - 1))
-
-        start_idx = page * items_per_page
-        end_idx = start_idx + items_per_page
-        page_lines = lines[start_idx:end_idx]
-
-        text = f"{header}\n" + "\n".join(page_lines)
-        text += f"\n\n📄 <b>Halaman {page + 1}/{total_pages}</b>"
-
-        # Build pagination buttons
-        buttons = []
-        nav_row = []
-        if page > 0:
-            nav_row.append(
-                InlineKeyboardButton(
-                    "⬅️ Previous", callback_data=f"products:page:{page - 1}"
-                )
-            )
-        if page < total_pages - 1:
-            nav_row.append(
-                InlineKeyboardButton(
-                    "➡️ Next", callback_data=f"products:page:{page + 1}"
-                )
-            )
-
-        if nav_row:
-            buttons.append(nav_row)
-
-        # Add product selection buttons in horizontal layout (max 5 per row)
-        product_row = []
-        for idx, product in enumerate(products[start_idx:end_idx], start=start_idx + 1):
-            product_row.append(
-                InlineKeyboardButton(
-                    f"{idx}",
-                    callback_data=f"product:{product.id}",
-                )
-            )
-            # Add row when we have 5 buttons or it's the last product
-            if len(product_row) == 5 or idx == end_idx:
-                buttons.append(product_row)
-                product_row = []
-
-        keyboard = InlineKeyboardMarkup(buttons) if buttons else None
-
+        keyboard = keyboards.product_page_keyboard(
+            page, start_number, page_number, category_slug
+        )
+        render_cache.put(
+            key,
+            RenderedView(
+                text=text,
+                keyboard=keyboard,
+                product_ids=tuple(product.id for product in page.products),
+                start_number=start_number,
+            ),
+        )
         await message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.HTML)
     except Exception as exc:
         logger.exception("Error displaying product list: %s", exc)
@@ -586,6 +642,94 @@ async def handle_product_list(
         )
 
 
+SEARCH_RESULT_LIMIT = 10
+INLINE_RESULT_LIMIT = 20
+MIN_FALLBACK_SEARCH_LENGTH = 3
+
+
+async def _send_search_results(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    term: str,
+    *,
+    quiet: bool = False,
+) -> None:
+    """Reply with products matching ``term``."""
+    products = await search_products(term, limit=SEARCH_RESULT_LIMIT)
+    if not products:
+        if not quiet:
+            await message.reply_text(
+                f"🔍 Produk <b>{html.escape(term)}</b> tidak ditemukan.\n"
+                "Coba kata kunci lain atau buka 🛍 Semua Produk.",
+                parse_mode=ParseMode.HTML,
+            )
+        return
+    _store_products(context, products)
+    header = messages.product_list_heading(f"Hasil Cari: {html.escape(term)}")
+    lines = [
+        messages.product_list_line(number, product)
+        for number, product in enumerate(products, start=1)
+    ]
+    keyboard = keyboards.product_page_keyboard(
+        ProductPage(products=products, has_next=False, has_prev=False), 1, 1
+    )
+    await message.reply_text(
+        f"{header}\n" + "\n".join(lines),
+        reply_markup=keyboard,
+        parse_mode=ParseMode.HTML,
+    )
+
+
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /cari <kata kunci>."""
+    if update.message is None:
+        return
+    if await _check_spam(update, context):
+        return
+    term = " ".join(context.args or [])
+    if not term.strip():
+        await update.message.reply_text(
+            "🔍 Gunakan: <code>/cari nama produk</code>", parse_mode=ParseMode.HTML
+        )
+        return
+    await _send_search_results(update.message, context, term)
+
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer ``@bot <kata kunci>`` with matching products."""
+    query = update.inline_query
+    if query is None:
+        return
+    if await _check_spam(update, context):
+        await query.answer([], cache_time=0, is_personal=True)
+        return
+    products = await search_products(query.query, limit=INLINE_RESULT_LIMIT)
+    results = [
+        InlineQueryResultArticle(
+            id=str(product.id),
+            title=product.name,
+            description=f"{product.formatted_price} • Stok {product.stock}",
+            input_message_content=InputTextMessageContent(
+                messages.product_detail(product), parse_mode=ParseMode.HTML
+            ),
+            reply_markup=InlineKeyboardMarkup(
+                [
+                    [
+                        InlineKeyboardButton(
+                            "🛒 Beli di Bot",
+                            url=f"https://t.me/{context.bot.username}"
+                            f"?start=product_{product.id}",
+                        )
+                    ]
+                ]
+            ),
+        )
+        for product in products
+    ]
+    # Stock changes often enough that Telegram should not cache for long.
+    await query.answer(results, cache_time=30, is_personal=False)
+
+
 def _parse_product_index(text: str) -> int | None:
     """Convert numeric keyboard text into zero-based index."""
     sanitized = text.replace("️⃣", "")
@@ -1431,7 +1575,9 @@ async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
                         # All contents collected, create product
                         try:
-                            from src.services.product_content import add_content
+                            from src.services.product_content import (
+                                add_bulk_product_content,
+                            )
 
                             # Create product with stock = 0 first
                             product_id = await add_product(
@@ -1443,23 +1589,14 @@ async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
                                 stock=0,  # Will be updated after adding contents
                             )
 
-                            # Add all contents
-                            added_count = 0
-                            for content in product_data["contents"]:
-                                try:
-                                    await add_content(product_id, content)
-                                    added_count += 1
-                                except Exception as content_exc:
-                                    logger.warning(
-                                        "Failed to add content '%s...': %s",
-                                        content[:20],
-                                        content_exc,
-                                    )
-
-                            # Update stock based on actual added contents
-                            from src.services.product_content import recalculate_stock
-
-                            actual_stock = await recalculate_stock(product_id)
+                            # Add all contents; stock follows the inserted rows.
+                            import_result = await add_bulk_product_content(
+                                product_id, product_data["contents"]
+                            )
+                            added_count = import_result["success"]
+                            for error in import_result["errors"]:
+                                logger.warning("Failed to add content: %s", error)
+                            actual_stock = added_count
 
                             response = (
                                 f"✅ <b>Produk berhasil ditambahkan!</b>\n\n"
@@ -1597,19 +1734,18 @@ async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
                         # All contents collected, save to DB
                         from src.services.product_content import (
-                            add_content,
-                            recalculate_stock,
+                            add_bulk_product_content,
+                            get_content_count,
                         )
 
-                        added = 0
-                        for c in contents:
-                            try:
-                                await add_content(product_id, c)
-                                added += 1
-                            except Exception as exc:
-                                logger.warning("Failed to add content: %s", exc)
+                        import_result = await add_bulk_product_content(
+                            product_id, contents
+                        )
+                        added = import_result["success"]
+                        for error in import_result["errors"]:
+                            logger.warning("Failed to add content: %s", error)
 
-                        new_stock = await recalculate_stock(product_id)
+                        new_stock = await get_content_count(product_id)
                         clear_admin_state(context.user_data)
 
                         await update.message.reply_text(
@@ -1989,19 +2125,11 @@ async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
 
     if text == "🛍 Semua Produk":
-        # Customer view: exclude zero-stock products
-        products = await list_products(exclude_zero_stock=True)
-        await handle_product_list(update.message, context, products, "Semua Produk")
+        await handle_product_list(update.message, context, "Semua Produk")
         return
 
     if text == "🏷 Cek Stok":
-        # Customer view: exclude zero-stock products
-        products = await list_products(exclude_zero_stock=True)
-        _store_products(context, products)
-        settings = get_settings()
-        stock_message = _build_stock_overview_message(
-            products[:10], tz_name=settings.bot_timezone
-        )
+        stock_message = await _render_stock_overview(context)
         await update.message.reply_text(
             stock_message,
             reply_markup=keyboards.stock_refresh_keyboard(),
@@ -2168,21 +2296,28 @@ async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
     index = _parse_product_index(text)
     if index is not None:
-        products: Sequence[Product] = context.user_data.get("product_list", [])
-        if 0 <= index < len(products):
+        product_ids: Dict[int, int] = context.user_data.get("product_list") or {}
+        product_id = product_ids.get(index + 1)
+        product = await get_product(product_id) if product_id is not None else None
+        if product is not None:
             cart_manager = get_cart_manager(context)
             user_id = update.effective_user.id if update.effective_user else 0
             cart = await cart_manager.get_cart(user_id)
-            await show_product_detail(update.message, context, products[index], cart)
+            await show_product_detail(update.message, context, product, cart)
         else:
             await update.message.reply_text(
                 "❓ Produk belum tersedia, coba pilih yang lain ya."
             )
         return
 
-    # Don't send generic error for unrecognized text
-    # Only show error for actual system failures or rate limiting
-    pass
+    # Unrecognized text in a private chat is treated as a product search;
+    # stay silent when nothing matches instead of sending a generic error.
+    if (
+        update.effective_chat is not None
+        and update.effective_chat.type == ChatType.PRIVATE
+        and len(text) >= MIN_FALLBACK_SEARCH_LENGTH
+    ):
+        await _send_search_results(update.message, context, text, quiet=True)
 
 
 async def media_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -2296,12 +2431,7 @@ async def callback_router(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     if data == "stock:refresh":
-        products = await list_products()
-        _store_products(context, products)
-        settings = get_settings()
-        stock_message = _build_stock_overview_message(
-            products[:10], tz_name=settings.bot_timezone
-        )
+        stock_message = await _render_stock_overview(context)
         try:
             await query.message.edit_text(
                 stock_message,
@@ -3234,25 +3364,37 @@ async def callback_router(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if data.startswith("category:"):
         slug = data.split(":", maxsplit=1)[1]
         if slug == "all":
-            # Customer view: exclude zero-stock products
-            products = await list_products(exclude_zero_stock=True)
-            title = "Semua Produk"
+            await handle_product_list(query.message, context, "Semua Produk")
         else:
-            # Customer view: exclude zero-stock products
-            products = await list_products_by_category(slug, exclude_zero_stock=True)
-            title = f"Produk {slug}"
-        await handle_product_list(query.message, context, products, title)
+            await handle_product_list(
+                query.message, context, f"Produk {slug}", category_slug=slug
+            )
         return
 
     if data.startswith("products:page:"):
         try:
-            page = int(data.split(":", maxsplit=2)[2])
-            products = context.user_data.get("product_list", [])
-            if not products:
-                # Customer view: exclude zero-stock products
-                products = await list_products(exclude_zero_stock=True)
+            parts = data.split(":", maxsplit=5)
+            if len(parts) == 3:
+                # Keyboards sent before keyset paging only carry a page index.
+                await handle_product_list(query.message, context, "Semua Produk")
+                return
+            _, _, direction, cursor, page_number, slug = parts
+            if slug.startswith("#"):
+                # Long slugs travel as the category id (callback_data limit).
+                category_id = int(slug[1:])
+                slug = next(
+                    (c.slug for c in await list_categories() if c.id == category_id),
+                    "all",
+                )
+            category_slug = None if slug == "all" else slug
             await handle_product_list(
-                query.message, context, products, "Semua Produk", page=page
+                query.message,
+                context,
+                f"Produk {slug}" if category_slug else "Semua Produk",
+                category_slug=category_slug,
+                after=int(cursor) if direction == "n" else None,
+                before=int(cursor) if direction == "p" else None,
+                page_number=int(page_number),
             )
         except (IndexError, ValueError) as exc:
             logger.error("Invalid page callback: %s", exc)
@@ -3470,14 +3612,125 @@ async def callback_router(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             return
 
 
+@admitted_at(Priority.BACKGROUND)
+async def dbstats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Show pool gauges and the slowest named queries (admin only)."""
+    user = update.effective_user
+    if not user or str(user.id) not in context.bot_data.get("admin_ids", []):
+        await update.message.reply_text("❌ Kamu tidak punya akses admin.")
+        return
+    pool = await get_pool()
+    pool_stats = pool.stats()
+    render_stats = get_render_cache(context).stats()
+    lines = [
+        "🗄️ <b>Database</b>",
+        f"Pool: in_use={pool_stats['in_use']} idle={pool_stats['idle']} "
+        f"waiting={pool_stats['waiting']} max={pool_stats['max_size']}",
+        f"Acquire p95: {pool_stats['acquire_wait']['p95_ms']} ms",
+        "Antrian: "
+        + ", ".join(f"{k}={v}" for k, v in pool_stats["queue_depth"].items())
+        + " | Ditolak: "
+        + ", ".join(f"{k}={v}" for k, v in pool_stats["shed"].items()),
+        "Render cache: "
+        + ", ".join(f"{k}={v}" for k, v in render_stats.items()),
+        "",
+        "<b>Query (p50 / p95 / p99 ms)</b>",
+    ]
+    stats = query_stats()
+    if not stats:
+        lines.append("Belum ada query tercatat.")
+    for name, item in list(stats.items())[:15]:
+        lines.append(
+            f"<code>{html.escape(name)}</code> ×{item['calls']} "
+            f"rows={item['rows']} err={item['errors']}: "
+            f"{item['p50_ms']} / {item['p95_ms']} / {item['p99_ms']}"
+        )
+    try:
+        slow_queries = await list_slow_queries(5)
+    except Exception as exc:  # pragma: no cover - table belum ada
+        logger.warning("Gagal membaca slow_queries: %s", exc)
+        slow_queries = []
+    if slow_queries:
+        lines += ["", "<b>Slow query terbaru</b>"]
+        for item in slow_queries:
+            lines.append(
+                f"{item['duration_ms']:.0f} ms "
+                f"<code>{html.escape(item['query_name'] or '-')}</code> "
+                f"dari {html.escape(item['caller'] or '?')}"
+            )
+    await update.message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
+
+
+# Checkout and payment only; other cart:* actions are browsing-grade.
+_CRITICAL_CALLBACK_PREFIXES = ("pay:", "deposit:", "cart:checkout", "cart:pay")
+_BUSY_MESSAGE = "⏳ Server lagi ramai banget, coba lagi beberapa detik lagi ya."
+
+
+def _update_priority(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Priority:
+    """Checkout first, everything else next.
+
+    Admin reports drop to BACKGROUND inside the report functions themselves
+    (``admitted_at``), so other admin actions stay INTERACTIVE.
+    """
+    query = update.callback_query
+    data = query.data if query and query.data else ""
+    if data.startswith(_CRITICAL_CALLBACK_PREFIXES):
+        return Priority.CRITICAL
+    return Priority.INTERACTIVE
+
+
+async def _reply_busy(update: Update) -> None:
+    try:
+        if update.callback_query:
+            await update.callback_query.answer(_BUSY_MESSAGE, show_alert=True)
+        elif update.inline_query:
+            await update.inline_query.answer([], cache_time=0)
+        elif update.effective_message:
+            await update.effective_message.reply_text(_BUSY_MESSAGE)
+    except TelegramError as exc:  # pragma: no cover - network failure
+        logger.debug("Gagal mengirim pesan sibuk: %s", exc)
+
+
+def _with_db_session(
+    handler: Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[Any]],
+) -> Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[Any]]:
+    """Run a handler with an update-scoped DB session and admission class."""
+
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Any:
+        level = _update_priority(update, context)
+        try:
+            with priority(level):
+                async with update_session(handler.__name__):
+                    return await handler(update, context)
+        except PoolBusy as exc:
+            logger.warning(
+                "[admission] Update %s (%s) ditolak: %s",
+                update.update_id,
+                level.name.lower(),
+                exc,
+            )
+            await _reply_busy(update)
+            return None
+
+    return wrapper
+
+
 def register(application: Application) -> None:
     """Register command, callback, and text handlers."""
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("admin", handle_admin_menu))
-    application.add_handler(CallbackQueryHandler(callback_router))
-    application.add_handler(MessageHandler(filters.PHOTO, media_router))
+    application.add_handler(CommandHandler("start", _with_db_session(start)))
+    application.add_handler(
+        CommandHandler("admin", _with_db_session(handle_admin_menu))
+    )
+    application.add_handler(CommandHandler("dbstats", dbstats_command))
+    application.add_handler(CommandHandler("cari", _with_db_session(search_command)))
+    application.add_handler(InlineQueryHandler(_with_db_session(inline_query)))
+    application.add_handler(CallbackQueryHandler(_with_db_session(callback_router)))
+    application.add_handler(
+        MessageHandler(filters.PHOTO, _with_db_session(media_router))
+    )
     application.add_handler(
-        MessageHandler(filters.TEXT & ~filters.COMMAND, text_router)
+        MessageHandler(filters.TEXT & ~filters.COMMAND, _with_db_session(text_router))
     )
 
 
@@ -3488,11 +3741,16 @@ def setup_bot_data(
     application.bot_data["cart_manager"] = CartManager()
     application.bot_data["telemetry"] = telemetry
     application.bot_data["pakasir_client"] = pakasir_client
+    # Payment notifications reuse the application's bot and its HTTP pool.
+    sender = TelegramSender(application.bot)
+    set_telegram_sender(sender)
     application.bot_data["payment_service"] = PaymentService(
         pakasir_client=pakasir_client,
         telemetry=telemetry,
+        sender=sender,
     )
     application.bot_data["anti_spam"] = AntiSpamGuard()
+    application.bot_data["render_cache"] = RenderCache()
     application.bot_data["refund_calculator_config"] = load_config()
     # Inisialisasi CustomConfigManager untuk admin config
     try:
@@ -3794,10 +4052,10 @@ async def refund_history_command(
 
 def register_admin_handlers(application: Application) -> None:
     """Register command, callback, and text handlers."""
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CallbackQueryHandler(callback_router))
+    application.add_handler(CommandHandler("start", _with_db_session(start)))
+    application.add_handler(CallbackQueryHandler(_with_db_session(callback_router)))
     application.add_handler(
-        MessageHandler(filters.TEXT & ~filters.COMMAND, text_router)
+        MessageHandler(filters.TEXT & ~filters.COMMAND, _with_db_session(text_router))
     )
     # Refund calculator conversation
     refund_calc_conv = ConversationHandler(
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
 
-from src.services.catalog import Category, Product
+from src.services.catalog import Category, Product, ProductPage
 
 
 def welcome_inline_keyboard() -> InlineKeyboardMarkup:
@@ -25,6 +26,13 @@ def welcome_inline_keyboard() -> InlineKeyboardMarkup:
 
 def main_reply_keyboard(product_numbers: Sequence[int]) -> ReplyKeyboardMarkup:
     """Build main reply keyboard with emoji entries."""
+    return _main_reply_keyboard(tuple(product_numbers))
+
+
+# Telegram markup objects are immutable, so the same instance is reused for
+# every user; these builders only depend on their (hashable) arguments.
+@lru_cache(maxsize=16)
+def _main_reply_keyboard(product_numbers: Tuple[int, ...]) -> ReplyKeyboardMarkup:
     numbers_row = [f"{index}️⃣" for index in product_numbers]
     keyboard = [
         ["🛍 Semua Produk"],
@@ -58,27 +66,100 @@ def category_inline_keyboard(categories: Iterable[Category]) -> InlineKeyboardMa
     return InlineKeyboardMarkup(buttons)
 
 
+# Telegram rejects callback_data longer than this many bytes.
+CALLBACK_DATA_LIMIT = 64
+
+
+def product_page_callback(
+    direction: str,
+    cursor: int,
+    page_number: int,
+    category_slug: str | None,
+    category_id: int | None = None,
+) -> str:
+    """Callback data for a keyset page: ``products:page:<n|p>:<id>:<page>:<slug>``.
+
+    A slug that would push the data past :data:`CALLBACK_DATA_LIMIT` is
+    replaced by ``#<category_id>``.
+    """
+    prefix = f"products:page:{direction}:{cursor}:{page_number}:"
+    data = prefix + (category_slug or "all")
+    if len(data.encode("utf-8")) <= CALLBACK_DATA_LIMIT:
+        return data
+    if category_id is not None:
+        return f"{prefix}#{category_id}"
+    return f"{prefix}all"
+
+
+def product_page_keyboard(
+    page: ProductPage,
+    start_number: int,
+    page_number: int,
+    category_slug: str | None = None,
+) -> InlineKeyboardMarkup | None:
+    """Navigation row plus numbered product buttons for one catalog page."""
+    category_id = None
+    if category_slug and page.products and page.products[0].category is not None:
+        category_id = page.products[0].category.id
+    buttons: List[List[InlineKeyboardButton]] = []
+    nav_row: List[InlineKeyboardButton] = []
+    if page.has_prev and page.first_id is not None:
+        nav_row.append(
+            InlineKeyboardButton(
+                "⬅️ Previous",
+                callback_data=product_page_callback(
+                    "p", page.first_id, page_number - 1, category_slug, category_id
+                ),
+            )
+        )
+    if page.has_next and page.last_id is not None:
+        nav_row.append(
+            InlineKeyboardButton(
+                "➡️ Next",
+                callback_data=product_page_callback(
+                    "n", page.last_id, page_number + 1, category_slug, category_id
+                ),
+            )
+        )
+    if nav_row:
+        buttons.append(nav_row)
+
+    product_row = [
+        InlineKeyboardButton(f"{number}", callback_data=f"product:{product.id}")
+        for number, product in enumerate(page.products, start=start_number)
+    ]
+    # Telegram rows hold five product buttons at most.
+    for offset in range(0, len(product_row), 5):
+        buttons.append(product_row[offset : offset + 5])
+    return InlineKeyboardMarkup(buttons) if buttons else None
+
+
 def product_inline_keyboard(
     product: Product, quantity: int = 0
 ) -> InlineKeyboardMarkup:
     """Inline keyboard for product detail with quantity controls."""
+    return _product_inline_keyboard(product.id, quantity > 0)
+
+
+@lru_cache(maxsize=1024)
+def _product_inline_keyboard(product_id: int, in_cart: bool) -> InlineKeyboardMarkup:
     buttons = [
         [
-            InlineKeyboardButton(text="➖", callback_data=f"cart:remove:{product.id}"),
-            InlineKeyboardButton(text="➕", callback_data=f"cart:add:{product.id}"),
+            InlineKeyboardButton(text="➖", callback_data=f"cart:remove:{product_id}"),
+            InlineKeyboardButton(text="➕", callback_data=f"cart:add:{product_id}"),
         ],
     ]
-    if quantity > 0:
+    if in_cart:
         buttons.append(
             [
                 InlineKeyboardButton(
-                    text="✌️ x2", callback_data=f"cart:set:{product.id}:2"
+                    text="✌️ x2", callback_data=f"cart:set:{product_id}:2"
                 ),
                 InlineKeyboardButton(
-                    text="🖐️ x5", callback_data=f"cart:set:{product.id}:5"
+                    text="🖐️ x5", callback_data=f"cart:set:{product_id}:5"
                 ),
                 InlineKeyboardButton(
-                    text="🔟 x10", callback_data=f"cart:set:{product.id}:10"
+                    text="🔟 x10", callback_data=f"cart:set:{product_id}:10"
                 ),
             ]
         )
@@ -88,7 +169,7 @@ def product_inline_keyboard(
                 text="🧺 Lanjut ke Keranjang", callback_data="cart:checkout"
             ),
             InlineKeyboardButton(
-                text="❌ Batal", callback_data=f"cart:cancel:{product.id}"
+                text="❌ Batal", callback_data=f"cart:cancel:{product_id}"
             ),
         ]
     )
@@ -204,6 +285,7 @@ def info_settings_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=1)
 def stock_refresh_keyboard() -> InlineKeyboardMarkup:
     """Inline keyboard with refresh button for stock overview."""
     return InlineKeyboardMarkup(
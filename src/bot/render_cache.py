@@ -0,0 +1,76 @@
+"""Rendered catalog views (HTML text + keyboard) cached per catalog version."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Tuple
+
+from telegram import InlineKeyboardMarkup
+
+from src.services.catalog import catalog_version
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedView:
+    """Final message text and markup for one catalog view.
+
+    ``product_ids`` are the products on screen, numbered from
+    ``start_number``, so numeric replies still resolve without re-rendering.
+    Telegram objects are immutable, so a view is shared between users.
+    """
+
+    text: str
+    keyboard: InlineKeyboardMarkup | None
+    product_ids: Tuple[int, ...] = ()
+    start_number: int = 1
+
+
+class RenderCache:
+    """LRU of :class:`RenderedView` keyed by (view type, category, page...).
+
+    Entries belong to one catalog version and are dropped as soon as the
+    version moves. Without the catalog cache there is no version to key on,
+    so nothing is cached.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, RenderedView] = OrderedDict()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _sync_version(self) -> int:
+        version = catalog_version()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        return version
+
+    def get(self, key: Hashable) -> RenderedView | None:
+        if not self._sync_version():
+            return None
+        view = self._entries.get(key)
+        if view is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return view
+
+    def put(self, key: Hashable, view: RenderedView) -> None:
+        if not self._sync_version():
+            return
+        self._entries[key] = view
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self._version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
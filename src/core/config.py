@@ -20,6 +20,50 @@ class Settings(BaseSettings):
         default_factory=list, alias="TELEGRAM_OWNER_IDS"
     )
     database_url: str = Field(..., alias="DATABASE_URL")
+    db_pool_min_size: int = Field(default=1, alias="DB_POOL_MIN_SIZE")
+    db_pool_max_size: int = Field(default=10, alias="DB_POOL_MAX_SIZE")
+    db_pool_acquire_timeout: float = Field(
+        default=30.0, alias="DB_POOL_ACQUIRE_TIMEOUT"
+    )
+    db_pool_max_inactive_lifetime: float = Field(
+        default=300.0, alias="DB_POOL_MAX_INACTIVE_LIFETIME"
+    )
+    db_pool_max_queries: int = Field(default=50000, alias="DB_POOL_MAX_QUERIES")
+    db_pool_critical_reserve: int = Field(
+        default=2, alias="DB_POOL_CRITICAL_RESERVE"
+    )
+    db_pool_queue_limit: int = Field(default=50, alias="DB_POOL_QUEUE_LIMIT")
+    db_pool_interactive_wait: float = Field(
+        default=2.0, alias="DB_POOL_INTERACTIVE_WAIT"
+    )
+    db_pool_background_wait: float = Field(
+        default=10.0, alias="DB_POOL_BACKGROUND_WAIT"
+    )
+    # 0 = off. Bulk jobs lift it per transaction via lift_statement_timeout.
+    db_statement_timeout_ms: int = Field(default=0, alias="DB_STATEMENT_TIMEOUT_MS")
+    db_statement_cache_size: int = Field(
+        default=256, alias="DB_STATEMENT_CACHE_SIZE"
+    )
+    db_pgbouncer_mode: bool = Field(default=False, alias="DB_PGBOUNCER_MODE")
+    db_slow_query_ms: float = Field(default=500.0, alias="DB_SLOW_QUERY_MS")
+    db_slow_query_explain_rate: float = Field(
+        default=0.1, alias="DB_SLOW_QUERY_EXPLAIN_RATE"
+    )
+    database_replica_url: str | None = Field(
+        default=None, alias="DATABASE_REPLICA_URL"
+    )
+    db_replica_max_lag_seconds: float = Field(
+        default=5.0, alias="DB_REPLICA_MAX_LAG_SECONDS"
+    )
+    db_replica_lag_check_seconds: float = Field(
+        default=5.0, alias="DB_REPLICA_LAG_CHECK_SECONDS"
+    )
+    db_read_after_write_seconds: float = Field(
+        default=3.0, alias="DB_READ_AFTER_WRITE_SECONDS"
+    )
+    catalog_cache_ttl_seconds: float = Field(
+        default=300.0, alias="CATALOG_CACHE_TTL_SECONDS"
+    )
     pakasir_project_slug: str = Field(..., alias="PAKASIR_PROJECT_SLUG")
     pakasir_api_key: str = Field(..., alias="PAKASIR_API_KEY")
     pakasir_public_domain: str = Field(
@@ -28,6 +72,16 @@ class Settings(BaseSettings):
     pakasir_webhook_secret: str | None = Field(
         default=None, alias="PAKASIR_WEBHOOK_SECRET"
     )
+    webhook_workers: int = Field(default=4, alias="WEBHOOK_WORKERS")
+    webhook_max_attempts: int = Field(default=8, alias="WEBHOOK_MAX_ATTEMPTS")
+    webhook_retention_days: int = Field(default=14, alias="WEBHOOK_RETENTION_DAYS")
+    processed_webhook_retention_days: int = Field(
+        default=30, alias="PROCESSED_WEBHOOK_RETENTION_DAYS"
+    )
+    outbox_retention_days: int = Field(default=7, alias="OUTBOX_RETENTION_DAYS")
+    retention_purge_interval_minutes: int = Field(
+        default=360, alias="RETENTION_PURGE_INTERVAL_MINUTES"
+    )
     bot_timezone: str = Field(default="Asia/Jakarta", alias="BOT_TIMEZONE")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     store_name: str = Field(default="Bot Auto Order", alias="BOT_STORE_NAME")
@@ -44,6 +98,18 @@ class Settings(BaseSettings):
     healthcheck_interval_minutes: int = Field(
         default=5, alias="HEALTHCHECK_INTERVAL_MINUTES"
     )
+    stock_reconcile_interval_minutes: int = Field(
+        default=30, alias="STOCK_RECONCILE_INTERVAL_MINUTES"
+    )
+    content_reservation_minutes: int = Field(
+        default=30, alias="CONTENT_RESERVATION_MINUTES"
+    )
+    content_archive_after_days: int = Field(
+        default=7, alias="CONTENT_ARCHIVE_AFTER_DAYS"
+    )
+    content_archive_interval_minutes: int = Field(
+        default=60, alias="CONTENT_ARCHIVE_INTERVAL_MINUTES"
+    )
     enable_auto_backup: bool = Field(default=False, alias="ENABLE_AUTO_BACKUP")
     backup_time: str = Field(default="00:00", alias="BACKUP_TIME")
     backup_automatic_offsite: bool = Field(
@@ -175,7 +175,7 @@ class PostgresConfigAdapter:
             from src.services.postgres import get_pool
 
             pool = await get_pool()
-            async with pool.acquire() as conn:
+            async with pool.acquire() as conn, conn.transaction():
                 await conn.execute(
                     """
                     CREATE TABLE IF NOT EXISTS admin_custom_configs (
@@ -9,7 +9,15 @@ from zoneinfo import ZoneInfo
 from telegram.ext import Application
 
 from src.core.config import get_settings
-from src.core.tasks import backup_job, healthcheck_job, check_expired_payments_job
+from src.core.tasks import (
+    backup_job,
+    check_expired_payments_job,
+    content_archive_job,
+    content_hash_backfill_job,
+    healthcheck_job,
+    retention_purge_job,
+    stock_reconcile_job,
+)
 from src.core.telemetry import telemetry_flush_job
 
 
@@ -57,6 +65,40 @@ def register_scheduled_jobs(application: Application) -> None:
         name="check_expired_payments",
     )
 
+    # Stock is a counter maintained by deltas; reconcile drift periodically.
+    if settings.stock_reconcile_interval_minutes > 0:
+        job_queue.run_repeating(
+            stock_reconcile_job,
+            interval=settings.stock_reconcile_interval_minutes * 60,
+            first=120,
+            name="stock_reconcile",
+        )
+
+    # Hash legacy contents once per start; new rows are hashed on insert.
+    job_queue.run_once(
+        content_hash_backfill_job,
+        when=60,
+        name="content_hash_backfill",
+    )
+
+    # Keep product_contents to sellable inventory; archive delivered rows.
+    if settings.content_archive_interval_minutes > 0:
+        job_queue.run_repeating(
+            content_archive_job,
+            interval=settings.content_archive_interval_minutes * 60,
+            first=300,
+            name="content_archive",
+        )
+
+    # Finished webhook/outbox rows are only kept for the retention window.
+    if settings.retention_purge_interval_minutes > 0:
+        job_queue.run_repeating(
+            retention_purge_job,
+            interval=settings.retention_purge_interval_minutes * 60,
+            first=600,
+            name="retention_purge",
+        )
+
     # Flush telemetry to database every 6 hours
     telemetry_tracker = application.bot_data.get("telemetry")
     if telemetry_tracker:
@@ -21,10 +21,14 @@ from src.services.payment_messages import (
 )
 from src.core.currency import format_rupiah
 from src.services.deposit import list_expired_deposits
+from src.services.postgres import Priority, admitted_at
 
 
 logger = logging.getLogger(__name__)
 
+# Scheduled work never competes with customer updates for connections.
+background_job = admitted_at(Priority.BACKGROUND)
+
 
 async def healthcheck_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Jalankan health-check periodik."""
@@ -35,6 +39,69 @@ async def healthcheck_job(context: ContextTypes.DEFAULT_TYPE) -> None:
         logger.exception("Health-check job gagal: %s", exc)
 
 
+@background_job
+async def stock_reconcile_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Lepas reservasi kedaluwarsa lalu perbaiki stok yang tidak sinkron."""
+    from src.services.product_content import (
+        reconcile_stock,
+        release_expired_reservations,
+    )
+
+    try:
+        await release_expired_reservations()
+        await reconcile_stock()
+    except Exception as exc:  # pragma: no cover - observability
+        logger.exception("Stock reconcile job gagal: %s", exc)
+
+
+@background_job
+async def content_hash_backfill_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Isi content_sha256 untuk konten lama secara bertahap."""
+    from src.services.product_content import backfill_content_hashes
+
+    try:
+        await backfill_content_hashes()
+    except Exception as exc:  # pragma: no cover - observability
+        logger.exception("Backfill content_sha256 gagal: %s", exc)
+
+
+@background_job
+async def content_archive_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Pindahkan konten terpakai ke tabel arsip per batch."""
+    from src.services.product_content import archive_used_contents
+
+    settings = get_settings()
+    try:
+        await archive_used_contents(
+            older_than_days=settings.content_archive_after_days
+        )
+    except Exception as exc:  # pragma: no cover - observability
+        logger.exception("Arsip konten gagal: %s", exc)
+
+
+@background_job
+async def retention_purge_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Hapus riwayat webhook dan outbox yang melewati masa retensi."""
+    from src.services.outbox import purge_outbox
+    from src.services.webhook_inbox import purge_webhook_history
+
+    settings = get_settings()
+    try:
+        webhooks = await purge_webhook_history(
+            inbox_retention_days=settings.webhook_retention_days,
+            processed_retention_days=settings.processed_webhook_retention_days,
+        )
+        outbox = await purge_outbox(retention_days=settings.outbox_retention_days)
+        logger.info(
+            "[retention] Dihapus: %s inbox, %s dedupe webhook, %s outbox.",
+            webhooks["inbox"],
+            webhooks["processed"],
+            outbox,
+        )
+    except Exception as exc:  # pragma: no cover - observability
+        logger.exception("Retention purge gagal: %s", exc)
+
+
 async def backup_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Jalankan backup terenkripsi secara berkala."""
 
@@ -52,6 +119,7 @@ async def backup_job(context: ContextTypes.DEFAULT_TYPE) -> None:
         logger.exception("Backup job gagal: %s", exc)
 
 
+@background_job
 async def check_expired_payments_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Monitor dan handle pembayaran yang expired."""
     from src.services.postgres import get_pool
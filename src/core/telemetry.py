@@ -4,13 +4,18 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from bisect import bisect_left
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone, timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000,
+)
+
 
 @dataclass(slots=True)
 class TelemetrySnapshot:
@@ -23,6 +28,56 @@ class TelemetrySnapshot:
     carts_abandoned: int = 0
 
 
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    bounds_ms: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS
+    counts: List[int] = field(default_factory=list)
+    total: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            # Last bucket collects everything above the highest bound.
+            self.counts = [0] * (len(self.bounds_ms) + 1)
+
+    def observe(self, value_ms: float) -> None:
+        """Record a single observation."""
+        self.counts[bisect_left(self.bounds_ms, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, quantile: float) -> float:
+        """Return the bucket upper bound covering ``quantile`` of observations."""
+        if self.total == 0:
+            return 0.0
+        target = quantile * self.total
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                if index < len(self.bounds_ms):
+                    return min(float(self.bounds_ms[index]), self.max_ms)
+                break
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        """Return count, mean and p50/p95/p99 in milliseconds."""
+        mean = self.sum_ms / self.total if self.total else 0.0
+        return {
+            "count": self.total,
+            "mean_ms": round(mean, 2),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
 @dataclass(slots=True)
 class TelemetryTracker:
     """Thread-safe metrics collector with periodic logging."""
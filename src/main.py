@@ -14,8 +14,14 @@ from src.core.config import get_settings
 from src.core.logging import setup_logging
 from src.core.telemetry import TelemetryTracker
 from src.core.scheduler import register_scheduled_jobs
+from src.services.catalog import start_catalog_cache, stop_catalog_cache
+from src.services.outbox import OutboxDispatcher
+from src.services.owner_alerts import close_owner_client
 from src.services.pakasir import PakasirClient
+from src.services.payment import PaymentService
 from src.services.postgres import get_pool
+from src.services.schema import apply_schema
+from src.services.slow_queries import install_slow_query_recorder
 
 
 logger = logging.getLogger(__name__)
@@ -46,16 +52,28 @@ async def _post_init(application: Application) -> None:
     """Executed after Application initialises."""
     telemetry: TelemetryTracker = application.bot_data["telemetry"]
     await telemetry.start()
-    await get_pool()
+    pool = await get_pool()
+    await apply_schema()
+    install_slow_query_recorder(pool, get_settings().db_slow_query_explain_rate)
+    await start_catalog_cache()
+    payment_service: PaymentService = application.bot_data["payment_service"]
+    outbox = OutboxDispatcher(payment_service.outbox_handlers())
+    application.bot_data["outbox"] = outbox
+    outbox.start()
     logger.info("✅ Bot initialised.")
 
 
 async def _post_shutdown(application: Application) -> None:
     """Executed during application shutdown."""
+    outbox: OutboxDispatcher | None = application.bot_data.get("outbox")
+    if outbox is not None:
+        await outbox.stop()
     telemetry: TelemetryTracker = application.bot_data["telemetry"]
     await telemetry.flush()
     pakasir_client: PakasirClient = application.bot_data["pakasir_client"]
     await pakasir_client.aclose()
+    await close_owner_client()
+    await stop_catalog_cache()
     pool = await get_pool()
     await pool.close()
     logger.info("👋 Shutdown complete.")
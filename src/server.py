@@ -11,10 +11,19 @@ from aiohttp import web
 from src.core.config import get_settings
 from src.core.logging import setup_logging
 from src.core.telemetry import TelemetryTracker
+from src.services.outbox import OutboxDispatcher
+from src.services.owner_alerts import close_owner_client
 from src.services.pakasir import PakasirClient
 from src.services.payment import PaymentService
 from src.services.postgres import get_pool
-from src.webhooks.pakasir import handle_pakasir_webhook
+from src.services.schema import apply_schema
+from src.services.slow_queries import install_slow_query_recorder
+from src.services.telegram_sender import (
+    TelegramSender,
+    close_telegram_sender,
+    set_telegram_sender,
+)
+from src.webhooks.pakasir import PakasirWebhookWorkers, handle_pakasir_webhook
 
 
 def parse_args() -> argparse.Namespace:
@@ -30,30 +39,47 @@ def create_app() -> web.Application:
     settings = get_settings()
     telemetry = TelemetryTracker()
     pakasir_client = PakasirClient()
-    payment_service = PaymentService(pakasir_client=pakasir_client, telemetry=telemetry)
+    sender = TelegramSender.from_token(settings.telegram_bot_token)
+    set_telegram_sender(sender)
+    payment_service = PaymentService(
+        pakasir_client=pakasir_client, telemetry=telemetry, sender=sender
+    )
+    workers = PakasirWebhookWorkers(
+        payment_service,
+        telemetry,
+        concurrency=settings.webhook_workers,
+        max_attempts=settings.webhook_max_attempts,
+    )
 
     app = web.Application()
     app["settings"] = settings
     app["telemetry"] = telemetry
     app["pakasir_client"] = pakasir_client
     app["payment_service"] = payment_service
+    app["webhook_workers"] = workers
+    outbox = OutboxDispatcher(payment_service.outbox_handlers())
+    app["outbox"] = outbox
 
     async def pakasir_handler(request: web.Request) -> web.Response:
-        return await handle_pakasir_webhook(
-            request,
-            payment_service=payment_service,
-            telemetry=telemetry,
-        )
+        return await handle_pakasir_webhook(request, workers)
 
     app.router.add_post("/webhooks/pakasir", pakasir_handler)
 
     async def on_startup(app: web.Application) -> None:
         await telemetry.start()
-        await get_pool()
+        pool = await get_pool()
+        await apply_schema()
+        install_slow_query_recorder(pool, settings.db_slow_query_explain_rate)
+        workers.start()
+        outbox.start()
 
     async def on_cleanup(app: web.Application) -> None:
+        await workers.stop()
+        await outbox.stop()
         await telemetry.flush()
         await pakasir_client.aclose()
+        await close_telegram_sender()
+        await close_owner_client()
         pool = await get_pool()
         await pool.close()
 
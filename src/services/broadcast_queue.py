@@ -6,44 +6,40 @@ import logging
 from typing import Iterable, List, Optional
 
 from src.services.postgres import get_pool
+from src.services.schema import ensure_schema, register_schema
 
 
 logger = logging.getLogger(__name__)
 
-
-async def _ensure_tables() -> None:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS broadcast_jobs (
-                id BIGSERIAL PRIMARY KEY,
-                actor_telegram_id BIGINT NOT NULL,
-                message TEXT,
-                media_file_id TEXT,
-                media_type TEXT,
-                status VARCHAR(16) DEFAULT 'pending',
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                started_at TIMESTAMPTZ,
-                completed_at TIMESTAMPTZ
-            );
-            """
-        )
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS broadcast_job_targets (
-                id BIGSERIAL PRIMARY KEY,
-                job_id BIGINT NOT NULL REFERENCES broadcast_jobs(id) ON DELETE CASCADE,
-                telegram_id BIGINT NOT NULL,
-                status VARCHAR(16) DEFAULT 'pending',
-                retries INTEGER DEFAULT 0,
-                last_error TEXT,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                sent_at TIMESTAMPTZ,
-                UNIQUE (job_id, telegram_id)
-            );
-            """
-        )
+register_schema(
+    "broadcast_queue",
+    """
+    CREATE TABLE IF NOT EXISTS broadcast_jobs (
+        id BIGSERIAL PRIMARY KEY,
+        actor_telegram_id BIGINT NOT NULL,
+        message TEXT,
+        media_file_id TEXT,
+        media_type TEXT,
+        status VARCHAR(16) DEFAULT 'pending',
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        started_at TIMESTAMPTZ,
+        completed_at TIMESTAMPTZ
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS broadcast_job_targets (
+        id BIGSERIAL PRIMARY KEY,
+        job_id BIGINT NOT NULL REFERENCES broadcast_jobs(id) ON DELETE CASCADE,
+        telegram_id BIGINT NOT NULL,
+        status VARCHAR(16) DEFAULT 'pending',
+        retries INTEGER DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        sent_at TIMESTAMPTZ,
+        UNIQUE (job_id, telegram_id)
+    );
+    """,
+)
 
 
 async def create_job(
@@ -56,7 +52,7 @@ async def create_job(
 ) -> int:
     """Enqueue broadcast job dan targetnya."""
 
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         async with conn.transaction():
@@ -94,7 +90,7 @@ async def create_job(
 async def fetch_pending_targets(limit: int = 20) -> List[dict]:
     """Ambil target broadcast yang belum dikirim."""
 
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         async with conn.transaction():
@@ -192,7 +188,7 @@ async def finalize_jobs() -> None:
 
 
 async def get_job_summary(job_id: int) -> dict:
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         job = await conn.fetchrow(
@@ -2,15 +2,211 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Sequence
-
-from src.services.postgres import get_pool
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+import asyncpg
+
+from src.core.config import get_settings
+from src.services.catalog_events import (
+    CATALOG_CHANNEL,
+    RELOAD_PAYLOAD,
+    notify_product_changed,
+    subscribe,
+    unsubscribe,
+)
+from src.services.postgres import SessionStateUnavailable, get_pool
 from src.services.product_content import delete_all_contents_for_product
+from src.services.queries import define_query
+from src.services.records import Interner, RowMapper
+from src.services.schema import register_schema
 
 logger = logging.getLogger(__name__)
 
+# Trigram search over name, code and description. Creating the extension
+# needs a privileged role, so a missing pg_trgm only disables the index and
+# search_products() falls back to ILIKE.
+register_schema(
+    "catalog_search",
+    """
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN insufficient_privilege THEN
+        RAISE NOTICE 'pg_trgm tidak tersedia, pencarian memakai ILIKE';
+    END $$;
+    """,
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+            CREATE INDEX IF NOT EXISTS idx_products_search_trgm ON products
+            USING gin (
+                lower(name || ' ' || code || ' ' || COALESCE(description, ''))
+                gin_trgm_ops
+            );
+        END IF;
+    END $$;
+    """,
+)
+
+_PRODUCT_COLUMNS = """
+    SELECT
+        p.id,
+        p.code,
+        p.name,
+        p.description,
+        p.price_cents,
+        p.stock,
+        p.sold_count,
+        c.id AS category_id,
+        c.name AS category_name,
+        c.slug AS category_slug,
+        COALESCE(c.emoji, '🗂️') AS category_emoji
+    FROM products p
+"""
+
+LIST_CATEGORIES = define_query(
+    "catalog.list_categories",
+    """
+    SELECT id, name, slug, COALESCE(emoji, '🗂️') AS emoji
+    FROM categories
+    WHERE is_active = TRUE
+    ORDER BY name;
+    """,
+)
+LIST_PRODUCTS = define_query(
+    "catalog.list_products",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE AND p.stock > 0
+    ORDER BY p.id ASC
+    LIMIT $1;
+    """,
+)
+LIST_PRODUCTS_ALL = define_query(
+    "catalog.list_products_all",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE
+    ORDER BY p.id ASC
+    LIMIT $1;
+    """,
+)
+LIST_PRODUCTS_BY_CATEGORY = define_query(
+    "catalog.list_products_by_category",
+    _PRODUCT_COLUMNS
+    + """
+    INNER JOIN categories c ON p.category_id = c.id
+    WHERE c.slug = $1
+      AND p.is_active = TRUE AND p.stock > 0
+    ORDER BY p.id ASC;
+    """,
+)
+LIST_PRODUCTS_BY_CATEGORY_ALL = define_query(
+    "catalog.list_products_by_category_all",
+    _PRODUCT_COLUMNS
+    + """
+    INNER JOIN categories c ON p.category_id = c.id
+    WHERE c.slug = $1
+      AND p.is_active = TRUE
+    ORDER BY p.id ASC;
+    """,
+)
+GET_PRODUCT = define_query(
+    "catalog.get_product",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.id = $1;
+    """,
+)
+# Keyset pages ordered by id. $1 = category slug or NULL, $2 = exclude zero
+# stock, $3 = cursor id, $4 = page size + 1 (the extra row is the has-more probe).
+PAGE_PRODUCTS_AFTER = define_query(
+    "catalog.page_products_after",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE
+      AND ($1::text IS NULL OR c.slug = $1)
+      AND (NOT $2::boolean OR p.stock > 0)
+      AND p.id > $3
+    ORDER BY p.id ASC
+    LIMIT $4;
+    """,
+)
+PAGE_PRODUCTS_BEFORE = define_query(
+    "catalog.page_products_before",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE
+      AND ($1::text IS NULL OR c.slug = $1)
+      AND (NOT $2::boolean OR p.stock > 0)
+      AND p.id < $3
+    ORDER BY p.id DESC
+    LIMIT $4;
+    """,
+)
+# $1 = lowercased term, $2 = limit, $3 = exclude zero stock. The document
+# expression must match idx_products_search_trgm for the index to be used.
+SEARCH_PRODUCTS = define_query(
+    "catalog.search_products",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE
+      AND (NOT $3::boolean OR p.stock > 0)
+      AND $1 <% lower(p.name || ' ' || p.code || ' ' || COALESCE(p.description, ''))
+    ORDER BY
+        (lower(p.code) = $1) DESC,
+        word_similarity($1, lower(p.name)) DESC,
+        word_similarity(
+            $1, lower(p.name || ' ' || p.code || ' ' || COALESCE(p.description, ''))
+        ) DESC,
+        p.id ASC
+    LIMIT $2;
+    """,
+)
+# Fallback without pg_trgm. $1 = ILIKE pattern, $4 = lowercased term.
+SEARCH_PRODUCTS_ILIKE = define_query(
+    "catalog.search_products_ilike",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE
+      AND (NOT $3::boolean OR p.stock > 0)
+      AND (p.name ILIKE $1 OR p.code ILIKE $1 OR p.description ILIKE $1)
+    ORDER BY (lower(p.code) = $4) DESC, (p.name ILIKE $1) DESC, p.id ASC
+    LIMIT $2;
+    """,
+)
+SNAPSHOT_PRODUCTS = define_query(
+    "catalog.snapshot_products",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = TRUE
+    ORDER BY p.id ASC;
+    """,
+)
+REFRESH_PRODUCTS = define_query(
+    "catalog.refresh_products",
+    _PRODUCT_COLUMNS
+    + """
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.id = ANY($1::int[]) AND p.is_active = TRUE;
+    """,
+)
+
 
 @dataclass(slots=True)
 class Category:
@@ -33,8 +229,251 @@ class Product:
 
     @property
     def formatted_price(self) -> str:
-        rupiah = self.price_cents / 100
-        return f"Rp {rupiah:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return _format_price(self.price_cents)
+
+
+@lru_cache(maxsize=4096)
+def _format_price(price_cents: int) -> str:
+    # Prices repeat across products and renders; format each value once.
+    rupiah = price_cents / 100
+    return f"Rp {rupiah:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+@dataclass(slots=True)
+class ProductPage:
+    """One keyset page of products ordered by id."""
+
+    products: List[Product]
+    has_next: bool
+    has_prev: bool
+
+    @property
+    def first_id(self) -> int | None:
+        return self.products[0].id if self.products else None
+
+    @property
+    def last_id(self) -> int | None:
+        return self.products[-1].id if self.products else None
+
+
+# Every product row shares a handful of categories; intern them instead of
+# allocating a duplicate Category per product.
+_categories: Interner[Category] = Interner(Category)
+
+
+def _product_from_row(row: Any) -> Product:
+    # Column positions follow _PRODUCT_COLUMNS.
+    category_id = row[7]
+    return Product(
+        row[0],
+        row[1],
+        row[2],
+        row[3],
+        row[4],
+        row[5],
+        row[6],
+        _categories.get(category_id, row[8], row[9], row[10]) if category_id else None,
+    )
+
+
+# LIST_CATEGORIES selects id, name, slug, emoji in Category field order.
+CATEGORY_MAPPER: RowMapper[Category] = RowMapper(lambda row: _categories.get(*row))
+PRODUCT_MAPPER: RowMapper[Product] = RowMapper(_product_from_row)
+
+
+# Local events fire inside the writer's transaction, before it commits, so
+# the refetch for them waits a moment. LISTEN events arrive after commit.
+_LOCAL_FLUSH_DELAY = 0.5
+
+
+class _CatalogCache:
+    """Versioned in-memory snapshot of active categories and products.
+
+    Loads are coalesced into one shared task; product changes announced on
+    :data:`CATALOG_CHANNEL` are refetched by id and applied in place.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.version = 0
+        self.loaded_at = 0.0
+        self.categories: List[Category] = []
+        self.products: Dict[int, Product] = {}
+        self._ordered: List[Product] | None = None
+        self._pending: Set[int] = set()
+        self._load_task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._listener: asyncpg.Connection | None = None
+        self._local = False
+
+    def fresh(self) -> bool:
+        return self.loaded_at > 0 and time.monotonic() - self.loaded_at < self.ttl
+
+    def ordered(self) -> List[Product]:
+        if self._ordered is None:
+            self._ordered = sorted(self.products.values(), key=lambda p: p.id)
+        return self._ordered
+
+    async def start(self) -> None:
+        pool = await get_pool()
+        try:
+            self._listener = await pool.listen(CATALOG_CHANNEL, self._on_notify)
+            self._listener.add_termination_listener(self._on_listener_lost)
+        except SessionStateUnavailable:
+            logger.info("[catalog] LISTEN tidak tersedia, cache memakai TTL + event lokal.")
+            self._use_local_events()
+        except Exception as exc:
+            logger.warning("[catalog] Gagal LISTEN %s: %s", CATALOG_CHANNEL, exc)
+            self._use_local_events()
+        await self.load()
+
+    async def stop(self) -> None:
+        if self._local:
+            unsubscribe(self._on_local_event)
+            self._local = False
+        for task in (self._load_task, self._flush_task):
+            if task is not None and not task.done():
+                task.cancel()
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.close()
+        self._listener = None
+
+    async def snapshot(self) -> "_CatalogCache":
+        if not self.fresh():
+            await self.load()
+        return self
+
+    async def load(self) -> None:
+        task = self._load_task
+        if task is None or task.done():
+            task = self._load_task = asyncio.get_running_loop().create_task(
+                self._reload()
+            )
+        # Shielded so a cancelled reader does not abort the shared load.
+        await asyncio.shield(task)
+
+    async def _reload(self) -> None:
+        pool = await get_pool()
+        started = time.perf_counter()
+        async with pool.side_connection() as connection:
+            category_rows = await LIST_CATEGORIES.fetch(connection)
+            product_rows = await SNAPSHOT_PRODUCTS.fetch(connection)
+        self.categories = CATEGORY_MAPPER.many(category_rows)
+        self.products = {
+            product.id: product for product in PRODUCT_MAPPER.many(product_rows)
+        }
+        self._ordered = None
+        self.loaded_at = time.monotonic()
+        self.version += 1
+        logger.info(
+            "[catalog] Snapshot v%s dimuat: %s kategori, %s produk (%.1f ms)",
+            self.version,
+            len(self.categories),
+            len(self.products),
+            (time.perf_counter() - started) * 1000,
+        )
+        if self._pending:
+            self._schedule_flush(0.0)
+
+    def apply(self, payload: str, delay: float = 0.0) -> None:
+        """Apply one catalog event payload."""
+        if payload == RELOAD_PAYLOAD:
+            self.loaded_at = 0.0
+            return
+        kind, _, raw_id = payload.partition(":")
+        if kind != "product" or not raw_id.isdigit():
+            logger.debug("[catalog] Event tidak dikenal: %s", payload)
+            return
+        self._pending.add(int(raw_id))
+        self._schedule_flush(delay)
+
+    def _schedule_flush(self, delay: float) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush(delay)
+            )
+
+    async def _flush(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        while self._pending:
+            if self._load_task is not None and not self._load_task.done():
+                return  # _reload reschedules once it finishes
+            if not self.loaded_at:
+                self._pending.clear()  # the next read reloads everything
+                return
+            ids = sorted(self._pending)
+            self._pending.clear()
+            try:
+                pool = await get_pool()
+                async with pool.side_connection() as connection:
+                    rows = await REFRESH_PRODUCTS.fetch(connection, ids)
+            except Exception as exc:
+                logger.warning("[catalog] Gagal refresh produk %s: %s", ids, exc)
+                self.loaded_at = 0.0
+                return
+            fresh = {product.id: product for product in PRODUCT_MAPPER.many(rows)}
+            for product_id in ids:
+                product = fresh.get(product_id)
+                if product is None:
+                    self.products.pop(product_id, None)
+                else:
+                    self.products[product_id] = product
+            self._ordered = None
+            self.version += 1
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.apply(payload)
+
+    def _on_local_event(self, payload: str) -> None:
+        self.apply(payload, delay=_LOCAL_FLUSH_DELAY)
+
+    def _on_listener_lost(self, connection: Any) -> None:
+        logger.warning("[catalog] Koneksi LISTEN terputus, beralih ke TTL + event lokal.")
+        self._listener = None
+        self.loaded_at = 0.0
+        self._use_local_events()
+
+    def _use_local_events(self) -> None:
+        if not self._local:
+            subscribe(self._on_local_event)
+            self._local = True
+
+
+_cache: _CatalogCache | None = None
+
+
+async def start_catalog_cache(ttl: float | None = None) -> None:
+    """Load the catalog snapshot and start listening for changes.
+
+    Until this is called every read goes straight to Postgres.
+    """
+    global _cache
+    if ttl is None:
+        ttl = get_settings().catalog_cache_ttl_seconds
+    if ttl <= 0 or _cache is not None:
+        return
+    cache = _CatalogCache(ttl)
+    await cache.start()
+    _cache = cache
+
+
+async def stop_catalog_cache() -> None:
+    global _cache
+    cache, _cache = _cache, None
+    if cache is not None:
+        await cache.stop()
+
+
+def catalog_version() -> int:
+    """Snapshot version, bumped on every reload or applied change (0 if off)."""
+    return _cache.version if _cache is not None else 0
+
+
+async def _snapshot() -> _CatalogCache | None:
+    if _cache is None:
+        return None
+    return await _cache.snapshot()
 
 
 async def category_exists(category_id: int) -> bool:
@@ -53,16 +492,11 @@ async def category_exists(category_id: int) -> bool:
 
 async def list_categories() -> List[Category]:
     """Return active product categories ordered by name."""
+    cache = await _snapshot()
+    if cache is not None:
+        return list(cache.categories)
     pool = await get_pool()
-    rows = await pool.fetch(
-        """
-        SELECT id, name, slug, COALESCE(emoji, '🗂️') AS emoji
-        FROM categories
-        WHERE is_active = TRUE
-        ORDER BY name;
-        """
-    )
-    return [Category(**dict(row)) for row in rows]
+    return await CATEGORY_MAPPER.fetch(pool, LIST_CATEGORIES, readonly=True)
 
 
 async def list_products(
@@ -78,59 +512,181 @@ async def list_products(
     Returns:
         List of Product objects
     """
+    cache = await _snapshot()
+    if cache is not None:
+        products = [
+            product
+            for product in cache.ordered()
+            if product.stock > 0 or not exclude_zero_stock
+        ]
+        return products[:limit]
     pool = await get_pool()
-
-    # Build WHERE clause based on exclude_zero_stock
-    where_clause = "WHERE p.is_active = TRUE"
-    if exclude_zero_stock:
-        where_clause += " AND p.stock > 0"
-
-    rows = await pool.fetch(
-        f"""
-        SELECT
-            p.id,
-            p.code,
-            p.name,
-            p.description,
-            p.price_cents,
-            p.stock,
-            p.sold_count,
-            c.id AS category_id,
-            c.name AS category_name,
-            c.slug AS category_slug,
-            COALESCE(c.emoji, '🗂️') AS category_emoji
-        FROM products p
-        LEFT JOIN categories c ON p.category_id = c.id
-        {where_clause}
-        ORDER BY p.id ASC
-        LIMIT $1;
-        """,
-        limit,
+    query = LIST_PRODUCTS if exclude_zero_stock else LIST_PRODUCTS_ALL
+    return await PRODUCT_MAPPER.fetch(pool, query, limit, readonly=True)
+
+
+def _build_page(
+    items: List[Product], page_size: int, after: int | None, before: int | None
+) -> ProductPage:
+    # ``items`` holds up to page_size + 1 products in id order on the side of
+    # the cursor we are moving towards.
+    if before is not None:
+        return ProductPage(
+            products=items[-page_size:],
+            has_next=True,
+            has_prev=len(items) > page_size,
+        )
+    return ProductPage(
+        products=items[:page_size],
+        has_next=len(items) > page_size,
+        has_prev=after is not None,
     )
-    products: List[Product] = []
-    for row in rows:
-        data = dict(row)
-        category = None
-        if data.get("category_id"):
-            category = Category(
-                id=data["category_id"],
-                name=data["category_name"],
-                slug=data["category_slug"],
-                emoji=data["category_emoji"],
+
+
+async def list_products_page(
+    *,
+    after: int | None = None,
+    before: int | None = None,
+    category_slug: str | None = None,
+    page_size: int = 5,
+    exclude_zero_stock: bool = True,
+) -> ProductPage:
+    """
+    Return one page of active products after (or before) a cursor id.
+
+    Args:
+        after: Return products with id greater than this cursor
+        before: Return products with id lower than this cursor (previous page)
+        category_slug: Optional category filter
+        page_size: Number of products per page
+        exclude_zero_stock: If True, exclude products with stock=0
+
+    Returns:
+        ProductPage with the visible products and navigation flags
+    """
+    cache = await _snapshot()
+    if cache is not None:
+        visible = [
+            product
+            for product in cache.ordered()
+            if (product.stock > 0 or not exclude_zero_stock)
+            and (
+                category_slug is None
+                or (
+                    product.category is not None
+                    and product.category.slug == category_slug
+                )
             )
-        products.append(
-            Product(
-                id=data["id"],
-                code=data["code"],
-                name=data["name"],
-                description=data["description"],
-                price_cents=data["price_cents"],
-                stock=data["stock"],
-                sold_count=data["sold_count"],
-                category=category,
+        ]
+        if before is not None:
+            items = [product for product in visible if product.id < before]
+            items = items[-(page_size + 1) :]
+        else:
+            items = [
+                product for product in visible if after is None or product.id > after
+            ]
+            items = items[: page_size + 1]
+        return _build_page(items, page_size, after, before)
+
+    pool = await get_pool()
+    if before is not None:
+        rows = await pool.fetch(
+            PAGE_PRODUCTS_BEFORE,
+            category_slug,
+            exclude_zero_stock,
+            before,
+            page_size + 1,
+            readonly=True,
+        )
+        rows = list(reversed(rows))
+    else:
+        rows = await pool.fetch(
+            PAGE_PRODUCTS_AFTER,
+            category_slug,
+            exclude_zero_stock,
+            after or 0,
+            page_size + 1,
+            readonly=True,
+        )
+    return _build_page(PRODUCT_MAPPER.many(rows), page_size, after, before)
+
+
+_SEARCH_MIN_LENGTH = 2
+_SEARCH_MAX_LENGTH = 64
+_SEARCH_CACHE_TTL = 30.0
+_SEARCH_CACHE_SIZE = 256
+
+# (term, limit, exclude_zero_stock) -> (expires_at, catalog version, results)
+_search_cache: OrderedDict[Tuple[str, int, bool], Tuple[float, int, List[Product]]] = (
+    OrderedDict()
+)
+_trigram_available = True
+
+
+def _normalise_term(term: str) -> str:
+    return " ".join(term.lower().split())[:_SEARCH_MAX_LENGTH]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def search_products(
+    term: str, limit: int = 10, exclude_zero_stock: bool = True
+) -> List[Product]:
+    """
+    Search active products by name, code and description.
+
+    Exact code matches rank first, then trigram similarity to the name.
+    Results are cached briefly per term and dropped on any catalog change.
+
+    Args:
+        term: Free-text query typed by the user
+        limit: Maximum number of results
+        exclude_zero_stock: If True, exclude products with stock=0
+
+    Returns:
+        List of Product objects, best match first
+    """
+    global _trigram_available
+    normalised = _normalise_term(term)
+    if len(normalised) < _SEARCH_MIN_LENGTH:
+        return []
+
+    key = (normalised, limit, exclude_zero_stock)
+    version = catalog_version()
+    now = time.monotonic()
+    cached = _search_cache.get(key)
+    if cached is not None and cached[0] > now and cached[1] == version:
+        _search_cache.move_to_end(key)
+        return list(cached[2])
+
+    pool = await get_pool()
+    rows = None
+    if _trigram_available:
+        try:
+            rows = await pool.fetch(
+                SEARCH_PRODUCTS, normalised, limit, exclude_zero_stock, readonly=True
             )
+        except asyncpg.exceptions.UndefinedFunctionError:
+            logger.warning("[catalog] pg_trgm tidak tersedia, pencarian memakai ILIKE.")
+            _trigram_available = False
+    if rows is None:
+        rows = await pool.fetch(
+            SEARCH_PRODUCTS_ILIKE,
+            f"%{_escape_like(normalised)}%",
+            limit,
+            exclude_zero_stock,
+            normalised,
+            readonly=True,
         )
-    return products
+    results = PRODUCT_MAPPER.many(rows)
+
+    _search_cache[key] = (now + _SEARCH_CACHE_TTL, version, results)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > _SEARCH_CACHE_SIZE:
+        _search_cache.popitem(last=False)
+    return list(results)
 
 
 async def add_product(
@@ -195,6 +751,7 @@ async def add_product(
                 stock,
             )
             product_id = row["id"]
+            await notify_product_changed(conn, product_id)
             logger.info(
                 "[catalog] Added product id=%s code=%s name=%s", product_id, code, name
             )
@@ -260,6 +817,7 @@ async def edit_product(product_id: int, **fields) -> None:
 
             if result == "UPDATE 0":
                 raise ValueError(f"Produk dengan ID {product_id} tidak ditemukan")
+            await notify_product_changed(conn, product_id)
 
             logger.info(
                 "[catalog] Updated product id=%s fields=%s",
@@ -312,6 +870,7 @@ async def delete_product(product_id: int, *, force: bool = False) -> None:
                 # Soft delete: Hapus semua product_contents sehingga stok=0
                 # Produk tetap ada di database untuk referensi order_items
                 await delete_all_contents_for_product(product_id)
+                await notify_product_changed(conn, product_id)
 
                 logger.info(
                     "[catalog] Soft-deleted product id=%s (removed all contents, keeping product for order history)",
@@ -330,6 +889,7 @@ async def delete_product(product_id: int, *, force: bool = False) -> None:
 
             if result == "DELETE 0":
                 raise ValueError(f"Produk dengan ID {product_id} tidak ditemukan")
+            await notify_product_changed(conn, product_id)
 
             logger.info(
                 "[catalog] Hard-deleted product id=%s and its contents", product_id
@@ -349,101 +909,33 @@ async def list_products_by_category(
     Returns:
         Sequence of Product objects
     """
+    cache = await _snapshot()
+    if cache is not None:
+        return [
+            product
+            for product in cache.ordered()
+            if product.category is not None
+            and product.category.slug == category_slug
+            and (product.stock > 0 or not exclude_zero_stock)
+        ]
     pool = await get_pool()
-
-    # Build WHERE clause based on exclude_zero_stock
-    stock_filter = " AND p.stock > 0" if exclude_zero_stock else ""
-
-    rows = await pool.fetch(
-        f"""
-        SELECT
-            p.id,
-            p.code,
-            p.name,
-            p.description,
-            p.price_cents,
-            p.stock,
-            p.sold_count,
-            c.id AS category_id,
-            c.name AS category_name,
-            c.slug AS category_slug,
-            COALESCE(c.emoji, '🗂️') AS category_emoji
-        FROM products p
-        INNER JOIN categories c ON p.category_id = c.id
-        WHERE c.slug = $1
-          AND p.is_active = TRUE{stock_filter}
-        ORDER BY p.id ASC;
-        """,
-        category_slug,
+    query = (
+        LIST_PRODUCTS_BY_CATEGORY
+        if exclude_zero_stock
+        else LIST_PRODUCTS_BY_CATEGORY_ALL
     )
-    products = []
-    for row in rows:
-        data = dict(row)
-        category = Category(
-            id=data["category_id"],
-            name=data["category_name"],
-            slug=data["category_slug"],
-            emoji=data["category_emoji"],
-        )
-        products.append(
-            Product(
-                id=data["id"],
-                code=data["code"],
-                name=data["name"],
-                description=data["description"],
-                price_cents=data["price_cents"],
-                stock=data["stock"],
-                sold_count=data["sold_count"],
-                category=category,
-            )
-        )
-    return products
+    return await PRODUCT_MAPPER.fetch(pool, query, category_slug, readonly=True)
 
 
 async def get_product(product_id: int) -> Product | None:
     """Fetch single product by ID."""
+    cache = await _snapshot()
+    if cache is not None:
+        product = cache.products.get(product_id)
+        if product is not None:
+            return product
     pool = await get_pool()
-    row = await pool.fetchrow(
-        """
-        SELECT
-            p.id,
-            p.code,
-            p.name,
-            p.description,
-            p.price_cents,
-            p.stock,
-            p.sold_count,
-            c.id AS category_id,
-            c.name AS category_name,
-            c.slug AS category_slug,
-            COALESCE(c.emoji, '🗂️') AS category_emoji
-        FROM products p
-        LEFT JOIN categories c ON p.category_id = c.id
-        WHERE p.id = $1;
-        """,
-        product_id,
-    )
-    if row is None:
-        return None
-    data = dict(row)
-    category = None
-    if data.get("category_id"):
-        category = Category(
-            id=data["category_id"],
-            name=data["category_name"],
-            slug=data["category_slug"],
-            emoji=data["category_emoji"],
-        )
-    return Product(
-        id=data["id"],
-        code=data["code"],
-        name=data["name"],
-        description=data["description"],
-        price_cents=data["price_cents"],
-        stock=data["stock"],
-        sold_count=data["sold_count"],
-        category=category,
-    )
+    return await PRODUCT_MAPPER.fetchrow(pool, GET_PRODUCT, product_id)
 
 
 async def product_exists(product_id: int) -> bool:
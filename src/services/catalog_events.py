@@ -0,0 +1,45 @@
+"""Catalog change notifications (pg_notify) shared by every bot instance."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, List
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANNEL = "catalog_changed"
+RELOAD_PAYLOAD = "reload"
+
+# In-process subscribers, so this instance sees its own writes even when
+# LISTEN is unavailable (pgbouncer transaction mode).
+_local_listeners: List[Callable[[str], None]] = []
+
+
+def subscribe(listener: Callable[[str], None]) -> None:
+    _local_listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[str], None]) -> None:
+    if listener in _local_listeners:
+        _local_listeners.remove(listener)
+
+
+async def _publish(executor: Any, payload: str) -> None:
+    # pg_notify is transactional: other instances only hear it on commit.
+    await executor.execute("SELECT pg_notify($1, $2);", CATALOG_CHANNEL, payload)
+    for listener in list(_local_listeners):
+        try:
+            listener(payload)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.debug("[catalog_events] Listener gagal: %s", exc)
+
+
+async def notify_product_changed(executor: Any, product_id: int) -> None:
+    """Announce that one product row (stock, price, status...) changed."""
+    await _publish(executor, f"product:{int(product_id)}")
+
+
+async def notify_catalog_reload(executor: Any) -> None:
+    """Announce a bulk change that needs a full catalog reload."""
+    await _publish(executor, RELOAD_PAYLOAD)
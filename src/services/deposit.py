@@ -7,37 +7,24 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from src.services.postgres import get_pool
+from src.services.schema import ensure_schema, register_schema
 
 logger = logging.getLogger(__name__)
 
-
-async def _ensure_schema(connection) -> None:
-    """Ensure deposit table has required columns and indexes."""
-    await connection.execute(
-        "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS gateway_order_id TEXT"
-    )
-    await connection.execute(
-        "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS payable_cents BIGINT DEFAULT 0"
-    )
-    await connection.execute(
-        "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS fee_cents BIGINT DEFAULT 0"
-    )
-    await connection.execute(
-        "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ"
-    )
-    await connection.execute(
-        "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW()"
-    )
-    await connection.execute(
-        "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS completed_at TIMESTAMPTZ"
-    )
-    await connection.execute(
-        """
-        CREATE UNIQUE INDEX IF NOT EXISTS deposits_gateway_order_id_idx
-        ON deposits (gateway_order_id)
-        WHERE gateway_order_id IS NOT NULL
-        """
-    )
+register_schema(
+    "deposits",
+    "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS gateway_order_id TEXT",
+    "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS payable_cents BIGINT DEFAULT 0",
+    "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS fee_cents BIGINT DEFAULT 0",
+    "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ",
+    "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW()",
+    "ALTER TABLE deposits ADD COLUMN IF NOT EXISTS completed_at TIMESTAMPTZ",
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS deposits_gateway_order_id_idx
+    ON deposits (gateway_order_id)
+    WHERE gateway_order_id IS NOT NULL
+    """,
+)
 
 
 async def create_deposit(
@@ -84,10 +71,9 @@ async def create_deposit(
     if not method or not method.strip():
         raise ValueError("Method tidak boleh kosong")
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
-
         # Check if user exists
         user_exists = await connection.fetchval(
             "SELECT EXISTS(SELECT 1 FROM users WHERE id = $1)", user_id
@@ -187,10 +173,9 @@ async def create_manual_deposit(
     if not method or not method.strip():
         raise ValueError("Method tidak boleh kosong")
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
-
         # Check if user exists
         user_exists = await connection.fetchval(
             "SELECT EXISTS(SELECT 1 FROM users WHERE id = $1)", user_id
@@ -254,9 +239,9 @@ async def update_deposit_status(
             f"Status '{status}' tidak valid. Status valid: {', '.join(valid_statuses)}"
         )
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
         row = await connection.fetchrow(
             """
             UPDATE deposits
@@ -296,9 +281,9 @@ async def get_deposit_by_gateway(gateway_order_id: str) -> Optional[Dict[str, An
     if not gateway_order_id or not gateway_order_id.strip():
         return None
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
         row = await connection.fetchrow(
             """
             SELECT d.*, u.telegram_id, u.username
@@ -322,9 +307,9 @@ async def get_deposit_by_id(deposit_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Dict deposit dengan info user atau None jika tidak ditemukan
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
         row = await connection.fetchrow(
             """
             SELECT d.*, u.telegram_id, u.username
@@ -352,10 +337,9 @@ async def list_user_deposits(
     Returns:
         List deposits
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
-
         if include_pending:
             query = """
                 SELECT d.*, u.telegram_id, u.username
@@ -390,9 +374,9 @@ async def list_expired_deposits(limit: int = 10) -> List[Dict[str, Any]]:
     Returns:
         List expired deposits
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
         rows = await connection.fetch(
             """
             SELECT d.*, u.telegram_id, u.username
@@ -416,9 +400,9 @@ async def expire_old_deposits() -> int:
     Returns:
         Jumlah deposits yang di-expire
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
         result = await connection.execute(
             """
             UPDATE deposits
@@ -450,9 +434,9 @@ async def get_deposit_stats() -> Dict[str, Any]:
     Returns:
         Dict dengan berbagai statistik deposit
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
         stats = await connection.fetchrow(
             """
             SELECT
@@ -483,10 +467,9 @@ async def delete_deposit(deposit_id: int) -> None:
     Raises:
         ValueError: Jika deposit tidak dapat dihapus
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
-
         # Check current status
         deposit = await connection.fetchrow(
             "SELECT id, status FROM deposits WHERE id = $1 LIMIT 1;", deposit_id
@@ -525,10 +508,9 @@ async def cancel_deposit(deposit_id: int, reason: str | None = None) -> Dict[str
     Raises:
         ValueError: Jika deposit tidak dapat dicancel
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_schema(connection)
-
         # Check current status
         deposit = await connection.fetchrow(
             "SELECT id, status, gateway_order_id FROM deposits WHERE id = $1 LIMIT 1;",
@@ -28,12 +28,29 @@ def _lock_key(name: str) -> int:
 async def distributed_lock(name: str) -> AsyncIterator[None]:
     """Acquire an advisory lock identified by ``name``.
 
-    Releases the lock automatically when the context exits.
+    Releases the lock automatically when the context exits. Behind pgbouncer
+    (transaction pooling) a session lock could be taken and released on
+    different server connections, so the lock is taken with
+    ``pg_try_advisory_xact_lock`` inside a transaction that stays open for
+    the duration of the block instead.
     """
 
     pool = await get_pool()
     lock_id = _lock_key(name)
-    async with pool.acquire() as connection:
+    if pool.pgbouncer:
+        async with pool.side_connection() as connection:
+            async with connection.transaction():
+                acquired = await connection.fetchval(
+                    "SELECT pg_try_advisory_xact_lock($1);", lock_id
+                )
+                if not acquired:
+                    logger.debug("[lock] %s already held by another worker.", name)
+                    raise LockNotAcquired(f"Lock '{name}' is already held.")
+                yield
+            logger.debug("[lock] %s released.", name)
+        return
+
+    async with pool.side_connection() as connection:
         acquired = await connection.fetchval(
             "SELECT pg_try_advisory_lock($1);", lock_id
         )
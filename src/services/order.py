@@ -6,11 +6,28 @@ import logging
 from typing import List, Dict, Any
 from uuid import UUID
 
-from src.services.postgres import get_pool
+import asyncpg
+
+from src.services.postgres import Priority, admitted_at, get_pool
+from src.services.product_content import release_order_reservations
+from src.services.schema import ensure_schema, register_schema
 from src.services.terms import schedule_terms_notifications
 
 logger = logging.getLogger(__name__)
 
+register_schema(
+    "order",
+    """
+    CREATE TABLE IF NOT EXISTS order_manual_verifications (
+        id BIGSERIAL PRIMARY KEY,
+        order_id UUID NOT NULL,
+        admin_id BIGINT NOT NULL,
+        note TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+)
+
 
 async def list_orders_by_user(
     user_id: int, limit: int = 10
@@ -26,7 +43,7 @@ async def list_orders_by_user(
         List of orders with payment info
     """
     pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with pool.acquire(readonly=True) as conn:
         rows = await conn.fetch(
             """
             SELECT
@@ -58,7 +75,7 @@ async def list_orders(limit: int = 50) -> List[Dict[str, Any]]:
         List order dengan info user
     """
     pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with pool.acquire(readonly=True) as conn:
         rows = await conn.fetch(
             """
             SELECT o.*, u.telegram_id, u.username
@@ -281,6 +298,7 @@ async def ensure_order_can_transition(
     if normalized_status not in sensitive_statuses:
         return
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         order_row = await conn.fetchrow(
@@ -320,19 +338,6 @@ async def ensure_order_can_transition(
                 "Order belum memiliki pembayaran terverifikasi. Sertakan catatan singkat (mis. nomor resi transfer)."
             )
 
-        # Create table if not exists
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS order_manual_verifications (
-                id BIGSERIAL PRIMARY KEY,
-                order_id UUID NOT NULL,
-                admin_id BIGINT NOT NULL,
-                note TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW()
-            );
-            """
-        )
-
         # Record manual verification
         await conn.execute(
             """
@@ -475,11 +480,11 @@ async def cancel_order(order_id: str | UUID, reason: str | None = None) -> None:
         except (ValueError, TypeError) as e:
             raise ValueError(f"Format order_id tidak valid: {order_id}") from e
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        # Check current status
+    async def _cancel(conn: asyncpg.Connection) -> int:
+        # Lock the row so a concurrent settlement cannot interleave.
         order = await conn.fetchrow(
-            "SELECT id, status FROM orders WHERE id = $1 LIMIT 1;", order_id
+            "SELECT id, status FROM orders WHERE id = $1 LIMIT 1 FOR UPDATE;",
+            order_id,
         )
 
         if not order:
@@ -503,12 +508,21 @@ async def cancel_order(order_id: str | UUID, reason: str | None = None) -> None:
             order_id,
             reason or "Dibatalkan oleh sistem",
         )
+        return await release_order_reservations(conn, order_id)
 
-        logger.info(
-            "[order] Cancelled order %s with reason: %s", order_id, reason or "N/A"
-        )
+    await ensure_schema()
+    pool = await get_pool()
+    released = await pool.run_transaction(_cancel, name="order.cancel_order")
 
+    logger.info(
+        "[order] Cancelled order %s with reason: %s (%s konten dilepas)",
+        order_id,
+        reason or "N/A",
+        released,
+    )
 
+
+@admitted_at(Priority.BACKGROUND)
 async def get_order_stats() -> Dict[str, Any]:
     """
     Ambil statistik order.
@@ -517,7 +531,7 @@ async def get_order_stats() -> Dict[str, Any]:
         Dict dengan berbagai statistik order
     """
     pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with pool.acquire(readonly=True) as conn:
         stats = await conn.fetchrow(
             """
             SELECT
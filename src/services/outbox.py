@@ -0,0 +1,258 @@
+"""Transactional outbox: side effects recorded with the state change that causes them."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from src.services.postgres import Priority, get_pool, priority
+from src.services.queries import define_query, purge_in_batches
+from src.services.schema import ensure_schema, register_schema
+
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+register_schema(
+    "outbox",
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id BIGSERIAL PRIMARY KEY,
+        topic VARCHAR(64) NOT NULL,
+        payload JSONB NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        locked_until TIMESTAMPTZ,
+        processed_at TIMESTAMPTZ
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_outbox_ready
+        ON outbox (available_at, id)
+        WHERE status IN ('pending', 'processing');
+    """,
+)
+register_schema(
+    "outbox_retention",
+    """
+    CREATE INDEX IF NOT EXISTS idx_outbox_done
+        ON outbox (processed_at)
+        WHERE status = 'done';
+    """,
+)
+
+ENQUEUE = define_query(
+    "outbox.enqueue",
+    "INSERT INTO outbox (topic, payload) VALUES ($1, $2::jsonb);",
+)
+# Same lease scheme as webhook_inbox. $1 = batch size, $2 = lease.
+CLAIM_BATCH = define_query(
+    "outbox.claim_batch",
+    """
+    UPDATE outbox o
+    SET status = 'processing',
+        attempts = o.attempts + 1,
+        locked_until = NOW() + $2::interval
+    FROM (
+        SELECT id
+        FROM outbox
+        WHERE available_at <= NOW()
+          AND (
+              status = 'pending'
+              OR (status = 'processing' AND locked_until < NOW())
+          )
+        ORDER BY available_at, id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    ) ready
+    WHERE o.id = ready.id
+    RETURNING o.id, o.topic, o.payload, o.attempts;
+    """,
+)
+MARK_DONE = define_query(
+    "outbox.mark_done",
+    """
+    UPDATE outbox
+    SET status = 'done', last_error = NULL, locked_until = NULL, processed_at = NOW()
+    WHERE id = ANY($1::bigint[]);
+    """,
+)
+MARK_DEAD = define_query(
+    "outbox.mark_dead",
+    """
+    UPDATE outbox
+    SET status = 'dead', last_error = $2, locked_until = NULL, processed_at = NOW()
+    WHERE id = $1;
+    """,
+)
+RETRY = define_query(
+    "outbox.retry",
+    """
+    UPDATE outbox
+    SET status = 'pending',
+        last_error = $2,
+        locked_until = NULL,
+        available_at = NOW() + $3::interval
+    WHERE id = $1;
+    """,
+)
+
+# Delivered events only; dead letters stay until someone looks at them.
+# $1 = age, $2 = batch size.
+PURGE_DONE = define_query(
+    "outbox.purge_done",
+    """
+    DELETE FROM outbox
+    WHERE id IN (
+        SELECT id
+        FROM outbox
+        WHERE status = 'done'
+          AND processed_at < NOW() - $1::interval
+        LIMIT $2
+    );
+    """,
+)
+
+_dispatchers: List["OutboxDispatcher"] = []
+
+
+async def enqueue_outbox(connection: Any, topic: str, payload: Dict[str, Any]) -> None:
+    """Record a side effect inside the caller's transaction.
+
+    Call :func:`wake_outbox` after the transaction commits so the local
+    dispatcher picks it up without waiting for its poll interval.
+    """
+    await ENQUEUE.execute(connection, topic, json.dumps(payload, default=str))
+
+
+async def purge_outbox(
+    *, retention_days: int, batch_size: int = 5000, max_batches: int = 20
+) -> int:
+    """Delete delivered events older than ``retention_days``."""
+    await ensure_schema()
+    pool = await get_pool()
+    return await purge_in_batches(
+        pool, PURGE_DONE, timedelta(days=retention_days), batch_size, max_batches
+    )
+
+
+def wake_outbox() -> None:
+    for dispatcher in _dispatchers:
+        dispatcher.wake()
+
+
+class OutboxDispatcher:
+    """Drain ``outbox`` in batches and run the handler registered per topic.
+
+    Handlers must be idempotent: delivery is at-least-once. A failing event
+    is retried with exponential backoff and dead-lettered (``status='dead'``)
+    after ``max_attempts`` or when no handler exists for its topic.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, OutboxHandler],
+        *,
+        batch_size: int = 20,
+        max_attempts: int = 10,
+        poll_interval: float = 5.0,
+        lease_seconds: int = 300,
+    ) -> None:
+        self._handlers = dict(handlers)
+        self._batch_size = batch_size
+        self._max_attempts = max(1, max_attempts)
+        self._poll_interval = poll_interval
+        self._lease = timedelta(seconds=lease_seconds)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        _dispatchers.append(self)
+        self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self in _dispatchers:
+            _dispatchers.remove(self)
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        with priority(Priority.BACKGROUND):
+            await self._loop()
+
+    async def _loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[outbox] Gagal mengambil event: %s", exc)
+                processed = 0
+            if processed >= self._batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """Claim and run one batch; returns the number of events claimed."""
+        await ensure_schema()
+        pool = await get_pool()
+        rows = await CLAIM_BATCH.fetch(pool, self._batch_size, self._lease)
+        if not rows:
+            return 0
+        outcomes = await asyncio.gather(*(self._handle(row) for row in rows))
+        done = [row["id"] for row, ok in zip(rows, outcomes) if ok]
+        if done:
+            await MARK_DONE.execute(pool, done)
+        return len(rows)
+
+    async def _handle(self, row: Any) -> bool:
+        topic = row["topic"]
+        payload = row["payload"]
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        handler = self._handlers.get(topic)
+        pool = await get_pool()
+        if handler is None:
+            await MARK_DEAD.execute(pool, row["id"], f"Tidak ada handler untuk {topic}")
+            logger.error("[outbox] Event %s (%s) tanpa handler.", row["id"], topic)
+            return False
+        try:
+            await handler(payload)
+        except Exception as exc:
+            error = repr(exc)
+            if row["attempts"] >= self._max_attempts:
+                await MARK_DEAD.execute(pool, row["id"], error)
+                logger.error(
+                    "[outbox] Event %s (%s) dead-letter setelah %s percobaan: %s",
+                    row["id"],
+                    topic,
+                    row["attempts"],
+                    error,
+                )
+            else:
+                delay = timedelta(seconds=min(2 ** row["attempts"], 600))
+                await RETRY.execute(pool, row["id"], error, delay)
+                logger.warning(
+                    "[outbox] Event %s (%s) diulang: %s", row["id"], topic, error
+                )
+            return False
+        return True
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Sequence
+from typing import Sequence, Tuple
 
 import httpx
 
@@ -12,6 +13,32 @@ from src.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+_FANOUT_CONCURRENCY = 8
+
+# Keep-alive client bound to the event loop that created it. Calls from other
+# loops (asyncio.run in backup/log threads) get a short-lived client instead.
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _shared_client() -> Tuple[httpx.AsyncClient, bool]:
+    """Return (client, close_after_use) for the running loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop.is_closed():
+        _client = httpx.AsyncClient(timeout=10.0)
+        _client_loop = loop
+    if _client_loop is loop:
+        return _client, False
+    return httpx.AsyncClient(timeout=10.0), True
+
+
+async def close_owner_client() -> None:
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
 
 async def notify_owners(
     message: str,
@@ -37,18 +64,18 @@ async def notify_owners(
 
     close_client = False
     if client is None:
-        client = httpx.AsyncClient(timeout=10.0)
-        close_client = True
+        client, close_client = _shared_client()
+    semaphore = asyncio.Semaphore(_FANOUT_CONCURRENCY)
 
-    try:
-        for owner_id in owner_ids:
-            payload = {
-                "chat_id": owner_id,
-                "text": message,
-                "disable_notification": disable_notification,
-            }
-            if parse_mode:
-                payload["parse_mode"] = parse_mode
+    async def _send(owner_id: int) -> None:
+        payload = {
+            "chat_id": owner_id,
+            "text": message,
+            "disable_notification": disable_notification,
+        }
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        async with semaphore:
             try:
                 response = await client.post(url, json=payload)
                 if response.is_error:
@@ -63,6 +90,9 @@ async def notify_owners(
                     owner_id,
                     exc,
                 )
+
+    try:
+        await asyncio.gather(*(_send(owner_id) for owner_id in dict.fromkeys(owner_ids)))
     finally:
         if close_client:
             await client.aclose()
@@ -4,19 +4,26 @@ from __future__ import annotations
 
 import logging
 import asyncio
-from datetime import datetime, timezone
-from typing import Dict, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
 from uuid import uuid4, UUID
 
+import asyncpg
+
 from src.core.audit import audit_log
+from src.core.config import get_settings
 from src.core.telemetry import TelemetryTracker
 from src.core.currency import calculate_gateway_fee
 from src.services.cart import Cart
 from src.services.catalog import Product
 from src.services.pakasir import PakasirClient
+from src.services.outbox import OutboxHandler, enqueue_outbox, wake_outbox
 from src.services.owner_alerts import notify_owners
 from src.services.postgres import get_pool
+from src.services.queries import define_query
+from src.services.schema import ensure_schema, register_schema
 from src.services.users import upsert_user, update_balance
+from src.services.telegram_sender import TelegramSender, get_telegram_sender
 from src.services.terms import schedule_terms_notifications
 from src.services.payment_messages import delete_payment_messages
 from src.services.deposit import (
@@ -25,14 +32,131 @@ from src.services.deposit import (
     update_deposit_status,
 )
 from src.services.product_content import (
-    get_available_content,
-    mark_content_as_used,
+    allocate_order_contents,
     get_order_contents,
+    release_order_reservations,
+    reserve_order_contents,
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Outbox topics written by mark_payment_completed, see outbox_handlers().
+PAYMENT_COMPLETED_EFFECTS = (
+    "payment.deliver_contents",
+    "payment.schedule_terms",
+    "payment.audit",
+    "payment.delete_messages",
+    "payment.notify_admins",
+)
+
+register_schema(
+    "payment",
+    """
+    CREATE TABLE IF NOT EXISTS payment_manual_reviews (
+        id BIGSERIAL PRIMARY KEY,
+        order_id BIGINT NOT NULL,
+        telegram_user_id BIGINT,
+        telegram_username TEXT,
+        amount_cents BIGINT NOT NULL,
+        note TEXT,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+)
+
+# Upserts the user and inserts the order, its items (from parallel arrays)
+# and the payment row in one statement. $1-$4 user, $5 total, $6-$8 items,
+# $9 gateway order id, $10 method, $11 fee, $12 payable.
+CREATE_ORDER = define_query(
+    "payment.create_order",
+    """
+    WITH customer AS (
+        INSERT INTO users (telegram_id, username, first_name, last_name)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (telegram_id)
+        DO UPDATE SET
+            username = EXCLUDED.username,
+            first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            updated_at = NOW()
+        RETURNING id
+    ),
+    new_order AS (
+        INSERT INTO orders (user_id, total_price_cents, status)
+        SELECT id, $5, 'awaiting_payment' FROM customer
+        RETURNING id, created_at
+    ),
+    items AS (
+        INSERT INTO order_items (order_id, product_id, quantity, unit_price_cents)
+        SELECT o.id, i.product_id, i.quantity, i.unit_price_cents
+        FROM new_order o
+        CROSS JOIN unnest($6::int[], $7::int[], $8::bigint[])
+            AS i(product_id, quantity, unit_price_cents)
+    ),
+    payment AS (
+        INSERT INTO payments (
+            order_id,
+            gateway_order_id,
+            method,
+            status,
+            amount_cents,
+            fee_cents,
+            total_payment_cents,
+            created_at,
+            updated_at,
+            expires_at
+        )
+        SELECT id, $9, $10, 'created', $5, $11, $12, NOW(), NOW(), NULL
+        FROM new_order
+        RETURNING id
+    )
+    SELECT o.id, o.created_at
+    FROM new_order o, payment;
+    """,
+)
+# Stores the gateway expiry and stretches the order's reservations to it
+# (plus a grace period for the expiry webhook).
+SET_PAYMENT_EXPIRY = define_query(
+    "payment.set_payment_expiry",
+    """
+    WITH payment AS (
+        UPDATE payments
+        SET expires_at = $2
+        WHERE gateway_order_id = $1
+        RETURNING order_id
+    )
+    UPDATE product_contents pc
+    SET reserved_until = $2::timestamptz + INTERVAL '5 minutes'
+    FROM payment
+    WHERE pc.reserved_by_order_id = payment.order_id
+      AND pc.is_used = FALSE;
+    """,
+)
+LOCK_PAYMENT_FOR_UPDATE = define_query(
+    "payment.lock_payment_for_update",
+    """
+    SELECT
+        order_id,
+        status,
+        amount_cents,
+        fee_cents,
+        total_payment_cents
+    FROM payments
+    WHERE gateway_order_id = $1
+    FOR UPDATE;
+    """,
+)
+LOCK_PAYMENT_STATUS_FOR_UPDATE = define_query(
+    "payment.lock_payment_status_for_update",
+    """
+    SELECT order_id, status
+    FROM payments
+    WHERE gateway_order_id = $1
+    FOR UPDATE;
+    """,
+)
+
 
 def _parse_iso_datetime(iso_string: str | datetime | None) -> datetime | None:
     """Parse ISO 8601 datetime string to datetime object.
@@ -69,14 +193,22 @@ class PaymentService:
     """Coordinate order creation, invoice generation, and telemetry."""
 
     def __init__(
-        self, pakasir_client: PakasirClient, telemetry: TelemetryTracker
+        self,
+        pakasir_client: PakasirClient,
+        telemetry: TelemetryTracker,
+        sender: TelegramSender | None = None,
     ) -> None:
         self._pakasir_client = pakasir_client
         self._telemetry = telemetry
+        self._sender_override = sender
         self._failure_lock = asyncio.Lock()
         self._consecutive_failures = 0
         self._alert_threshold = 3
 
+    @property
+    def _sender(self) -> TelegramSender:
+        return self._sender_override or get_telegram_sender()
+
     async def _register_failure(self, reason: str) -> None:
         async with self._failure_lock:
             self._consecutive_failures += 1
@@ -108,76 +240,52 @@ class PaymentService:
             raise PaymentError("Cart is empty.")
 
         logger.info("🛒 Creating order for user %s", telegram_user.get("id"))
-        user_id = await upsert_user(
-            telegram_id=int(telegram_user["id"]),
-            username=telegram_user.get("username"),
-            first_name=telegram_user.get("first_name"),
-            last_name=telegram_user.get("last_name"),
-        )
-
         total_cents = cart.total_cents()
         # Calculate fee for display only - Pakasir will add it automatically
         fee_cents = calculate_gateway_fee(total_cents) if method != "deposit" else 0
         payable_cents = total_cents + fee_cents
         gateway_order_id = f"tg{telegram_user['id']}-{uuid4().hex[:8]}"
+        reserved_until = datetime.now(timezone.utc) + timedelta(
+            minutes=get_settings().content_reservation_minutes
+        )
+        items = list(cart.items.values())
+
+        async def _create(connection: asyncpg.Connection) -> UUID:
+            # User, order, items and payment in one round trip.
+            order_row = await CREATE_ORDER.fetchrow(
+                connection,
+                int(telegram_user["id"]),
+                telegram_user.get("username"),
+                telegram_user.get("first_name"),
+                telegram_user.get("last_name"),
+                total_cents,
+                [item.product.id for item in items],
+                [item.quantity for item in items],
+                [item.product.price_cents for item in items],
+                gateway_order_id,
+                method,
+                fee_cents,
+                payable_cents,
+            )
+            if order_row is None:
+                raise PaymentError("Failed to create order.")
+            order_id = order_row["id"]
 
-        pool = await get_pool()
-        async with pool.acquire() as connection:
-            async with connection.transaction():
-                order_row = await connection.fetchrow(
-                    """
-                    INSERT INTO orders (user_id, total_price_cents, status)
-                    VALUES ($1, $2, 'awaiting_payment')
-                    RETURNING id, created_at;
-                    """,
-                    user_id,
-                    total_cents,
-                )
-                if order_row is None:
-                    raise PaymentError("Failed to create order.")
-                order_id = order_row["id"]
-
-                for item in cart.items.values():
-                    if item.quantity > item.product.stock:
-                        raise PaymentError(
-                            f"Stok tidak cukup untuk {item.product.name}."
-                        )
-
-                    await connection.execute(
-                        """
-                        INSERT INTO order_items (order_id, product_id, quantity, unit_price_cents)
-                        VALUES ($1, $2, $3, $4);
-                        """,
-                        order_id,
-                        item.product.id,
-                        item.quantity,
-                        item.product.price_cents,
-                    )
+            # Hold the contents now so a paid order never finds them sold.
+            reservations = await reserve_order_contents(
+                connection, order_id, reserved_until
+            )
+            for reservation in reservations:
+                if reservation["reserved"] < reservation["quantity"]:
+                    item = cart.items[reservation["product_id"]]
+                    raise PaymentError(f"Stok tidak cukup untuk {item.product.name}.")
+            return order_id
 
-                # Initialize payment record with expires_at placeholder
-                await connection.execute(
-                    """
-                    INSERT INTO payments (
-                        order_id,
-                        gateway_order_id,
-                        method,
-                        status,
-                        amount_cents,
-                        fee_cents,
-                        total_payment_cents,
-                        created_at,
-                        updated_at,
-                        expires_at
-                    )
-                    VALUES ($1, $2, $3, 'created', $4, $5, $6, NOW(), NOW(), NULL);
-                    """,
-                    order_id,
-                    gateway_order_id,
-                    method,
-                    total_cents,
-                    fee_cents,
-                    payable_cents,
-                )
+        await ensure_schema()
+        pool = await get_pool()
+        order_id = await pool.run_transaction(
+            _create, name="payment.create_invoice"
+        )
 
         if method == "deposit":
             # Catat pembayaran manual yang perlu verifikasi owner.
@@ -196,6 +304,16 @@ class PaymentService:
                 )
             except Exception as exc:  # pragma: no cover - network failure
                 await self._register_failure(str(exc))
+                # No invoice exists, so free the reserved contents right away
+                # instead of waiting for reserved_until and the reconcile job.
+                try:
+                    await self.mark_payment_failed(gateway_order_id)
+                except Exception as release_exc:
+                    logger.error(
+                        "[payment] Gagal melepas reservasi %s: %s",
+                        gateway_order_id,
+                        release_exc,
+                    )
                 raise PaymentError(
                     "Gateway pembayaran sedang bermasalah, coba lagi sebentar lagi."
                 ) from exc
@@ -208,17 +326,10 @@ class PaymentService:
                 # Parse ISO datetime string to datetime object for asyncpg
                 expires_at = _parse_iso_datetime(expires_at_str)
                 if expires_at:
-                    pool = await get_pool()
-                    async with pool.acquire() as connection:
-                        await connection.execute(
-                            """
-                            UPDATE payments
-                            SET expires_at = $2
-                            WHERE gateway_order_id = $1;
-                            """,
-                            gateway_order_id,
-                            expires_at,
-                        )
+                    # The reservation lives as long as the invoice.
+                    await SET_PAYMENT_EXPIRY.execute(
+                        pool, gateway_order_id, expires_at
+                    )
                     logger.info(
                         "[payment] Saved expires_at for %s: %s",
                         gateway_order_id,
@@ -309,231 +420,193 @@ class PaymentService:
         self, gateway_order_id: str, amount_cents: int
     ) -> None:
         """Set payment and order status to completed."""
-        pool = await get_pool()
-        async with pool.acquire() as connection:
-            async with connection.transaction():
-                payment_row = await connection.fetchrow(
-                    """
-                    SELECT
-                        order_id,
-                        status,
-                        amount_cents,
-                        fee_cents,
-                        total_payment_cents
-                    FROM payments
-                    WHERE gateway_order_id = $1
-                    FOR UPDATE;
-                    """,
-                    gateway_order_id,
-                )
-                if payment_row is None:
-                    logger.warning("Payment not found for %s", gateway_order_id)
-                    raise PaymentError("Payment tidak ditemukan.")
 
-                if payment_row["status"] == "completed":
-                    logger.info(
-                        "[payment_replay] Gateway %s sudah ditandai selesai, abaikan webhook ulang.",
-                        gateway_order_id,
-                    )
-                    return
-
-                stored_total = int(payment_row.get("total_payment_cents") or 0)
-                if stored_total != amount_cents:
-                    logger.error(
-                        "[payment_mismatch] Amount gateway %s tidak cocok. stored=%s gateway=%s",
-                        gateway_order_id,
-                        stored_total,
-                        amount_cents,
-                    )
-                    raise PaymentError("Nominal pembayaran tidak cocok.")
-
-                order_id = payment_row["order_id"]
-                order_row = await connection.fetchrow(
-                    """
-                    SELECT total_price_cents FROM orders WHERE id = $1 LIMIT 1;
-                    """,
-                    order_id,
-                )
-                base_amount = int(payment_row.get("amount_cents") or 0)
-                if (
-                    order_row
-                    and int(order_row["total_price_cents"] or 0) != base_amount
-                ):
-                    logger.error(
-                        "[payment_mismatch] Order %s total tidak sesuai dengan pembayaran %s",
-                        order_id,
-                        gateway_order_id,
-                    )
-                    raise PaymentError("Nominal order tidak sesuai.")
+        async def _complete(connection: asyncpg.Connection) -> UUID | None:
+            payment_row = await LOCK_PAYMENT_FOR_UPDATE.fetchrow(
+                connection, gateway_order_id
+            )
+            if payment_row is None:
+                logger.warning("Payment not found for %s", gateway_order_id)
+                raise PaymentError("Payment tidak ditemukan.")
 
-                await connection.execute(
-                    """
-                    UPDATE payments
-                    SET status = 'completed',
-                        updated_at = NOW()
-                    WHERE gateway_order_id = $1;
-                    """,
+            if payment_row["status"] == "completed":
+                logger.info(
+                    "[payment_replay] Gateway %s sudah ditandai selesai, abaikan webhook ulang.",
                     gateway_order_id,
                 )
+                return None
 
-                await connection.execute(
-                    """
-                    UPDATE orders
-                    SET status = 'paid',
-                        updated_at = NOW()
-                    WHERE id = $1;
-                    """,
-                    order_id,
+            stored_total = int(payment_row.get("total_payment_cents") or 0)
+            if stored_total != amount_cents:
+                logger.error(
+                    "[payment_mismatch] Amount gateway %s tidak cocok. stored=%s gateway=%s",
+                    gateway_order_id,
+                    stored_total,
+                    amount_cents,
                 )
+                raise PaymentError("Nominal pembayaran tidak cocok.")
 
-                # Allocate product contents for the order
-                order_items = await connection.fetch(
-                    """
-                    SELECT product_id, quantity
-                    FROM order_items
-                    WHERE order_id = $1;
-                    """,
+            order_id = payment_row["order_id"]
+            order_row = await connection.fetchrow(
+                """
+                SELECT total_price_cents FROM orders WHERE id = $1 LIMIT 1;
+                """,
+                order_id,
+            )
+            base_amount = int(payment_row.get("amount_cents") or 0)
+            if (
+                order_row
+                and int(order_row["total_price_cents"] or 0) != base_amount
+            ):
+                logger.error(
+                    "[payment_mismatch] Order %s total tidak sesuai dengan pembayaran %s",
                     order_id,
+                    gateway_order_id,
                 )
+                raise PaymentError("Nominal order tidak sesuai.")
+
+            await connection.execute(
+                """
+                UPDATE payments
+                SET status = 'completed',
+                    updated_at = NOW()
+                WHERE gateway_order_id = $1;
+                """,
+                gateway_order_id,
+            )
 
-                # Process outside transaction to avoid deadlocks
-                pass  # Content allocation will happen after transaction
-
-        # Allocate product contents after transaction completes
-        pool = await get_pool()
-        async with pool.acquire() as connection:
-            for item in order_items:
-                product_id = item["product_id"]
-                quantity = item["quantity"]
-
-                # Get available contents for this product
-                available_contents = await get_available_content(product_id, quantity)
+            await connection.execute(
+                """
+                UPDATE orders
+                SET status = 'paid',
+                    updated_at = NOW()
+                WHERE id = $1;
+                """,
+                order_id,
+            )
 
-                if len(available_contents) < quantity:
-                    logger.error(
-                        "[stock_error] Insufficient content stock for product %s. "
-                        "Required: %s, Available: %s for order %s",
-                        product_id,
-                        quantity,
-                        len(available_contents),
-                        order_id,
-                    )
-                    # Still mark what we have as used
-                    for content in available_contents:
-                        await mark_content_as_used(content["id"], UUID(str(order_id)))
-                else:
-                    # Mark all required contents as used
-                    for content in available_contents:
-                        await mark_content_as_used(content["id"], UUID(str(order_id)))
+            # Claim contents and bump stock/sold_count with the status change.
+            await allocate_order_contents(connection, order_id)
 
-                # Increment sold count for product
-                await connection.execute(
-                    """
-                    UPDATE products
-                    SET sold_count = sold_count + $2,
-                        updated_at = NOW()
-                    WHERE id = $1;
-                    """,
-                    product_id,
-                    quantity,
-                )
+            # Side effects commit (or roll back) with the status change and
+            # are run by the outbox dispatcher.
+            effect = {
+                "gateway_order_id": gateway_order_id,
+                "order_id": str(order_id),
+                "amount_cents": amount_cents,
+            }
+            for topic in PAYMENT_COMPLETED_EFFECTS:
+                await enqueue_outbox(connection, topic, effect)
+            return order_id
 
-        # Send product contents to customer
-        await self._send_product_contents_to_customer(str(order_id))
+        await ensure_schema()
+        pool = await get_pool()
+        order_id = await pool.run_transaction(
+            _complete, name="payment.mark_payment_completed"
+        )
+        if order_id is None:
+            return
+        wake_outbox()
 
-        await schedule_terms_notifications(str(order_id))
         await self._telemetry.increment("successful_transactions")
         logger.info(
             "[payment_completed] Order %s sukses dari gateway %s",
             order_id,
             gateway_order_id,
         )
-        audit_log(
-            actor_id=None,
-            action="payment.completed",
-            details={
-                "gateway_order_id": gateway_order_id,
-                "order_id": int(order_id),
-                "amount_cents": amount_cents,
-            },
-        )
-        await delete_payment_messages(gateway_order_id)
 
-        # Notify admins about successful payment
-        await self._notify_admins_payment_success(gateway_order_id, str(order_id))
+    def outbox_handlers(self) -> Dict[str, OutboxHandler]:
+        """Handlers for the effects enqueued by :meth:`mark_payment_completed`."""
+
+        async def deliver_contents(effect: Dict[str, Any]) -> None:
+            await self._send_product_contents_to_customer(effect["order_id"])
+
+        async def schedule_terms(effect: Dict[str, Any]) -> None:
+            await schedule_terms_notifications(effect["order_id"])
+
+        async def write_audit(effect: Dict[str, Any]) -> None:
+            audit_log(
+                actor_id=None,
+                action="payment.completed",
+                details={
+                    "gateway_order_id": effect["gateway_order_id"],
+                    "order_id": int(UUID(effect["order_id"])),
+                    "amount_cents": effect["amount_cents"],
+                },
+            )
+
+        async def clear_messages(effect: Dict[str, Any]) -> None:
+            await delete_payment_messages(effect["gateway_order_id"])
+
+        async def notify_admins(effect: Dict[str, Any]) -> None:
+            await self._notify_admins_payment_success(
+                effect["gateway_order_id"], effect["order_id"]
+            )
+
+        return {
+            "payment.deliver_contents": deliver_contents,
+            "payment.schedule_terms": schedule_terms,
+            "payment.audit": write_audit,
+            "payment.delete_messages": clear_messages,
+            "payment.notify_admins": notify_admins,
+        }
 
     async def mark_payment_failed(self, gateway_order_id: str) -> None:
         """Mark payment as failed/expired."""
-        pool = await get_pool()
-        order_id: int | None = None
-        async with pool.acquire() as connection:
-            async with connection.transaction():
-                payment_row = await connection.fetchrow(
-                    """
-                    SELECT order_id, status
-                    FROM payments
-                    WHERE gateway_order_id = $1
-                    FOR UPDATE;
-                    """,
+
+        async def _fail(connection: asyncpg.Connection) -> int | None:
+            payment_row = await LOCK_PAYMENT_STATUS_FOR_UPDATE.fetchrow(
+                connection, gateway_order_id
+            )
+            if payment_row is None:
+                logger.warning("Payment not found for %s", gateway_order_id)
+                return None
+
+            if payment_row["status"] == "failed":
+                logger.info(
+                    "[payment_replay] Payment %s sudah gagal sebelumnya.",
                     gateway_order_id,
                 )
-                if payment_row is None:
-                    logger.warning("Payment not found for %s", gateway_order_id)
-                    return
+                return None
 
-                if payment_row["status"] == "failed":
-                    logger.info(
-                        "[payment_replay] Payment %s sudah gagal sebelumnya.",
-                        gateway_order_id,
-                    )
-                    return
+            order_id = payment_row["order_id"]
 
-                order_id = payment_row["order_id"]
+            await connection.execute(
+                """
+                UPDATE payments
+                SET status = 'failed',
+                    updated_at = NOW()
+                WHERE gateway_order_id = $1;
+                """,
+                gateway_order_id,
+            )
 
-                await connection.execute(
-                    """
-                    UPDATE payments
-                    SET status = 'failed',
-                        updated_at = NOW()
-                    WHERE gateway_order_id = $1;
-                    """,
-                    gateway_order_id,
-                )
+            await connection.execute(
+                """
+                UPDATE orders
+                SET status = 'cancelled',
+                    updated_at = NOW()
+                WHERE id = $1 AND status <> 'paid';
+                """,
+                order_id,
+            )
 
-                await connection.execute(
-                    """
-                    UPDATE orders
-                    SET status = 'cancelled',
-                        updated_at = NOW()
-                    WHERE id = $1 AND status <> 'paid';
-                    """,
-                    order_id,
-                )
+            released = await release_order_reservations(connection, order_id)
+            logger.info(
+                "[payment_failed] %s konten order %s dilepas karena payment %s gagal.",
+                released,
+                order_id,
+                gateway_order_id,
+            )
+            return order_id
 
-                order_items = await connection.fetch(
-                    """
-                    SELECT product_id, quantity
-                    FROM order_items
-                    WHERE order_id = $1;
-                    """,
-                    order_id,
-                )
-                for item in order_items:
-                    await connection.execute(
-                        """
-                        UPDATE products
-                        SET stock = stock + $2,
-                            updated_at = NOW()
-                        WHERE id = $1;
-                        """,
-                        item["product_id"],
-                        item["quantity"],
-                    )
-                logger.info(
-                    "[payment_failed] Restock order %s karena payment %s gagal.",
-                    order_id,
-                    gateway_order_id,
-                )
+        await ensure_schema()
+        pool = await get_pool()
+        order_id = await pool.run_transaction(
+            _fail, name="payment.mark_payment_failed"
+        )
+        if order_id is None:
+            return
         await self._telemetry.increment("failed_transactions")
         audit_log(
             actor_id=None,
@@ -545,14 +618,12 @@ class PaymentService:
         )
 
     async def _send_product_contents_to_customer(self, order_id: str) -> None:
-        """Send product contents and SNK to customer after successful payment."""
+        """Send product contents and SNK to customer after successful payment.
+
+        Raises on failure so the outbox retries the delivery.
+        """
         try:
-            from telegram import Bot
             from telegram.constants import ParseMode
-            from src.core.config import get_settings
-
-            settings = get_settings()
-            bot = Bot(token=settings.telegram_bot_token)
 
             # Get order and user details
             pool = await get_pool()
@@ -624,19 +695,19 @@ class PaymentService:
 
                 full_message = "".join(message_parts)
 
-                # Send to customer
-                await bot.send_message(
-                    chat_id=telegram_id,
-                    text=full_message,
-                    parse_mode=ParseMode.HTML,
-                )
+            # Send to customer (connection already back in the pool)
+            delivered = await self._sender.send(
+                telegram_id, full_message, parse_mode=ParseMode.HTML
+            )
+            if not delivered:
+                raise RuntimeError(f"Telegram menolak pengiriman order {order_id}")
 
-                logger.info(
-                    "[product_delivery] Sent %d product contents to user %s for order %s",
-                    len(contents),
-                    telegram_id,
-                    order_id,
-                )
+            logger.info(
+                "[product_delivery] Sent %d product contents to user %s for order %s",
+                len(contents),
+                telegram_id,
+                order_id,
+            )
 
         except Exception as exc:
             logger.error(
@@ -645,19 +716,18 @@ class PaymentService:
                 exc,
                 exc_info=True,
             )
+            raise
 
     async def _notify_admins_payment_success(
         self, gateway_order_id: str, order_id: str
     ) -> None:
         """Send notification to admins when order payment is successful."""
         try:
-            from telegram import Bot
             from telegram.constants import ParseMode
             from src.core.config import get_settings
             from src.core.currency import format_rupiah
 
             settings = get_settings()
-            bot = Bot(token=settings.telegram_bot_token)
 
             # Get order details
             pool = await get_pool()
@@ -716,21 +786,14 @@ class PaymentService:
                 "📦 <b>Pesanan sudah diproses dan produk dikirim ke customer.</b>"
             )
 
-            # Send to all admins
+            # Send to all admins concurrently; failures are per recipient.
             admin_ids = settings.telegram_admin_ids + settings.telegram_owner_ids
-            for admin_id in admin_ids:
-                try:
-                    await bot.send_message(
-                        chat_id=admin_id,
-                        text=message_text,
-                        parse_mode=ParseMode.HTML,
-                    )
-                except Exception as exc:
-                    logger.warning(
-                        "[payment_success_notif] Failed to notify admin %s: %s",
-                        admin_id,
-                        exc,
-                    )
+            results = await self._sender.fan_out(
+                admin_ids, message_text, parse_mode=ParseMode.HTML
+            )
+            failed = [admin_id for admin_id, ok in results.items() if not ok]
+            if failed:
+                logger.warning("[payment_success_notif] Failed to notify admins %s", failed)
         except Exception as exc:
             logger.error("[payment_success_notif] Error sending notification: %s", exc)
 
@@ -743,13 +806,11 @@ class PaymentService:
     ) -> None:
         """Send notification to admins when deposit is successful."""
         try:
-            from telegram import Bot
             from telegram.constants import ParseMode
             from src.core.config import get_settings
             from src.core.currency import format_rupiah
 
             settings = get_settings()
-            bot = Bot(token=settings.telegram_bot_token)
 
             # Get user details
             pool = await get_pool()
@@ -783,21 +844,14 @@ class PaymentService:
                 "💰 <b>Saldo customer sudah ditambahkan.</b>"
             )
 
-            # Send to all admins
+            # Send to all admins concurrently; failures are per recipient.
             admin_ids = settings.telegram_admin_ids + settings.telegram_owner_ids
-            for admin_id in admin_ids:
-                try:
-                    await bot.send_message(
-                        chat_id=admin_id,
-                        text=message_text,
-                        parse_mode=ParseMode.HTML,
-                    )
-                except Exception as exc:
-                    logger.warning(
-                        "[deposit_success_notif] Failed to notify admin %s: %s",
-                        admin_id,
-                        exc,
-                    )
+            results = await self._sender.fan_out(
+                admin_ids, message_text, parse_mode=ParseMode.HTML
+            )
+            failed = [admin_id for admin_id, ok in results.items() if not ok]
+            if failed:
+                logger.warning("[deposit_success_notif] Failed to notify admins %s", failed)
         except Exception as exc:
             logger.error("[deposit_success_notif] Error sending notification: %s", exc)
 
@@ -892,23 +946,10 @@ class PaymentService:
     ) -> None:
         """Catat pembayaran manual/deposit agar owner dapat memverifikasi."""
 
+        await ensure_schema()
         pool = await get_pool()
         async with pool.acquire() as connection:
             async with connection.transaction():
-                await connection.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS payment_manual_reviews (
-                        id BIGSERIAL PRIMARY KEY,
-                        order_id BIGINT NOT NULL,
-                        telegram_user_id BIGINT,
-                        telegram_username TEXT,
-                        amount_cents BIGINT NOT NULL,
-                        note TEXT,
-                        created_at TIMESTAMPTZ DEFAULT NOW()
-                    );
-                    """
-                )
-
                 await connection.execute(
                     """
                     INSERT INTO payment_manual_reviews (
@@ -7,34 +7,29 @@ from typing import Dict, List
 import logging
 
 from src.services.postgres import get_pool
+from src.services.schema import ensure_schema, register_schema
 
 
 logger = logging.getLogger(__name__)
 
-
-async def _ensure_table() -> None:
-    """Ensure storage table exists."""
-    pool = await get_pool()
-    async with pool.acquire() as connection:
-        await connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS payment_message_logs (
-                id BIGSERIAL PRIMARY KEY,
-                gateway_order_id TEXT NOT NULL,
-                chat_id BIGINT NOT NULL,
-                message_id BIGINT NOT NULL,
-                role TEXT NOT NULL,
-                message_kind TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW()
-            );
-            """
-        )
-        await connection.execute(
-            """
-            CREATE INDEX IF NOT EXISTS payment_message_logs_gateway_order_id_idx
-            ON payment_message_logs (gateway_order_id);
-            """
-        )
+register_schema(
+    "payment_messages",
+    """
+    CREATE TABLE IF NOT EXISTS payment_message_logs (
+        id BIGSERIAL PRIMARY KEY,
+        gateway_order_id TEXT NOT NULL,
+        chat_id BIGINT NOT NULL,
+        message_id BIGINT NOT NULL,
+        role TEXT NOT NULL,
+        message_kind TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS payment_message_logs_gateway_order_id_idx
+    ON payment_message_logs (gateway_order_id);
+    """,
+)
 
 
 async def record_payment_message(
@@ -46,7 +41,7 @@ async def record_payment_message(
     message_kind: str,
 ) -> None:
     """Persist message metadata to enable follow-up edits or deletions."""
-    await _ensure_table()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
         await connection.execute(
@@ -77,7 +72,7 @@ async def record_payment_message(
 
 async def fetch_payment_messages(gateway_order_id: str) -> List[Dict[str, object]]:
     """Return stored message entries for a gateway order id."""
-    await _ensure_table()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
         rows = await connection.fetch(
@@ -93,7 +88,7 @@ async def fetch_payment_messages(gateway_order_id: str) -> List[Dict[str, object
 
 async def delete_payment_messages(gateway_order_id: str) -> None:
     """Remove stored entries after completion or cancellation."""
-    await _ensure_table()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
         await connection.execute(
@@ -3,71 +3,804 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
+import itertools
+import json
 import logging
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Iterable
+import random
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from collections import Counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 import asyncpg
 
 from src.core.config import get_settings
+from src.core.telemetry import LatencyHistogram
+from src.services.queries import Query, get_query, name_for_sql
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Errors after which Postgres guarantees the transaction had no effect.
+_RETRYABLE_TX_ERRORS = (
+    asyncpg.exceptions.DeadlockDetectedError,
+    asyncpg.exceptions.SerializationError,
+)
+_TX_MAX_ATTEMPTS = 4
+_TX_BACKOFF_BASE = 0.02
+_TX_BACKOFF_CAP = 0.5
+
+# Monotonic timestamp of the last primary write made by the current task.
+_last_write_at: ContextVar[float | None] = ContextVar("pg_last_write_at", default=None)
+
+# "module:function" of the code that acquired the connection, for slow logs.
+_query_caller: ContextVar[str | None] = ContextVar("pg_query_caller", default=None)
+# Set while the slow-query recorder runs EXPLAIN, so it does not log itself.
+_slow_log_suppressed: ContextVar[bool] = ContextVar(
+    "pg_slow_log_suppressed", default=False
+)
+_INTERNAL_MODULES = frozenset({__name__, "contextlib", "src.services.queries"})
+
+_REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(
+        EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0
+    )
+END AS lag_seconds;
+"""
+
+
+class PoolBusy(RuntimeError):
+    """Raised when a connection request is shed by admission control."""
+
+
+class Priority(IntEnum):
+    """Admission class for connection requests; lower value is served first."""
+
+    CRITICAL = 0  # payment webhooks, checkout
+    INTERACTIVE = 1  # browsing
+    BACKGROUND = 2  # admin reports, jobs
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "pg_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run the block with connection requests admitted at ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def admitted_at(level: Priority) -> Callable[[F], F]:
+    """Decorate a coroutine function so its DB work is admitted at ``level``."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with priority(level):
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class _AdmissionGate:
+    """Priority-ordered counting semaphore in front of the asyncpg pool.
+
+    ``reserved`` slots can only be taken by :attr:`Priority.CRITICAL`, so
+    browsing can never occupy the connections payments need. ``queue_limit``
+    caps waiters per class except CRITICAL, which is never shed for queue
+    depth so payment completions cannot be starved by a browsing spike.
+    """
+
+    def __init__(self, capacity: int, reserved: int, queue_limit: int) -> None:
+        self._free = capacity
+        self._reserved = max(0, min(reserved, capacity - 1))
+        self._queue_limit = queue_limit
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.depth: Counter[Priority] = Counter()
+        self.shed: Counter[Priority] = Counter()
+
+    def _can_take(self, level: Priority) -> bool:
+        floor = 0 if level is Priority.CRITICAL else self._reserved
+        return self._free > floor
+
+    def _queue_ahead(self, level: Priority) -> bool:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        return bool(self._waiters) and self._waiters[0][0] <= level
+
+    async def acquire(self, level: Priority, timeout: float | None) -> None:
+        if not self._queue_ahead(level) and self._can_take(level):
+            self._free -= 1
+            return
+        if (
+            level is not Priority.CRITICAL
+            and self.depth[level] >= self._queue_limit
+        ):
+            self.shed[level] += 1
+            raise PoolBusy("Antrian koneksi database penuh.")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._seq), future))
+        self.depth[level] += 1
+        try:
+            await asyncio.wait([future], timeout=timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            future.cancel()
+            raise
+        finally:
+            self.depth[level] -= 1
+        if not future.done():
+            future.cancel()
+            self.shed[level] += 1
+            raise PoolBusy("Menunggu koneksi database terlalu lama.")
+
+    def release(self) -> None:
+        self._free += 1
+        while self._waiters:
+            level, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_take(Priority(level)):
+                break
+            heapq.heappop(self._waiters)
+            self._free -= 1
+            future.set_result(None)
+            return
+
+
+class SessionStateUnavailable(RuntimeError):
+    """Raised when code needs session state that pgbouncer mode cannot keep."""
+
+
+@dataclass(slots=True)
+class DbSession:
+    """Primary connection shared by the DB calls of one update.
+
+    The connection is checked out lazily and kept only for one DB phase: as
+    soon as the update awaits anything else (Telegram, HTTP), it goes back
+    to the pool and the next query checks out a fresh one.
+    """
+
+    label: str
+    pool: "PostgresPool | None" = None
+    connection: asyncpg.Connection | None = None
+    lent: bool = False
+    closed: bool = False
+    queries: int = 0
+    db_time_ms: float = 0.0
+
+    def _on_query(self, record: Any) -> None:
+        self.queries += 1
+        self.db_time_ms += record.elapsed * 1000
+
+
+_update_session: ContextVar[DbSession | None] = ContextVar(
+    "pg_update_session", default=None
+)
+
+
+def current_session() -> DbSession | None:
+    """Return the update session bound to the current task, if any."""
+    session = _update_session.get()
+    # Tasks spawned inside a session inherit the contextvar and may outlive it.
+    if session is None or session.closed:
+        return None
+    return session
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    """Statement that exceeded the slow-query threshold."""
+
+    name: str | None
+    query: str
+    args: Tuple[Any, ...]
+    param_types: List[str]
+    duration_ms: float
+    caller: str | None
+
+
+SlowQueryListener = Callable[[SlowQuery], None]
+
+
+def suppress_slow_log() -> None:
+    """Stop slow-query reporting for the rest of the current task."""
+    _slow_log_suppressed.set(True)
+
+
+def _caller_name() -> str:
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") in _INTERNAL_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+def _normalise_dsn(dsn: str) -> str:
+    if dsn.startswith("postgresql+asyncpg://"):
+        dsn = dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
+    return dsn
+
+
+def mark_write() -> None:
+    """Pin reads of the current task to the primary for the read-after-write window."""
+    _last_write_at.set(time.monotonic())
+
+
+async def lift_statement_timeout(connection: asyncpg.Connection) -> None:
+    """Disable ``DB_STATEMENT_TIMEOUT_MS`` for the rest of the transaction.
+
+    For bulk jobs (imports, backfills, archive moves, reconcile) that may
+    legitimately run longer than an interactive statement.
+    """
+    await connection.execute("SET LOCAL statement_timeout = 0;")
+
+
+def _encode_json(value: Any) -> str:
+    """Encode JSON parameters; pre-serialised strings are passed through."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
 
 class PostgresPool:
-    """Wrapper around asyncpg connection pool."""
+    """Wrapper around asyncpg connection pool.
+
+    When ``replica_dsn`` is set, callers may pass ``readonly=True`` to
+    :meth:`acquire`, :meth:`fetch` and :meth:`fetchrow` to route the read to
+    the replica pool. Reads fall back to the primary when the replica lags
+    beyond ``replica_max_lag`` or when the current task wrote to the primary
+    within ``read_after_write`` seconds. A non-readonly :meth:`acquire` is
+    treated as a write (services write through raw connections), as are
+    :meth:`execute` and committed :meth:`run_transaction` calls; primary
+    reads through :meth:`fetch`/:meth:`fetchrow` do not pin the task.
 
-    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10) -> None:
-        if dsn.startswith("postgresql+asyncpg://"):
-            dsn = dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
-        self._dsn = dsn
+    With ``pgbouncer=True`` the pool is safe behind pgbouncer in transaction
+    pooling mode: the prepared statement cache is disabled (asyncpg then uses
+    unnamed statements), no session ``SET`` is issued, and
+    :meth:`require_session_state` fails fast for features that need a
+    dedicated server session.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        *,
+        acquire_timeout: float | None = None,
+        max_inactive_lifetime: float = 300.0,
+        max_queries: int = 50000,
+        statement_timeout_ms: int = 0,
+        statement_cache_size: int = 100,
+        slow_query_ms: float = 0,
+        pgbouncer: bool = False,
+        replica_dsn: str | None = None,
+        replica_max_lag: float = 5.0,
+        replica_lag_check_interval: float = 5.0,
+        read_after_write: float = 3.0,
+        critical_reserve: int = 2,
+        queue_limit: int = 50,
+        interactive_wait: float = 2.0,
+        background_wait: float = 10.0,
+    ) -> None:
+        self._dsn = _normalise_dsn(dsn)
+        self._replica_dsn = _normalise_dsn(replica_dsn) if replica_dsn else None
+        self._replica_max_lag = replica_max_lag
+        self._replica_lag_check_interval = replica_lag_check_interval
+        self._read_after_write = read_after_write
         self._min_size = min_size
-        self._max_size = max_size
+        self._max_size = max(max_size, min_size)
+        self._acquire_timeout = acquire_timeout
+        self._max_inactive_lifetime = max_inactive_lifetime
+        self._max_queries = max_queries
+        self._statement_timeout_ms = statement_timeout_ms
+        self._pgbouncer = pgbouncer
+        self._statement_cache_size = 0 if pgbouncer else statement_cache_size
+        self._slow_query_ms = slow_query_ms
+        self._slow_query_listeners: List[SlowQueryListener] = []
+        self._gate = _AdmissionGate(self._max_size, critical_reserve, queue_limit)
+        self._max_wait = {
+            Priority.CRITICAL: acquire_timeout,
+            Priority.INTERACTIVE: interactive_wait,
+            Priority.BACKGROUND: background_wait,
+        }
         self._pool: asyncpg.Pool | None = None
+        self._replica: asyncpg.Pool | None = None
+        self._replica_lag: float | None = None
+        self._replica_lag_checked_at = float("-inf")
+        self._replica_lag_lock = asyncio.Lock()
         self._lock = asyncio.Lock()
+        self._in_use = 0
+        self._waiting = 0
+        self._pending_checkins: Set[asyncio.Task] = set()
+        self._acquire_wait = LatencyHistogram()
+        self._tx_retries: Counter[str] = Counter()
+        self._tx_exhausted: Counter[str] = Counter()
+        self._update_db_time = LatencyHistogram()
+        self._update_queries = LatencyHistogram(
+            bounds_ms=(1, 2, 5, 10, 20, 50, 100)
+        )
+
+    async def _init_connection(self, connection: asyncpg.Connection) -> None:
+        """Prepare every new pooled connection (codecs, session settings)."""
+        for type_name in ("json", "jsonb"):
+            await connection.set_type_codec(
+                type_name,
+                encoder=_encode_json,
+                decoder=json.loads,
+                schema="pg_catalog",
+            )
+        if self._statement_timeout_ms > 0 and not self._pgbouncer:
+            await connection.execute(
+                f"SET statement_timeout = {int(self._statement_timeout_ms)};"
+            )
+        if self._slow_query_ms > 0:
+            connection.add_query_logger(self._on_query_logged)
+
+    @property
+    def pgbouncer(self) -> bool:
+        """True when running behind pgbouncer in transaction pooling mode."""
+        return self._pgbouncer
+
+    def require_session_state(self, feature: str) -> None:
+        """Fail fast if ``feature`` needs a server session pgbouncer won't pin."""
+        if self._pgbouncer:
+            raise SessionStateUnavailable(
+                f"{feature} butuh session Postgres tetap dan tidak didukung "
+                "saat DB_PGBOUNCER_MODE aktif."
+            )
+
+    async def listen(
+        self, channel: str, callback: Callable[..., None]
+    ) -> asyncpg.Connection:
+        """Open a dedicated connection that LISTENs on ``channel``.
+
+        The caller owns the returned connection and must close it.
+        """
+        self.require_session_state(f"LISTEN {channel}")
+        connection = await asyncpg.connect(dsn=self._dsn)
+        await connection.add_listener(channel, callback)
+        return connection
+
+    def add_slow_query_listener(self, listener: SlowQueryListener) -> None:
+        """Call ``listener`` for every statement slower than the threshold."""
+        self._slow_query_listeners.append(listener)
+
+    def _on_query_logged(self, record: Any) -> None:
+        # asyncpg dispatches this with call_soon in the querying task's
+        # context, so the caller contextvar is still visible here.
+        duration_ms = record.elapsed * 1000
+        if duration_ms < self._slow_query_ms or _slow_log_suppressed.get():
+            return
+        args = tuple(record.args or ())
+        slow = SlowQuery(
+            name=name_for_sql(record.query),
+            query=record.query,
+            args=args,
+            param_types=[type(arg).__name__ for arg in args],
+            duration_ms=duration_ms,
+            caller=_query_caller.get(),
+        )
+        logger.warning(
+            "[slow_query] %.1f ms %s dari %s params=(%s)",
+            duration_ms,
+            slow.name or " ".join(record.query.split())[:120],
+            slow.caller or "?",
+            ", ".join(slow.param_types),
+        )
+        for listener in self._slow_query_listeners:
+            try:
+                listener(slow)
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.debug("Slow query listener gagal: %s", exc)
+
+    async def _create_pool(self, dsn: str) -> asyncpg.Pool:
+        return await asyncpg.create_pool(
+            dsn=dsn,
+            min_size=self._min_size,
+            max_size=self._max_size,
+            max_queries=self._max_queries,
+            max_inactive_connection_lifetime=self._max_inactive_lifetime,
+            statement_cache_size=self._statement_cache_size,
+            init=self._init_connection,
+        )
 
     async def init(self) -> None:
-        """Initialise connection pool."""
+        """Initialise connection pool and warm it up to ``min_size``."""
         async with self._lock:
             if self._pool is None:
-                self._pool = await asyncpg.create_pool(
-                    dsn=self._dsn,
-                    min_size=self._min_size,
-                    max_size=self._max_size,
+                if self._pgbouncer and self._statement_timeout_ms > 0:
+                    logger.warning(
+                        "DB_PGBOUNCER_MODE aktif: statement_timeout tidak di-SET "
+                        "per koneksi, atur lewat ALTER ROLE ... SET statement_timeout."
+                    )
+                # asyncpg opens ``min_size`` connections (running ``init`` on
+                # each) before returning, so the pool starts warm.
+                self._pool = await self._create_pool(self._dsn)
+                logger.info(
+                    "🔌 Connected to Postgres (warm=%s, max=%s).",
+                    self._pool.get_size(),
+                    self._max_size,
                 )
-                logger.info("🔌 Connected to Postgres.")
+            if self._replica is None and self._replica_dsn:
+                try:
+                    self._replica = await self._create_pool(self._replica_dsn)
+                    logger.info("🔌 Connected to Postgres read replica.")
+                except Exception as exc:  # pragma: no cover - network failure
+                    logger.warning(
+                        "Replica tidak tersedia, semua query memakai primary: %s", exc
+                    )
 
     async def close(self) -> None:
         """Close pool and release resources."""
         async with self._lock:
+            if self._replica is not None:
+                await self._replica.close()
+                self._replica = None
             if self._pool is not None:
                 await self._pool.close()
                 self._pool = None
                 logger.info("🔌 Postgres pool closed.")
 
+    async def _refresh_replica_lag(self) -> None:
+        if self._replica_lag_lock.locked():
+            return
+        async with self._replica_lag_lock:
+            self._replica_lag_checked_at = time.monotonic()
+            try:
+                async with self._replica.acquire(
+                    timeout=self._acquire_timeout
+                ) as connection:
+                    lag = await connection.fetchval(_REPLICA_LAG_QUERY)
+                self._replica_lag = float(lag or 0)
+            except Exception as exc:
+                logger.warning("Cek lag replica gagal, pakai primary: %s", exc)
+                self._replica_lag = None
+            if (
+                self._replica_lag is not None
+                and self._replica_lag > self._replica_max_lag
+            ):
+                logger.warning(
+                    "Replica tertinggal %.1fs (batas %.1fs), baca dari primary.",
+                    self._replica_lag,
+                    self._replica_max_lag,
+                )
+
+    async def _use_replica(self) -> bool:
+        """Return True when a read may be served by the replica."""
+        if self._replica is None:
+            return False
+        last_write = _last_write_at.get()
+        if (
+            last_write is not None
+            and time.monotonic() - last_write < self._read_after_write
+        ):
+            return False
+        if (
+            time.monotonic() - self._replica_lag_checked_at
+            >= self._replica_lag_check_interval
+        ):
+            await self._refresh_replica_lag()
+        return (
+            self._replica_lag is not None
+            and self._replica_lag <= self._replica_max_lag
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self, *, readonly: bool = False
+    ) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a raw asyncpg connection (replica when ``readonly`` allows)."""
+        if not readonly:
+            mark_write()
+        async with self._acquire_for_read(readonly) as connection:
+            yield connection
+
     @asynccontextmanager
-    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
-        """Acquire a raw asyncpg connection."""
+    async def _acquire_for_read(
+        self, readonly: bool
+    ) -> AsyncIterator[asyncpg.Connection]:
         if self._pool is None:
             raise RuntimeError("Postgres pool not initialised.")
-        async with self._pool.acquire() as connection:
+        if self._slow_query_ms > 0:
+            _query_caller.set(_caller_name())
+        session = current_session()
+        if session is not None and session.pool is None:
+            session.pool = self
+        if readonly and await self._use_replica():
+            async with self._replica.acquire(
+                timeout=self._acquire_timeout
+            ) as connection:
+                async with _accounted(connection, session):
+                    yield connection
+            return
+        if session is not None and not session.lent:
+            # Reuse the update's connection; nested or concurrent acquires
+            # while it is lent out fall through to a separate connection.
+            if session.connection is None:
+                session.connection = await self._checkout()
+                session.connection.add_query_logger(session._on_query)
+            session.lent = True
+            try:
+                yield session.connection
+            finally:
+                session.lent = False
+                # Runs once the task yields to the loop for non-DB work; a
+                # following query in the same phase re-lends it first.
+                asyncio.get_running_loop().call_soon(
+                    self._release_idle_session, session
+                )
+            return
+        connection = await self._checkout()
+        try:
+            async with _accounted(connection, session):
+                yield connection
+        finally:
+            await self._checkin(connection)
+
+    @asynccontextmanager
+    async def side_connection(self) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a primary connection that bypasses the update session."""
+        if self._pool is None:
+            raise RuntimeError("Postgres pool not initialised.")
+        connection = await self._checkout()
+        try:
             yield connection
+        finally:
+            await self._checkin(connection)
+
+    def _release_idle_session(self, session: DbSession) -> None:
+        connection = session.connection
+        if connection is None or session.lent or session.closed:
+            return
+        session.connection = None
+        connection.remove_query_logger(session._on_query)
+        task = asyncio.create_task(self._checkin(connection))
+        self._pending_checkins.add(task)
+        task.add_done_callback(self._pending_checkins.discard)
+
+    async def _checkout(self) -> asyncpg.Connection:
+        level = _priority.get()
+        self._waiting += 1
+        started = time.perf_counter()
+        try:
+            await self._gate.acquire(level, self._max_wait[level])
+            try:
+                connection = await self._pool.acquire(timeout=self._acquire_timeout)
+            except BaseException:
+                self._gate.release()
+                raise
+        finally:
+            self._waiting -= 1
+            self._acquire_wait.observe((time.perf_counter() - started) * 1000)
+        self._in_use += 1
+        return connection
+
+    async def _checkin(self, connection: asyncpg.Connection) -> None:
+        self._in_use -= 1
+        try:
+            await self._pool.release(connection)
+        finally:
+            self._gate.release()
+
+    async def run_transaction(
+        self,
+        work: Callable[[asyncpg.Connection], Awaitable[T]],
+        *,
+        isolation: str = "read_committed",
+        readonly: bool = False,
+        max_attempts: int = _TX_MAX_ATTEMPTS,
+        name: str | None = None,
+    ) -> T:
+        """Run ``work(connection)`` in a transaction, retrying on conflicts.
+
+        Deadlocks and serialization failures roll the whole transaction back,
+        so ``work`` is re-run from scratch after a jittered exponential
+        backoff. ``work`` must therefore only touch the database; side effects
+        (Telegram messages, HTTP calls) belong after this returns. Retries are
+        counted per ``name`` (default: the calling ``module:function``).
+        """
+        site = name or _caller_name()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self.acquire() as connection:
+                    async with connection.transaction(
+                        isolation=isolation, readonly=readonly
+                    ):
+                        result = await work(connection)
+                if not readonly:
+                    mark_write()
+                return result
+            except _RETRYABLE_TX_ERRORS as exc:
+                if attempt >= max_attempts:
+                    self._tx_exhausted[site] += 1
+                    logger.error(
+                        "[tx_retry] %s gagal setelah %s percobaan: %s",
+                        site,
+                        attempt,
+                        exc,
+                    )
+                    raise
+                self._tx_retries[site] += 1
+                delay = random.uniform(
+                    0, min(_TX_BACKOFF_CAP, _TX_BACKOFF_BASE * 2 ** (attempt - 1))
+                )
+                logger.warning(
+                    "[tx_retry] %s percobaan %s/%s: %s, ulang dalam %.0f ms",
+                    site,
+                    attempt,
+                    max_attempts,
+                    type(exc).__name__,
+                    delay * 1000,
+                )
+                await asyncio.sleep(delay)
 
-    async def fetch(self, query: str, *args: Any) -> Iterable[asyncpg.Record]:
+    def stats(self) -> Dict[str, Any]:
+        """Return live pool gauges and the acquire-wait histogram summary."""
+        size = self._pool.get_size() if self._pool is not None else 0
+        idle = self._pool.get_idle_size() if self._pool is not None else 0
+        replica: Dict[str, Any] | None = None
+        if self._replica is not None:
+            replica = {
+                "size": self._replica.get_size(),
+                "idle": self._replica.get_idle_size(),
+                "lag_seconds": self._replica_lag,
+            }
+        return {
+            "min_size": self._min_size,
+            "max_size": self._max_size,
+            "size": size,
+            "in_use": self._in_use,
+            "idle": idle,
+            "waiting": self._waiting,
+            "acquire_wait": self._acquire_wait.summary(),
+            "update_db_time": self._update_db_time.summary(),
+            "update_queries": self._update_queries.summary(),
+            "replica": replica,
+            "queue_depth": {
+                level.name.lower(): self._gate.depth[level] for level in Priority
+            },
+            "shed": {level.name.lower(): self._gate.shed[level] for level in Priority},
+            "transaction_retries": dict(self._tx_retries),
+            "transaction_exhausted": dict(self._tx_exhausted),
+        }
+
+    async def fetch(
+        self, query: str | Query, *args: Any, readonly: bool = False
+    ) -> Iterable[asyncpg.Record]:
         """Run SELECT returning multiple rows."""
-        async with self.acquire() as connection:
+        if isinstance(query, Query):
+            return await query.fetch(self, *args, readonly=readonly)
+        async with self._acquire_for_read(readonly) as connection:
             return await connection.fetch(query, *args)
 
-    async def fetchrow(self, query: str, *args: Any) -> asyncpg.Record | None:
+    async def fetchrow(
+        self, query: str | Query, *args: Any, readonly: bool = False
+    ) -> asyncpg.Record | None:
         """Run SELECT returning single row."""
-        async with self.acquire() as connection:
+        if isinstance(query, Query):
+            return await query.fetchrow(self, *args, readonly=readonly)
+        async with self._acquire_for_read(readonly) as connection:
             return await connection.fetchrow(query, *args)
 
-    async def execute(self, query: str, *args: Any) -> str:
+    async def execute(self, query: str | Query, *args: Any) -> str:
         """Execute statement without returning rows."""
+        if isinstance(query, Query):
+            return await query.execute(self, *args)
         async with self.acquire() as connection:
-            return await connection.execute(query, *args)
+            status = await connection.execute(query, *args)
+        mark_write()
+        return status
+
+    async def fetch_named(
+        self, name: str, *args: Any, readonly: bool = False
+    ) -> Iterable[asyncpg.Record]:
+        """Run the catalog query registered as ``name`` (see ``define_query``)."""
+        return await self.fetch(get_query(name), *args, readonly=readonly)
+
+    async def fetchrow_named(
+        self, name: str, *args: Any, readonly: bool = False
+    ) -> asyncpg.Record | None:
+        return await self.fetchrow(get_query(name), *args, readonly=readonly)
+
+    async def execute_named(self, name: str, *args: Any) -> str:
+        return await self.execute(get_query(name), *args)
+
+
+@asynccontextmanager
+async def _accounted(
+    connection: asyncpg.Connection, session: DbSession | None
+) -> AsyncIterator[None]:
+    """Attribute queries on a non-session connection to the active session."""
+    if session is None:
+        yield
+        return
+    connection.add_query_logger(session._on_query)
+    try:
+        yield
+    finally:
+        connection.remove_query_logger(session._on_query)
+
+
+@asynccontextmanager
+async def update_session(label: str = "update") -> AsyncIterator[DbSession]:
+    """Bind a lazily opened primary connection to the current update.
+
+    Back-to-back :meth:`PostgresPool.acquire` calls inside the block reuse
+    one connection instead of going back to the pool. The connection is
+    returned whenever the update awaits non-DB work and when the block
+    exits, so an update waiting on Telegram or a gateway never holds a
+    pool slot. Query count and DB time are logged and fed to the pool
+    stats. Nested calls reuse the outer session.
+    """
+    existing = current_session()
+    if existing is not None:
+        yield existing
+        return
+    session = DbSession(label=label)
+    token = _update_session.set(session)
+    try:
+        yield session
+    finally:
+        session.closed = True
+        _update_session.reset(token)
+        pool = session.pool
+        # Detach before awaiting so a queued idle release cannot check the
+        # same connection in again.
+        connection, session.connection = session.connection, None
+        if connection is not None and pool is not None:
+            connection.remove_query_logger(session._on_query)
+            await pool._checkin(connection)
+        # Query loggers are dispatched with call_soon; let them land.
+        await asyncio.sleep(0)
+        if pool is not None:
+            pool._update_db_time.observe(session.db_time_ms)
+            pool._update_queries.observe(session.queries)
+        if session.queries:
+            logger.debug(
+                "[db_session] %s: %s query, %.1f ms DB",
+                session.label,
+                session.queries,
+                session.db_time_ms,
+            )
 
 
 _pg_pool: PostgresPool | None = None
@@ -78,6 +811,25 @@ async def get_pool() -> PostgresPool:
     global _pg_pool  # noqa: PLW0603
     if _pg_pool is None:
         settings = get_settings()
-        _pg_pool = PostgresPool(settings.database_url)
+        _pg_pool = PostgresPool(
+            settings.database_url,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            acquire_timeout=settings.db_pool_acquire_timeout or None,
+            max_inactive_lifetime=settings.db_pool_max_inactive_lifetime,
+            max_queries=settings.db_pool_max_queries,
+            statement_timeout_ms=settings.db_statement_timeout_ms,
+            statement_cache_size=settings.db_statement_cache_size,
+            slow_query_ms=settings.db_slow_query_ms,
+            pgbouncer=settings.db_pgbouncer_mode,
+            replica_dsn=settings.database_replica_url or None,
+            replica_max_lag=settings.db_replica_max_lag_seconds,
+            replica_lag_check_interval=settings.db_replica_lag_check_seconds,
+            read_after_write=settings.db_read_after_write_seconds,
+            critical_reserve=settings.db_pool_critical_reserve,
+            queue_limit=settings.db_pool_queue_limit,
+            interactive_wait=settings.db_pool_interactive_wait,
+            background_wait=settings.db_pool_background_wait,
+        )
         await _pg_pool.init()
     return _pg_pool
@@ -2,14 +2,433 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Set
+from uuid import UUID
 
-from src.services.postgres import get_pool
+import asyncpg
+
+from src.services.catalog_events import (
+    notify_catalog_reload,
+    notify_product_changed,
+)
+from src.services.postgres import get_pool, lift_statement_timeout
+from src.services.queries import define_query
+from src.services.schema import ensure_schema, register_schema
 
 
 logger = logging.getLogger(__name__)
 
+# Archive partitions (by month) known to exist in this process.
+_archive_partitions: Set[datetime] = set()
+_ARCHIVE_PARTITION_LOCK = "product_contents_archive_partitions"
+
+# A content is available when it is neither used nor reserved by an unpaid
+# order; products.stock counts exactly those rows.
+register_schema(
+    "product_content_reservations",
+    """
+    ALTER TABLE product_contents
+        ADD COLUMN IF NOT EXISTS reserved_by_order_id UUID
+            REFERENCES orders(id) ON DELETE SET NULL;
+    """,
+    "ALTER TABLE product_contents ADD COLUMN IF NOT EXISTS reserved_until TIMESTAMPTZ;",
+    """
+    CREATE INDEX IF NOT EXISTS idx_product_contents_reserved_by
+        ON product_contents (reserved_by_order_id)
+        WHERE reserved_by_order_id IS NOT NULL;
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_product_contents_available
+        ON product_contents (product_id, created_at)
+        WHERE is_used = FALSE AND reserved_by_order_id IS NULL;
+    """,
+)
+
+# Hash of the stripped content, so duplicate checks hit a small fixed-width
+# index instead of comparing raw credential text.
+register_schema(
+    "product_content_sha256",
+    "ALTER TABLE product_contents ADD COLUMN IF NOT EXISTS content_sha256 BYTEA;",
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_product_contents_content_sha256
+        ON product_contents (content_sha256)
+        WHERE content_sha256 IS NOT NULL;
+    """,
+)
+
+# Delivered contents move here after a grace period so product_contents only
+# holds sellable inventory. Partitioned by used_at month (see
+# _ensure_archive_partitions); no FKs, it is order history.
+register_schema(
+    "product_content_archive",
+    """
+    CREATE TABLE IF NOT EXISTS product_contents_archive (
+        id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        content_sha256 BYTEA,
+        used_by_order_id UUID,
+        created_at TIMESTAMPTZ,
+        used_at TIMESTAMPTZ NOT NULL,
+        archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id, used_at)
+    ) PARTITION BY RANGE (used_at);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_product_contents_archive_order
+        ON product_contents_archive (used_by_order_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_product_contents_archive_sha256
+        ON product_contents_archive (content_sha256);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_product_contents_archive_product
+        ON product_contents_archive (product_id, created_at);
+    """,
+)
+
+# products.stock is kept as a counter: every content insert, sale and delete
+# applies a delta in the same transaction, and reconcile_stock() repairs any
+# drift from the real unused-content count.
+ADJUST_STOCK = define_query(
+    "product_content.adjust_stock",
+    """
+    UPDATE products
+    SET stock = GREATEST(stock + $2, 0),
+        updated_at = NOW()
+    WHERE id = $1;
+    """,
+)
+# Reserves contents for every item of an order in one statement, inside the
+# transaction that inserts the order. Rows locked by a concurrent checkout
+# are skipped rather than waited on, so two orders never hold the same
+# content. $1 = order id, $2 = reserved_until.
+RESERVE_ORDER_CONTENTS = define_query(
+    "product_content.reserve_order_contents",
+    """
+    WITH wanted AS (
+        SELECT product_id, SUM(quantity)::int AS quantity
+        FROM order_items
+        WHERE order_id = $1
+        GROUP BY product_id
+    ),
+    picked AS (
+        SELECT pc.id
+        FROM wanted w
+        CROSS JOIN LATERAL (
+            SELECT id
+            FROM product_contents
+            WHERE product_id = w.product_id
+              AND is_used = FALSE
+              AND reserved_by_order_id IS NULL
+            ORDER BY created_at ASC, id ASC
+            LIMIT w.quantity
+            FOR UPDATE SKIP LOCKED
+        ) pc
+    ),
+    reserved AS (
+        UPDATE product_contents c
+        SET reserved_by_order_id = $1,
+            reserved_until = $2
+        FROM picked
+        WHERE c.id = picked.id
+        RETURNING c.product_id
+    ),
+    counts AS (
+        SELECT product_id, COUNT(*)::int AS reserved
+        FROM reserved
+        GROUP BY product_id
+    ),
+    counters AS (
+        UPDATE products p
+        SET stock = GREATEST(p.stock - c.reserved, 0),
+            updated_at = NOW()
+        FROM counts c
+        WHERE p.id = c.product_id
+        RETURNING p.id
+    )
+    SELECT w.product_id, w.quantity, COALESCE(c.reserved, 0) AS reserved
+    FROM wanted w
+    LEFT JOIN counts c ON c.product_id = w.product_id
+    ORDER BY w.product_id;
+    """,
+)
+# Completes an order: flips its reservations to used, then claims any
+# shortfall (reservation swept after expiry, orders from before
+# reservations) from free stock. Both updates read the same snapshot, so
+# the reserved rows are never picked twice. $1 = order id.
+ALLOCATE_ORDER_CONTENTS = define_query(
+    "product_content.allocate_order_contents",
+    """
+    WITH wanted AS (
+        SELECT product_id, SUM(quantity)::int AS quantity
+        FROM order_items
+        WHERE order_id = $1
+        GROUP BY product_id
+    ),
+    flipped AS (
+        UPDATE product_contents
+        SET is_used = TRUE,
+            used_by_order_id = $1,
+            used_at = NOW(),
+            reserved_by_order_id = NULL,
+            reserved_until = NULL
+        WHERE reserved_by_order_id = $1 AND is_used = FALSE
+        RETURNING product_id
+    ),
+    flipped_counts AS (
+        SELECT product_id, COUNT(*)::int AS flipped
+        FROM flipped
+        GROUP BY product_id
+    ),
+    picked AS (
+        SELECT pc.id
+        FROM wanted w
+        LEFT JOIN flipped_counts f ON f.product_id = w.product_id
+        CROSS JOIN LATERAL (
+            SELECT id
+            FROM product_contents
+            WHERE product_id = w.product_id
+              AND is_used = FALSE
+              AND reserved_by_order_id IS NULL
+            ORDER BY created_at ASC, id ASC
+            LIMIT GREATEST(w.quantity - COALESCE(f.flipped, 0), 0)
+            FOR UPDATE SKIP LOCKED
+        ) pc
+    ),
+    claimed AS (
+        UPDATE product_contents c
+        SET is_used = TRUE,
+            used_by_order_id = $1,
+            used_at = NOW()
+        FROM picked
+        WHERE c.id = picked.id
+        RETURNING c.product_id
+    ),
+    claimed_counts AS (
+        SELECT product_id, COUNT(*)::int AS claimed
+        FROM claimed
+        GROUP BY product_id
+    ),
+    counters AS (
+        UPDATE products p
+        SET stock = GREATEST(p.stock - COALESCE(c.claimed, 0), 0),
+            sold_count = p.sold_count + w.quantity,
+            updated_at = NOW()
+        FROM wanted w
+        LEFT JOIN claimed_counts c ON c.product_id = w.product_id
+        WHERE p.id = w.product_id
+        RETURNING p.id
+    )
+    SELECT
+        w.product_id,
+        w.quantity,
+        COALESCE(f.flipped, 0) + COALESCE(c.claimed, 0) AS allocated
+    FROM wanted w
+    LEFT JOIN flipped_counts f ON f.product_id = w.product_id
+    LEFT JOIN claimed_counts c ON c.product_id = w.product_id
+    ORDER BY w.product_id;
+    """,
+)
+# Returns an order's reserved contents to stock (payment failed/expired).
+# $1 = order id.
+RELEASE_ORDER_RESERVATIONS = define_query(
+    "product_content.release_order_reservations",
+    """
+    WITH released AS (
+        UPDATE product_contents
+        SET reserved_by_order_id = NULL,
+            reserved_until = NULL
+        WHERE reserved_by_order_id = $1 AND is_used = FALSE
+        RETURNING product_id
+    ),
+    counts AS (
+        SELECT product_id, COUNT(*)::int AS released
+        FROM released
+        GROUP BY product_id
+    ),
+    counters AS (
+        UPDATE products p
+        SET stock = p.stock + c.released,
+            updated_at = NOW()
+        FROM counts c
+        WHERE p.id = c.product_id
+        RETURNING p.id
+    )
+    SELECT product_id, released FROM counts ORDER BY product_id;
+    """,
+)
+# Safety net for reservations whose order never reached completion or
+# failure handling.
+RELEASE_EXPIRED_RESERVATIONS = define_query(
+    "product_content.release_expired_reservations",
+    """
+    WITH released AS (
+        UPDATE product_contents
+        SET reserved_by_order_id = NULL,
+            reserved_until = NULL
+        WHERE reserved_until < NOW() AND is_used = FALSE
+        RETURNING product_id
+    ),
+    counts AS (
+        SELECT product_id, COUNT(*)::int AS released
+        FROM released
+        GROUP BY product_id
+    ),
+    counters AS (
+        UPDATE products p
+        SET stock = p.stock + c.released,
+            updated_at = NOW()
+        FROM counts c
+        WHERE p.id = c.product_id
+        RETURNING p.id
+    )
+    SELECT product_id, released FROM counts ORDER BY product_id;
+    """,
+)
+STOCK_MISMATCHES = define_query(
+    "product_content.stock_mismatches",
+    """
+    SELECT p.id
+    FROM products p
+    LEFT JOIN product_contents pc
+        ON pc.product_id = p.id
+        AND pc.is_used = FALSE
+        AND pc.reserved_by_order_id IS NULL
+    GROUP BY p.id, p.stock
+    HAVING p.stock != COUNT(pc.id);
+    """,
+)
+CONTENT_HASH_EXISTS = define_query(
+    "product_content.content_hash_exists",
+    """
+    SELECT EXISTS(SELECT 1 FROM product_contents WHERE content_sha256 = $1)
+        OR EXISTS(
+            SELECT 1 FROM product_contents_archive WHERE content_sha256 = $1
+        );
+    """,
+)
+# Fills content_sha256 for rows written before the column existed, one
+# bounded batch per call. convert_to(..., 'UTF8') matches content_sha256().
+BACKFILL_CONTENT_HASHES = define_query(
+    "product_content.backfill_content_hashes",
+    """
+    WITH batch AS (
+        SELECT id
+        FROM product_contents
+        WHERE content_sha256 IS NULL
+        ORDER BY id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE product_contents pc
+    SET content_sha256 = sha256(convert_to(pc.content, 'UTF8'))
+    FROM batch
+    WHERE pc.id = batch.id;
+    """,
+)
+# Staging table for bulk imports; lives only as long as the transaction.
+CREATE_IMPORT_TABLE = """
+    CREATE TEMP TABLE product_content_import (
+        line_no INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        content_sha256 BYTEA NOT NULL
+    ) ON COMMIT DROP;
+"""
+# Conflicts on either the hash or the legacy content constraint are skipped,
+# as are contents already sold and archived; the returned hashes identify
+# which lines were actually inserted.
+IMPORT_CONTENTS = define_query(
+    "product_content.import_contents",
+    """
+    INSERT INTO product_contents (product_id, content, content_sha256, is_used)
+    SELECT $1, i.content, i.content_sha256, FALSE
+    FROM product_content_import i
+    WHERE NOT EXISTS (
+        SELECT 1 FROM product_contents_archive a
+        WHERE a.content_sha256 = i.content_sha256
+    )
+    ORDER BY i.line_no
+    ON CONFLICT DO NOTHING
+    RETURNING content_sha256;
+    """,
+)
+# Used contents past the grace period, oldest first. $1 = cutoff, $2 = limit.
+# Identifier and bounds are quoted server-side; DDL takes no bind params.
+ARCHIVE_PARTITION_DDL = define_query(
+    "product_content.archive_partition_ddl",
+    """
+    SELECT format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF product_contents_archive '
+        'FOR VALUES FROM (%L) TO (%L);',
+        $1::text,
+        $2::timestamptz,
+        $3::timestamptz
+    );
+    """,
+)
+ARCHIVE_CANDIDATES = define_query(
+    "product_content.archive_candidates",
+    """
+    SELECT id, date_trunc('month', used_at AT TIME ZONE 'UTC') AS month
+    FROM product_contents
+    WHERE is_used = TRUE AND used_at < $1
+    ORDER BY used_at
+    LIMIT $2
+    FOR UPDATE SKIP LOCKED;
+    """,
+)
+ARCHIVE_CONTENTS = define_query(
+    "product_content.archive_contents",
+    """
+    WITH moved AS (
+        DELETE FROM product_contents
+        WHERE id = ANY($1::int[])
+        RETURNING id, product_id, content, content_sha256,
+                  used_by_order_id, created_at, used_at
+    )
+    INSERT INTO product_contents_archive (
+        id, product_id, content, content_sha256,
+        used_by_order_id, created_at, used_at
+    )
+    SELECT
+        id,
+        product_id,
+        content,
+        COALESCE(content_sha256, sha256(convert_to(content, 'UTF8'))),
+        used_by_order_id,
+        created_at,
+        used_at
+    FROM moved;
+    """,
+)
+RECONCILE_PRODUCT_STOCK = define_query(
+    "product_content.reconcile_product_stock",
+    """
+    UPDATE products p
+    SET stock = c.actual,
+        updated_at = NOW()
+    FROM (
+        SELECT COUNT(*) AS actual FROM product_contents
+        WHERE product_id = $1
+          AND is_used = FALSE
+          AND reserved_by_order_id IS NULL
+    ) c
+    WHERE p.id = $1 AND p.stock != c.actual
+    RETURNING p.stock;
+    """,
+)
+
+
+def content_sha256(content: str) -> bytes:
+    """SHA-256 of a (stripped) content, as stored in ``content_sha256``."""
+    return hashlib.sha256(content.encode("utf-8")).digest()
+
 
 async def add_content(product_id: int, content: str) -> int:
     """
@@ -46,6 +465,7 @@ async def add_product_content(product_id: int, content: str) -> int:
     if not content or not content.strip():
         raise ValueError("Content tidak boleh kosong")
 
+    await ensure_schema()
     # Validasi product exists
     pool = await get_pool()
     async with pool.acquire() as connection:
@@ -56,11 +476,10 @@ async def add_product_content(product_id: int, content: str) -> int:
         if not product_exists:
             raise ValueError(f"Produk dengan ID {product_id} tidak ditemukan")
 
-        # Check for duplicate content
-        duplicate_exists = await connection.fetchval(
-            "SELECT EXISTS(SELECT 1 FROM product_contents WHERE content = $1)",
-            content.strip(),
-        )
+        # Check for duplicate content (rows not yet backfilled are still
+        # caught by the UNIQUE(content) constraint on insert)
+        digest = content_sha256(content.strip())
+        duplicate_exists = await CONTENT_HASH_EXISTS.fetchval(connection, digest)
         if duplicate_exists:
             raise ValueError(
                 "Content ini sudah ada di database. Setiap content harus unik."
@@ -71,27 +490,19 @@ async def add_product_content(product_id: int, content: str) -> int:
                 # Insert content
                 content_row = await connection.fetchrow(
                     """
-                    INSERT INTO product_contents (product_id, content, is_used)
-                    VALUES ($1, $2, FALSE)
+                    INSERT INTO product_contents (
+                        product_id, content, content_sha256, is_used
+                    )
+                    VALUES ($1, $2, $3, FALSE)
                     RETURNING id;
                     """,
                     product_id,
                     content.strip(),
+                    digest,
                 )
 
-                # Update product stock count
-                await connection.execute(
-                    """
-                    UPDATE products
-                    SET stock = (
-                        SELECT COUNT(*) FROM product_contents
-                        WHERE product_id = $1 AND is_used = FALSE
-                    ),
-                    updated_at = NOW()
-                    WHERE id = $1;
-                    """,
-                    product_id,
-                )
+                await ADJUST_STOCK.execute(connection, product_id, 1)
+                await notify_product_changed(connection, product_id)
 
                 content_id = content_row["id"]
                 logger.info(
@@ -111,18 +522,58 @@ async def add_product_content(product_id: int, content: str) -> int:
                 raise
 
 
+async def backfill_content_hashes(batch_size: int = 1000) -> int:
+    """
+    Populate ``content_sha256`` for legacy rows in short transactions.
+
+    Args:
+        batch_size: Rows hashed per transaction
+
+    Returns:
+        Number of rows updated
+    """
+    await ensure_schema()
+
+    async def _hash(connection: asyncpg.Connection) -> str:
+        await lift_statement_timeout(connection)
+        return await BACKFILL_CONTENT_HASHES.execute(connection, batch_size)
+
+    pool = await get_pool()
+    total = 0
+    while True:
+        result = await pool.run_transaction(
+            _hash, name="product_content.backfill_content_hashes"
+        )
+        try:
+            updated = int(result.split(" ")[1])
+        except (IndexError, ValueError):
+            updated = 0
+        total += updated
+        if updated < batch_size:
+            break
+        # Let handlers use the pool between batches.
+        await asyncio.sleep(0.1)
+    if total:
+        logger.info("[product_content] Backfill content_sha256: %s baris", total)
+    return total
+
+
 async def add_bulk_product_content(
     product_id: int, contents: List[str]
 ) -> Dict[str, any]:
     """
     Add multiple product contents in bulk.
 
+    Lines are streamed into a temp table with COPY and inserted by a single
+    statement; duplicates are skipped through the unique indexes, and stock
+    is adjusted once for the whole batch.
+
     Args:
         product_id: The product ID
         contents: List of content strings
 
     Returns:
-        Dict with success count, failed items, and errors
+        Dict with success count, failed items, errors and a per-line report
 
     Raises:
         ValueError: If product doesn't exist or no valid contents
@@ -130,43 +581,81 @@ async def add_bulk_product_content(
     if not contents:
         raise ValueError("Daftar content tidak boleh kosong")
 
-    # Validasi product exists
-    pool = await get_pool()
-    async with pool.acquire() as connection:
+    results = {
+        "success": 0,
+        "failed": 0,
+        "errors": [],
+        "duplicate_contents": [],
+        "lines": [],
+    }
+
+    # Hash and dedupe inside the file before touching the database.
+    records: List[tuple] = []
+    first_line: Dict[bytes, int] = {}
+    problems: Dict[int, str] = {}
+    for line_no, raw in enumerate(contents, start=1):
+        content = raw.strip() if raw else ""
+        if not content:
+            results["lines"].append({"line": line_no, "status": "empty"})
+            problems[line_no] = "Content kosong"
+            continue
+        digest = content_sha256(content)
+        if digest in first_line:
+            results["lines"].append({"line": line_no, "status": "duplicate"})
+            problems[line_no] = f"Sama dengan baris {first_line[digest]}"
+            results["duplicate_contents"].append(content)
+            continue
+        first_line[digest] = line_no
+        results["lines"].append({"line": line_no, "status": "added"})
+        records.append((line_no, content, digest))
+
+    await ensure_schema()
+
+    async def _import(connection: asyncpg.Connection) -> List[int]:
         product_exists = await connection.fetchval(
             "SELECT EXISTS(SELECT 1 FROM products WHERE id = $1)",
             product_id,
         )
         if not product_exists:
             raise ValueError(f"Produk dengan ID {product_id} tidak ditemukan")
+        if not records:
+            return []
+
+        await lift_statement_timeout(connection)
+        await connection.execute(CREATE_IMPORT_TABLE)
+        await connection.copy_records_to_table(
+            "product_content_import",
+            records=records,
+            columns=("line_no", "content", "content_sha256"),
+        )
+        rows = await IMPORT_CONTENTS.fetch(connection, product_id)
+        inserted = [first_line[bytes(row["content_sha256"])] for row in rows]
+        if inserted:
+            await ADJUST_STOCK.execute(connection, product_id, len(inserted))
+            await notify_product_changed(connection, product_id)
+        return inserted
 
-    results = {
-        "success": 0,
-        "failed": 0,
-        "errors": [],
-        "duplicate_contents": [],
-    }
+    pool = await get_pool()
+    inserted = set(
+        await pool.run_transaction(
+            _import, name="product_content.add_bulk_product_content"
+        )
+    )
 
-    for idx, content in enumerate(contents):
-        if not content or not content.strip():
-            results["failed"] += 1
-            results["errors"].append(f"Baris {idx + 1}: Content kosong")
+    for line_no, content, _ in records:
+        if line_no in inserted:
             continue
+        results["lines"][line_no - 1]["status"] = "exists"
+        problems[line_no] = (
+            "Content ini sudah ada di database. Setiap content harus unik."
+        )
+        results["duplicate_contents"].append(content)
 
-        try:
-            await add_product_content(product_id, content)
-            results["success"] += 1
-        except ValueError as e:
-            results["failed"] += 1
-            error_detail = f"Baris {idx + 1}: {str(e)}"
-            results["errors"].append(error_detail)
-            if "sudah ada" in str(e).lower() or "duplicate" in str(e).lower():
-                results["duplicate_contents"].append(content.strip())
-        except Exception as e:
-            results["failed"] += 1
-            results["errors"].append(
-                f"Baris {idx + 1}: Error tidak diketahui - {str(e)}"
-            )
+    results["success"] = len(inserted)
+    results["failed"] = len(contents) - len(inserted)
+    results["errors"] = [
+        f"Baris {line_no}: {problem}" for line_no, problem in sorted(problems.items())
+    ]
 
     logger.info(
         "[product_content] Bulk add for product_id=%s: success=%s, failed=%s",
@@ -231,7 +720,9 @@ async def get_available_content(product_id: int, quantity: int = 1) -> List[Dict
             """
             SELECT id, product_id, content, created_at
             FROM product_contents
-            WHERE product_id = $1 AND is_used = FALSE
+            WHERE product_id = $1
+              AND is_used = FALSE
+              AND reserved_by_order_id IS NULL
             ORDER BY created_at ASC
             LIMIT $2
             FOR UPDATE SKIP LOCKED;
@@ -256,62 +747,161 @@ async def mark_content_as_used(content_id: int, order_id: UUID) -> bool:
     Raises:
         ValueError: If content not found or already used
     """
-    pool = await get_pool()
-    async with pool.acquire() as connection:
-        async with connection.transaction():
-            # Check if content exists and not used
-            content_check = await connection.fetchrow(
-                """
-                SELECT product_id, is_used
-                FROM product_contents
-                WHERE id = $1
-                FOR UPDATE;
-                """,
-                content_id,
-            )
 
-            if not content_check:
-                raise ValueError(f"Content dengan ID {content_id} tidak ditemukan")
+    async def _mark(connection: asyncpg.Connection) -> bool:
+        # Check if content exists and not used
+        content_check = await connection.fetchrow(
+            """
+            SELECT product_id, is_used, reserved_by_order_id
+            FROM product_contents
+            WHERE id = $1
+            FOR UPDATE;
+            """,
+            content_id,
+        )
 
-            if content_check["is_used"]:
-                raise ValueError(f"Content dengan ID {content_id} sudah digunakan")
+        if not content_check:
+            raise ValueError(f"Content dengan ID {content_id} tidak ditemukan")
 
-            # Mark as used
-            result = await connection.execute(
-                """
-                UPDATE product_contents
-                SET is_used = TRUE,
-                    used_by_order_id = $2,
-                    used_at = NOW()
-                WHERE id = $1 AND is_used = FALSE;
-                """,
+        if content_check["is_used"]:
+            raise ValueError(f"Content dengan ID {content_id} sudah digunakan")
+
+        # Mark as used
+        result = await connection.execute(
+            """
+            UPDATE product_contents
+            SET is_used = TRUE,
+                used_by_order_id = $2,
+                used_at = NOW(),
+                reserved_by_order_id = NULL,
+                reserved_until = NULL
+            WHERE id = $1 AND is_used = FALSE;
+            """,
+            content_id,
+            order_id,
+        )
+
+        product_id = content_check["product_id"]
+        success = result.endswith("1")
+        if success:
+            # A reserved content already left the stock counter.
+            if content_check["reserved_by_order_id"] is None:
+                await ADJUST_STOCK.execute(connection, product_id, -1)
+            await notify_product_changed(connection, product_id)
+            logger.info(
+                "[product_content] Marked content_id=%s as used by order=%s",
                 content_id,
                 order_id,
             )
+        return success
 
-            # Update product stock
-            product_id = content_check["product_id"]
-            await connection.execute(
-                """
-                UPDATE products
-                SET stock = (
-                    SELECT COUNT(*) FROM product_contents
-                    WHERE product_id = $1 AND is_used = FALSE
-                ),
-                updated_at = NOW()
-                WHERE id = $1;
-                """,
-                product_id,
-            )
+    pool = await get_pool()
+    return await pool.run_transaction(
+        _mark, name="product_content.mark_content_as_used"
+    )
 
-            success = result.endswith("1")
-            if success:
-                logger.info(
-                    "[product_content] Marked content_id=%s as used by order=%s",
-                    content_id,
-                    order_id,
-                )
-            return success
+
+async def reserve_order_contents(
+    connection: asyncpg.Connection, order_id: UUID, reserved_until: datetime
+) -> List[Dict[str, int]]:
+    """
+    Hold unused contents for every item of a freshly created order.
+
+    Must run inside the transaction that inserted the order items, after
+    ``ensure_schema()``; the reserved rows leave products.stock in the same
+    statement.
+
+    Args:
+        connection: Connection with an open transaction
+        order_id: The order awaiting payment
+        reserved_until: When an unpaid reservation may be swept
+
+    Returns:
+        One dict per product with ``quantity`` ordered and ``reserved``
+    """
+    rows = await RESERVE_ORDER_CONTENTS.fetch(connection, order_id, reserved_until)
+    reservations = [dict(row) for row in rows]
+    for reservation in reservations:
+        if reservation["reserved"]:
+            await notify_product_changed(connection, reservation["product_id"])
+    return reservations
+
+
+async def release_order_reservations(
+    connection: asyncpg.Connection, order_id: UUID
+) -> int:
+    """
+    Return an unpaid order's reserved contents to stock.
+
+    Args:
+        connection: Connection with an open transaction
+        order_id: The cancelled order
+
+    Returns:
+        Number of contents released
+    """
+    rows = await RELEASE_ORDER_RESERVATIONS.fetch(connection, order_id)
+    for row in rows:
+        await notify_product_changed(connection, row["product_id"])
+    return sum(row["released"] for row in rows)
+
+
+async def release_expired_reservations() -> int:
+    """
+    Release reservations past ``reserved_until`` whose order never settled.
+
+    Returns:
+        Number of contents released
+    """
+    await ensure_schema()
+
+    async def _release(connection: asyncpg.Connection) -> int:
+        rows = await RELEASE_EXPIRED_RESERVATIONS.fetch(connection)
+        for row in rows:
+            await notify_product_changed(connection, row["product_id"])
+        return sum(row["released"] for row in rows)
+
+    pool = await get_pool()
+    released = await pool.run_transaction(
+        _release, name="product_content.release_expired_reservations"
+    )
+    if released:
+        logger.info("[product_content] %s reservasi kedaluwarsa dilepas", released)
+    return released
+
+
+async def allocate_order_contents(
+    connection: asyncpg.Connection, order_id: UUID
+) -> List[Dict[str, int]]:
+    """
+    Mark an order's contents as used once it is paid.
+
+    Reserved contents are flipped to used; anything missing (expired or
+    pre-reservation orders) is claimed from free stock. Must run inside the
+    caller's transaction; stock and sold_count are updated by the same
+    statement.
+
+    Args:
+        connection: Connection with an open transaction
+        order_id: The order being fulfilled
+
+    Returns:
+        One dict per product with ``quantity`` ordered and ``allocated``
+    """
+    rows = await ALLOCATE_ORDER_CONTENTS.fetch(connection, order_id)
+    allocations = [dict(row) for row in rows]
+    for allocation in allocations:
+        if allocation["allocated"] < allocation["quantity"]:
+            logger.error(
+                "[stock_error] Insufficient content stock for product %s. "
+                "Required: %s, Available: %s for order %s",
+                allocation["product_id"],
+                allocation["quantity"],
+                allocation["allocated"],
+                order_id,
+            )
+        await notify_product_changed(connection, allocation["product_id"])
+    return allocations
 
 
 async def get_content_count(product_id: int) -> int:
@@ -329,7 +919,9 @@ async def get_content_count(product_id: int) -> int:
         count = await connection.fetchval(
             """
             SELECT COUNT(*) FROM product_contents
-            WHERE product_id = $1 AND is_used = FALSE;
+            WHERE product_id = $1
+              AND is_used = FALSE
+              AND reserved_by_order_id IS NULL;
             """,
             product_id,
         )
@@ -355,8 +947,10 @@ async def delete_product_content(content_id: int) -> bool:
             # Check if content exists and is not used
             content_row = await connection.fetchrow(
                 """
-                SELECT product_id, is_used FROM product_contents
-                WHERE id = $1;
+                SELECT product_id, is_used, reserved_by_order_id
+                FROM product_contents
+                WHERE id = $1
+                FOR UPDATE;
                 """,
                 content_id,
             )
@@ -369,33 +963,26 @@ async def delete_product_content(content_id: int) -> bool:
                     f"Content dengan ID {content_id} sudah digunakan dan tidak dapat dihapus"
                 )
 
+            if content_row["reserved_by_order_id"] is not None:
+                raise ValueError(
+                    f"Content dengan ID {content_id} sedang direservasi order yang belum dibayar"
+                )
+
             product_id = content_row["product_id"]
 
             # Delete the content
             result = await connection.execute(
                 """
                 DELETE FROM product_contents
-                WHERE id = $1 AND is_used = FALSE;
+                WHERE id = $1 AND is_used = FALSE AND reserved_by_order_id IS NULL;
                 """,
                 content_id,
             )
 
-            # Update product stock
-            await connection.execute(
-                """
-                UPDATE products
-                SET stock = (
-                    SELECT COUNT(*) FROM product_contents
-                    WHERE product_id = $1 AND is_used = FALSE
-                ),
-                updated_at = NOW()
-                WHERE id = $1;
-                """,
-                product_id,
-            )
-
             success = result.endswith("1")
             if success:
+                await ADJUST_STOCK.execute(connection, product_id, -1)
+                await notify_product_changed(connection, product_id)
                 logger.info(
                     "[product_content] Deleted content_id=%s for product_id=%s",
                     content_id,
@@ -438,6 +1025,7 @@ async def list_product_contents(
     if offset < 0:
         raise ValueError("Offset tidak boleh negatif")
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
         if used is None:
@@ -453,6 +1041,45 @@ async def list_product_contents(
                     used_at
                 FROM product_contents
                 WHERE product_id = $1
+                UNION ALL
+                SELECT
+                    id,
+                    product_id,
+                    content,
+                    TRUE,
+                    used_by_order_id,
+                    created_at,
+                    used_at
+                FROM product_contents_archive
+                WHERE product_id = $1
+                ORDER BY created_at DESC
+                LIMIT $2 OFFSET $3;
+            """
+            rows = await connection.fetch(query, product_id, limit, offset)
+        elif used:
+            # Used contents live in the archive once past the grace period
+            query = """
+                SELECT
+                    id,
+                    product_id,
+                    content,
+                    is_used,
+                    used_by_order_id,
+                    created_at,
+                    used_at
+                FROM product_contents
+                WHERE product_id = $1 AND is_used = TRUE
+                UNION ALL
+                SELECT
+                    id,
+                    product_id,
+                    content,
+                    TRUE,
+                    used_by_order_id,
+                    created_at,
+                    used_at
+                FROM product_contents_archive
+                WHERE product_id = $1
                 ORDER BY created_at DESC
                 LIMIT $2 OFFSET $3;
             """
@@ -479,7 +1106,8 @@ async def list_product_contents(
 
 async def get_order_contents(order_id: UUID) -> List[Dict]:
     """
-    Get all product contents that were delivered for an order.
+    Get all product contents that were delivered for an order, including
+    contents already moved to the archive.
 
     Args:
         order_id: The order UUID
@@ -487,6 +1115,7 @@ async def get_order_contents(order_id: UUID) -> List[Dict]:
     Returns:
         List of content records with product info
     """
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
         rows = await connection.fetch(
@@ -498,9 +1127,16 @@ async def get_order_contents(order_id: UUID) -> List[Dict]:
                 p.id as product_id,
                 p.name as product_name,
                 p.code as product_code
-            FROM product_contents pc
+            FROM (
+                SELECT id, product_id, content, used_at
+                FROM product_contents
+                WHERE used_by_order_id = $1
+                UNION ALL
+                SELECT id, product_id, content, used_at
+                FROM product_contents_archive
+                WHERE used_by_order_id = $1
+            ) pc
             JOIN products p ON pc.product_id = p.id
-            WHERE pc.used_by_order_id = $1
             ORDER BY pc.used_at ASC;
             """,
             order_id,
@@ -524,7 +1160,9 @@ async def recalculate_stock(product_id: int) -> int:
         unused_count = await connection.fetchval(
             """
             SELECT COUNT(*) FROM product_contents
-            WHERE product_id = $1 AND is_used = FALSE;
+            WHERE product_id = $1
+              AND is_used = FALSE
+              AND reserved_by_order_id IS NULL;
             """,
             product_id,
         )
@@ -539,6 +1177,7 @@ async def recalculate_stock(product_id: int) -> int:
             unused_count,
             product_id,
         )
+        await notify_product_changed(connection, product_id)
 
         logger.info(
             "[product_content] Recalculated stock for product %s: %s",
@@ -566,6 +1205,7 @@ async def recalculate_all_stock() -> Dict[str, int]:
                 SELECT COUNT(*) FROM product_contents
                 WHERE product_contents.product_id = products.id
                 AND is_used = FALSE
+                AND reserved_by_order_id IS NULL
             ),
             updated_at = NOW();
             """
@@ -576,6 +1216,7 @@ async def recalculate_all_stock() -> Dict[str, int]:
             updated_count = int(result.split(" ")[1])
         except (IndexError, ValueError):
             updated_count = 0
+        await notify_catalog_reload(connection)
 
         logger.info(
             "[product_content] Recalculated stock for %s products", updated_count
@@ -584,6 +1225,126 @@ async def recalculate_all_stock() -> Dict[str, int]:
         return {"updated_count": updated_count}
 
 
+async def reconcile_stock() -> List[int]:
+    """
+    Repair products whose stock counter drifted from the unused contents.
+
+    Each product is fixed in its own transaction after locking its row, so a
+    sale running concurrently applies its delta on top of the fresh count.
+
+    Returns:
+        IDs of products whose stock was corrected
+    """
+    async def _candidates(connection: asyncpg.Connection) -> List[Any]:
+        await lift_statement_timeout(connection)
+        return await STOCK_MISMATCHES.fetch(connection)
+
+    pool = await get_pool()
+    candidates = await pool.run_transaction(
+        _candidates, readonly=True, name="product_content.stock_mismatches"
+    )
+    fixed: List[int] = []
+    for candidate in candidates:
+        product_id = candidate["id"]
+
+        async def _fix(connection: asyncpg.Connection) -> Any:
+            await lift_statement_timeout(connection)
+            await connection.execute(
+                "SELECT 1 FROM products WHERE id = $1 FOR UPDATE;", product_id
+            )
+            stock = await RECONCILE_PRODUCT_STOCK.fetchval(connection, product_id)
+            if stock is not None:
+                await notify_product_changed(connection, product_id)
+            return stock
+
+        stock = await pool.run_transaction(_fix, name="product_content.reconcile_stock")
+        if stock is not None:
+            fixed.append(product_id)
+            logger.warning(
+                "[product_content] Stock product %s dikoreksi menjadi %s",
+                product_id,
+                stock,
+            )
+    return fixed
+
+
+async def _ensure_archive_partitions(
+    connection: asyncpg.Connection, months: Iterable[datetime]
+) -> List[datetime]:
+    """Create missing monthly partitions; returns the months handled.
+
+    Runs inside the caller's transaction under an advisory lock, so archive
+    jobs in the bot and server processes cannot race on the same partition.
+    """
+    missing = sorted(set(months) - _archive_partitions)
+    if not missing:
+        return []
+    await connection.execute(
+        "SELECT pg_advisory_xact_lock(hashtext($1));", _ARCHIVE_PARTITION_LOCK
+    )
+    for month in missing:
+        start = month.replace(day=1, tzinfo=timezone.utc)
+        end = (start + timedelta(days=32)).replace(day=1)
+        ddl = await ARCHIVE_PARTITION_DDL.fetchval(
+            connection, f"product_contents_archive_{start:%Y%m}", start, end
+        )
+        await connection.execute(ddl)
+    return missing
+
+
+async def archive_used_contents(
+    older_than_days: int = 7, batch_size: int = 500, max_batches: int = 20
+) -> int:
+    """
+    Move delivered contents into the monthly-partitioned archive.
+
+    Works in batches of ``batch_size`` rows, each in its own transaction,
+    and stops after ``max_batches`` so one run stays bounded.
+
+    Args:
+        older_than_days: Grace period after ``used_at`` before archiving
+        batch_size: Rows moved per transaction
+        max_batches: Upper bound on transactions per call
+
+    Returns:
+        Number of contents archived
+    """
+    await ensure_schema()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    created: List[datetime] = []
+
+    async def _move(connection: asyncpg.Connection) -> int:
+        created.clear()
+        await lift_statement_timeout(connection)
+        rows = await ARCHIVE_CANDIDATES.fetch(connection, cutoff, batch_size)
+        if not rows:
+            return 0
+        created.extend(
+            await _ensure_archive_partitions(
+                connection, (row["month"] for row in rows)
+            )
+        )
+        await ARCHIVE_CONTENTS.execute(connection, [row["id"] for row in rows])
+        return len(rows)
+
+    pool = await get_pool()
+    total = 0
+    for _ in range(max_batches):
+        moved = await pool.run_transaction(
+            _move, name="product_content.archive_used_contents"
+        )
+        # Only remember partitions whose DDL committed.
+        _archive_partitions.update(created)
+        total += moved
+        if moved < batch_size:
+            break
+        await asyncio.sleep(0.1)
+    if total:
+        logger.info("[product_content] %s konten terpakai diarsipkan", total)
+    return total
+
+
 async def check_content_integrity() -> Dict[str, any]:
     """
     Check for content integrity issues like:
@@ -622,11 +1383,15 @@ async def check_content_integrity() -> Dict[str, any]:
                 p.code,
                 p.name,
                 p.stock as recorded_stock,
-                COUNT(pc.id) FILTER (WHERE pc.is_used = FALSE) as actual_stock
+                COUNT(pc.id) FILTER (
+                    WHERE pc.is_used = FALSE AND pc.reserved_by_order_id IS NULL
+                ) as actual_stock
             FROM products p
             LEFT JOIN product_contents pc ON pc.product_id = p.id
             GROUP BY p.id, p.code, p.name, p.stock
-            HAVING p.stock != COUNT(pc.id) FILTER (WHERE pc.is_used = FALSE);
+            HAVING p.stock != COUNT(pc.id) FILTER (
+                    WHERE pc.is_used = FALSE AND pc.reserved_by_order_id IS NULL
+                );
             """
         )
 
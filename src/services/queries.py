@@ -0,0 +1,171 @@
+"""Named SQL catalog with per-query call, row and latency statistics."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.core.telemetry import LatencyHistogram
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Counters for a single named query."""
+
+    calls: int = 0
+    rows: int = 0
+    errors: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "errors": self.errors,
+            **self.latency.summary(),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Query:
+    """SQL statement with a stable name, e.g. ``catalog.list_products``.
+
+    The ``fetch``/``fetchrow``/``fetchval``/``execute`` helpers accept either a
+    :class:`~src.services.postgres.PostgresPool` or a raw connection, so the
+    same statement is timed inside and outside transactions. asyncpg keeps a
+    prepared statement per connection keyed by SQL text, which stays hot as
+    long as the text is constant.
+    """
+
+    name: str
+    sql: str
+
+    async def fetch(self, executor: Any, *args: Any, **kwargs: Any) -> List[Any]:
+        started = time.perf_counter()
+        try:
+            rows = await executor.fetch(self.sql, *args, **kwargs)
+        except Exception:
+            _record(self.name, started, 0, error=True)
+            raise
+        _record(self.name, started, len(rows) if rows else 0)
+        return rows
+
+    async def fetchrow(self, executor: Any, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            row = await executor.fetchrow(self.sql, *args, **kwargs)
+        except Exception:
+            _record(self.name, started, 0, error=True)
+            raise
+        _record(self.name, started, 0 if row is None else 1)
+        return row
+
+    async def fetchval(self, executor: Any, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            value = await executor.fetchval(self.sql, *args, **kwargs)
+        except Exception:
+            _record(self.name, started, 0, error=True)
+            raise
+        _record(self.name, started, 1)
+        return value
+
+    async def execute(self, executor: Any, *args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            status = await executor.execute(self.sql, *args, **kwargs)
+        except Exception:
+            _record(self.name, started, 0, error=True)
+            raise
+        _record(self.name, started, _affected_rows(status))
+        return status
+
+
+_catalog: Dict[str, Query] = {}
+_names_by_sql: Dict[str, str] = {}
+_stats: Dict[str, QueryStats] = {}
+
+
+def define_query(name: str, sql: str) -> Query:
+    """Register ``sql`` under ``name`` and return the :class:`Query`."""
+    existing = _catalog.get(name)
+    if existing is not None:
+        if existing.sql != sql:
+            raise ValueError(f"Query '{name}' sudah terdaftar dengan SQL berbeda.")
+        return existing
+    query = Query(name=name, sql=sql)
+    _catalog[name] = query
+    _names_by_sql[sql] = name
+    return query
+
+
+async def purge_in_batches(
+    executor: Any,
+    query: Query,
+    age: Any,
+    batch_size: int,
+    max_batches: int,
+) -> int:
+    """Run a ``DELETE ... LIMIT`` query until a batch comes back short.
+
+    ``query`` takes ``$1`` = age (interval) and ``$2`` = batch size. Small
+    batches keep each transaction short on busy tables; returns the rows
+    deleted.
+    """
+    deleted = 0
+    for _ in range(max(1, max_batches)):
+        removed = _affected_rows(await query.execute(executor, age, batch_size))
+        deleted += removed
+        if removed < batch_size:
+            break
+    return deleted
+
+
+def get_query(name: str) -> Query:
+    """Look up a registered query by name."""
+    try:
+        return _catalog[name]
+    except KeyError:
+        raise KeyError(f"Query '{name}' tidak terdaftar.") from None
+
+
+def name_for_sql(sql: str) -> str | None:
+    """Return the catalog name of ``sql`` if it was registered."""
+    return _names_by_sql.get(sql)
+
+
+def query_names() -> List[str]:
+    return sorted(_catalog)
+
+
+def query_stats() -> Dict[str, Dict[str, Any]]:
+    """Return stats per query name, slowest p95 first."""
+    summaries = {name: stats.summary() for name, stats in _stats.items()}
+    return dict(
+        sorted(summaries.items(), key=lambda item: item[1]["p95_ms"], reverse=True)
+    )
+
+
+def reset_query_stats() -> None:
+    _stats.clear()
+
+
+def _record(name: str, started: float, rows: int, *, error: bool = False) -> None:
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = QueryStats()
+    stats.calls += 1
+    stats.rows += rows
+    if error:
+        stats.errors += 1
+    stats.latency.observe((time.perf_counter() - started) * 1000)
+
+
+def _affected_rows(status: Any) -> int:
+    # asyncpg returns command tags such as "UPDATE 3" or "INSERT 0 1".
+    if isinstance(status, str):
+        tail = status.rsplit(" ", 1)[-1]
+        if tail.isdigit():
+            return int(tail)
+    return 0
@@ -0,0 +1,83 @@
+"""Map asyncpg records straight onto slotted objects."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Generic, Iterable, List, Tuple, TypeVar
+
+from src.services.queries import Query
+
+
+T = TypeVar("T")
+
+
+class RowMapper(Generic[T]):
+    """Turn records with a fixed column layout into ``T`` instances.
+
+    ``build`` receives the record and reads columns by index, which skips
+    the ``dict(row)`` copy and per-key lookups. Use :meth:`positional` when
+    the SELECT list matches the constructor's positional parameters.
+    Services opt in by mapping their rows here instead of returning
+    ``[dict(row) for row in rows]``.
+    """
+
+    __slots__ = ("_build",)
+
+    def __init__(self, build: Callable[[Any], T]) -> None:
+        self._build = build
+
+    @classmethod
+    def positional(cls, factory: Callable[..., T]) -> "RowMapper[T]":
+        return cls(lambda record: factory(*record))
+
+    def one(self, record: Any) -> T | None:
+        return None if record is None else self._build(record)
+
+    def many(self, records: Iterable[Any]) -> List[T]:
+        return list(map(self._build, records))
+
+    async def fetch(
+        self, executor: Any, query: str | Query, *args: Any, **kwargs: Any
+    ) -> List[T]:
+        if isinstance(query, Query):
+            rows = await query.fetch(executor, *args, **kwargs)
+        else:
+            rows = await executor.fetch(query, *args, **kwargs)
+        return self.many(rows)
+
+    async def fetchrow(
+        self, executor: Any, query: str | Query, *args: Any, **kwargs: Any
+    ) -> T | None:
+        if isinstance(query, Query):
+            row = await query.fetchrow(executor, *args, **kwargs)
+        else:
+            row = await executor.fetchrow(query, *args, **kwargs)
+        return self.one(row)
+
+
+class Interner(Generic[T]):
+    """Share one instance per distinct tuple of constructor values.
+
+    Keyed on every value rather than the id alone, so an edited row yields
+    a new instance instead of a stale shared one.
+    """
+
+    __slots__ = ("_factory", "_instances", "_max_size")
+
+    def __init__(self, factory: Callable[..., T], max_size: int = 4096) -> None:
+        self._factory = factory
+        self._instances: Dict[Tuple[Any, ...], T] = {}
+        self._max_size = max_size
+
+    def get(self, *values: Any) -> T:
+        instance = self._instances.get(values)
+        if instance is None:
+            if len(self._instances) >= self._max_size:
+                self._instances.clear()
+            instance = self._instances[values] = self._factory(*values)
+        return instance
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def clear(self) -> None:
+        self._instances.clear()
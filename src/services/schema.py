@@ -0,0 +1,70 @@
+"""Startup schema registry for DDL owned by service modules."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from src.services.postgres import get_pool
+
+
+logger = logging.getLogger(__name__)
+
+_LOCK_NAME = "schema_bootstrap"
+
+_registry: Dict[str, Tuple[str, ...]] = {}
+_pending: List[str] = []
+_apply_lock = asyncio.Lock()
+
+
+def register_schema(name: str, *statements: str) -> None:
+    """Register idempotent DDL statements owned by a service module.
+
+    Statements are applied once per process by :func:`apply_schema`, in
+    registration order, so modules should only register DDL that depends on
+    tables from ``scripts/schema.sql`` or on earlier registrations.
+    """
+    if name in _registry:
+        if _registry[name] != tuple(statements):
+            raise ValueError(f"Schema '{name}' sudah terdaftar dengan DDL berbeda.")
+        return
+    _registry[name] = tuple(statements)
+    _pending.append(name)
+
+
+def registered_schemas() -> List[str]:
+    """Return registered schema names in application order."""
+    return list(_registry)
+
+
+async def apply_schema() -> List[str]:
+    """Apply pending registered DDL under a cluster-wide advisory lock.
+
+    Returns the names applied by this call.
+    """
+    if not _pending:
+        return []
+    async with _apply_lock:
+        names = list(_pending)
+        if not names:
+            return []
+        pool = await get_pool()
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext($1));", _LOCK_NAME
+                )
+                for name in names:
+                    for statement in _registry[name]:
+                        await connection.execute(statement)
+        for name in names:
+            _pending.remove(name)
+        logger.info("[schema] Applied DDL for: %s", ", ".join(names))
+        return names
+
+
+async def ensure_schema() -> None:
+    """Apply registered DDL lazily; no-op once the startup bootstrap ran."""
+    if _pending:
+        await apply_schema()
@@ -0,0 +1,112 @@
+"""Persist sampled EXPLAIN plans for slow statements."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Set
+
+from src.services.postgres import (
+    PostgresPool,
+    SlowQuery,
+    get_pool,
+    suppress_slow_log,
+)
+from src.services.schema import register_schema
+
+
+logger = logging.getLogger(__name__)
+
+register_schema(
+    "slow_queries",
+    """
+    CREATE TABLE IF NOT EXISTS slow_queries (
+        id BIGSERIAL PRIMARY KEY,
+        query_name TEXT,
+        query TEXT NOT NULL,
+        caller TEXT,
+        param_types TEXT[] NOT NULL DEFAULT '{}',
+        duration_ms DOUBLE PRECISION NOT NULL,
+        plan JSONB,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_slow_queries_created_at ON slow_queries (created_at);",
+)
+
+# EXPLAIN without ANALYZE never executes the statement, but utility commands
+# (SET, BEGIN, DDL) cannot be explained at all.
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+
+class SlowQueryRecorder:
+    """Pool listener that EXPLAINs a sample of slow statements on a side connection."""
+
+    def __init__(
+        self, pool: PostgresPool, sample_rate: float, max_in_flight: int = 2
+    ) -> None:
+        self._pool = pool
+        self._sample_rate = sample_rate
+        self._max_in_flight = max_in_flight
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __call__(self, slow: SlowQuery) -> None:
+        if len(self._tasks) >= self._max_in_flight:
+            return
+        if random.random() >= self._sample_rate:
+            return
+        task = asyncio.get_running_loop().create_task(self._record(slow))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _record(self, slow: SlowQuery) -> None:
+        suppress_slow_log()
+        plan = None
+        try:
+            async with self._pool.side_connection() as connection:
+                if slow.query.lstrip().lower().startswith(_EXPLAINABLE):
+                    try:
+                        plan = await connection.fetchval(
+                            f"EXPLAIN (FORMAT JSON) {slow.query}", *slow.args
+                        )
+                    except Exception as exc:
+                        logger.debug("[slow_query] EXPLAIN gagal: %s", exc)
+                await connection.execute(
+                    """
+                    INSERT INTO slow_queries
+                        (query_name, query, caller, param_types, duration_ms, plan)
+                    VALUES ($1, $2, $3, $4, $5, $6::jsonb);
+                    """,
+                    slow.name,
+                    slow.query,
+                    slow.caller,
+                    slow.param_types,
+                    slow.duration_ms,
+                    plan,
+                )
+        except Exception as exc:
+            logger.warning("[slow_query] Gagal menyimpan slow query: %s", exc)
+
+
+def install_slow_query_recorder(pool: PostgresPool, sample_rate: float) -> None:
+    """Attach a :class:`SlowQueryRecorder` to ``pool``."""
+    if sample_rate <= 0:
+        return
+    pool.add_slow_query_listener(SlowQueryRecorder(pool, sample_rate))
+
+
+async def list_slow_queries(limit: int = 20) -> List[Dict[str, Any]]:
+    """Return the most recent slow queries, newest first."""
+    pool = await get_pool()
+    rows = await pool.fetch(
+        """
+        SELECT id, query_name, caller, param_types, duration_ms, created_at
+        FROM slow_queries
+        ORDER BY created_at DESC
+        LIMIT $1;
+        """,
+        limit,
+        readonly=True,
+    )
+    return [dict(row) for row in rows]
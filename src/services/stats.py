@@ -3,17 +3,22 @@
 from __future__ import annotations
 
 from src.services.postgres import get_pool
+from src.services.queries import define_query
+
+
+BOT_STATISTICS = define_query(
+    "stats.bot_statistics",
+    """
+    SELECT
+        (SELECT COUNT(*) FROM users) AS total_users,
+        (SELECT COUNT(*) FROM orders WHERE status = 'paid') AS total_transactions;
+    """,
+)
 
 
 async def get_bot_statistics() -> dict[str, int]:
     pool = await get_pool()
-    row = await pool.fetchrow(
-        """
-        SELECT
-            (SELECT COUNT(*) FROM users) AS total_users,
-            (SELECT COUNT(*) FROM orders WHERE status = 'paid') AS total_transactions;
-        """
-    )
+    row = await pool.fetchrow(BOT_STATISTICS, readonly=True)
     if row is None:
         return {"total_users": 0, "total_transactions": 0}
     return {
@@ -0,0 +1,97 @@
+"""Process-wide Telegram sender with keep-alive and bounded fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable
+
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FANOUT_CONCURRENCY = 8
+
+
+class TelegramSender:
+    """Send messages through one long-lived :class:`telegram.Bot`.
+
+    Reusing the bot keeps its HTTP connections (and TLS sessions) warm.
+    :meth:`fan_out` sends to many chats concurrently, at most
+    ``max_concurrency`` at a time; one recipient failing never affects the
+    others.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+        request: HTTPXRequest | None = None,
+    ) -> None:
+        self.bot = bot
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._request = request
+
+    @classmethod
+    def from_token(
+        cls, token: str, *, max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY
+    ) -> "TelegramSender":
+        """Build a sender that owns its connection pool (webhook server)."""
+        request = HTTPXRequest(connection_pool_size=max_concurrency + 2)
+        bot = Bot(token=token, request=request)
+        return cls(bot, max_concurrency=max_concurrency, request=request)
+
+    async def send(self, chat_id: int, text: str, **kwargs: Any) -> bool:
+        """Send one message; failures are logged and reported as ``False``."""
+        async with self._semaphore:
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            except Exception as exc:
+                logger.warning(
+                    "[telegram_sender] Gagal kirim pesan ke %s: %s", chat_id, exc
+                )
+                return False
+        return True
+
+    async def fan_out(
+        self, chat_ids: Iterable[int], text: str, **kwargs: Any
+    ) -> Dict[int, bool]:
+        """Send ``text`` to every chat concurrently; returns success per chat."""
+        recipients = list(dict.fromkeys(chat_ids))
+        results = await asyncio.gather(
+            *(self.send(chat_id, text, **kwargs) for chat_id in recipients)
+        )
+        return dict(zip(recipients, results))
+
+    async def aclose(self) -> None:
+        if self._request is not None:
+            await self._request.shutdown()
+
+
+_sender: TelegramSender | None = None
+
+
+def set_telegram_sender(sender: TelegramSender | None) -> None:
+    """Install the process-wide sender (e.g. wrapping ``application.bot``)."""
+    global _sender
+    _sender = sender
+
+
+def get_telegram_sender() -> TelegramSender:
+    """Return the process-wide sender, creating one from settings if needed."""
+    global _sender
+    if _sender is None:
+        from src.core.config import get_settings
+
+        _sender = TelegramSender.from_token(get_settings().telegram_bot_token)
+    return _sender
+
+
+async def close_telegram_sender() -> None:
+    global _sender
+    sender, _sender = _sender, None
+    if sender is not None:
+        await sender.aclose()
@@ -7,58 +7,51 @@ from typing import Any, Dict, Iterable, List, Optional
 
 from src.core.encryption import encrypt_text
 from src.services.postgres import get_pool
+from src.services.schema import ensure_schema, register_schema
 
 logger = logging.getLogger(__name__)
 
-
-async def _ensure_tables() -> None:
-    """Create SNK related tables when missing."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS product_terms (
-                product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
-                content TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                updated_at TIMESTAMPTZ DEFAULT NOW()
-            );
-            """
-        )
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS product_term_submissions (
-                id BIGSERIAL PRIMARY KEY,
-                order_id UUID NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                telegram_user_id BIGINT NOT NULL,
-                message TEXT,
-                media_file_id TEXT,
-                media_type TEXT,
-                created_at TIMESTAMPTZ DEFAULT NOW()
-            );
-            """
-        )
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS product_term_notifications (
-                id BIGSERIAL PRIMARY KEY,
-                order_id UUID NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                telegram_user_id BIGINT NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                sent_at TIMESTAMPTZ,
-                responded_at TIMESTAMPTZ,
-                UNIQUE (order_id, product_id)
-            );
-            """
-        )
+register_schema(
+    "terms",
+    """
+    CREATE TABLE IF NOT EXISTS product_terms (
+        product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+        content TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_term_submissions (
+        id BIGSERIAL PRIMARY KEY,
+        order_id UUID NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        telegram_user_id BIGINT NOT NULL,
+        message TEXT,
+        media_file_id TEXT,
+        media_type TEXT,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_term_notifications (
+        id BIGSERIAL PRIMARY KEY,
+        order_id UUID NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        telegram_user_id BIGINT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        sent_at TIMESTAMPTZ,
+        responded_at TIMESTAMPTZ,
+        UNIQUE (order_id, product_id)
+    );
+    """,
+)
 
 
 async def set_product_terms(*, product_id: int, content: str) -> None:
     """Create or update SNK content for a product."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         await conn.execute(
@@ -76,7 +69,7 @@ async def set_product_terms(*, product_id: int, content: str) -> None:
 
 async def clear_product_terms(product_id: int) -> None:
     """Remove SNK entry for a product."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         await conn.execute(
@@ -87,7 +80,7 @@ async def clear_product_terms(product_id: int) -> None:
 
 async def get_product_terms(product_id: int) -> Optional[str]:
     """Return SNK content for a product when available."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -104,7 +97,7 @@ async def fetch_terms_for_products(
     ids = list(dict.fromkeys(product_ids))
     if not ids:
         return {}
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         rows = await conn.fetch(
@@ -128,7 +121,7 @@ async def record_terms_submission(
     media_type: str | None,
 ) -> int:
     """Persist customer SNK submission for audit and follow-up."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -163,7 +156,7 @@ async def record_terms_submission(
 
 async def schedule_terms_notifications(order_id: str) -> int:
     """Insert pending SNK notifications for order items that have terms."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     inserted = 0
     async with pool.acquire() as conn:
@@ -217,7 +210,7 @@ async def schedule_terms_notifications(order_id: str) -> int:
 
 async def list_pending_notifications(limit: int = 20) -> List[Dict[str, Any]]:
     """Return SNK notifications not yet sent."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         rows = await conn.fetch(
@@ -235,7 +228,7 @@ async def list_pending_notifications(limit: int = 20) -> List[Dict[str, Any]]:
 
 async def mark_notification_sent(notification_id: int) -> None:
     """Mark SNK notification as delivered to customer."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         await conn.execute(
@@ -250,7 +243,7 @@ async def mark_notification_sent(notification_id: int) -> None:
 
 async def mark_notification_responded(notification_id: int) -> None:
     """Mark SNK notification as responded by customer."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         await conn.execute(
@@ -265,7 +258,7 @@ async def mark_notification_responded(notification_id: int) -> None:
 
 async def get_notification(notification_id: int) -> Optional[Dict[str, Any]]:
     """Fetch single SNK notification row."""
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -282,7 +275,7 @@ async def get_notification(notification_id: int) -> Optional[Dict[str, Any]]:
 async def purge_old_submissions(retention_days: int) -> int:
     """Hapus submission SNK yang melampaui retention."""
 
-    await _ensure_tables()
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
         result = await conn.execute(
@@ -5,6 +5,61 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 
 from src.services.postgres import get_pool
+from src.services.queries import define_query
+from src.services.schema import ensure_schema, register_schema
+
+
+register_schema(
+    "users",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS balance_cents BIGINT DEFAULT 0;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS bank_id TEXT;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_verified BOOLEAN DEFAULT FALSE;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS display_name TEXT;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS whatsapp_number TEXT;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_blocked BOOLEAN DEFAULT FALSE;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS bot_blocked BOOLEAN DEFAULT FALSE;",
+)
+
+UPSERT_USER = define_query(
+    "users.upsert_user",
+    """
+    INSERT INTO users (telegram_id, username, first_name, last_name)
+    VALUES ($1, $2, $3, $4)
+    ON CONFLICT (telegram_id)
+    DO UPDATE SET
+        username = EXCLUDED.username,
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        updated_at = NOW()
+    RETURNING id;
+    """,
+)
+GET_USER_PROFILE = define_query(
+    "users.get_user_profile",
+    """
+    SELECT
+        telegram_id,
+        username,
+        first_name,
+        last_name,
+        balance_cents,
+        bank_id,
+        is_verified,
+        display_name,
+        whatsapp_number
+    FROM users
+    WHERE telegram_id = $1
+    LIMIT 1;
+    """,
+)
+IS_BLOCKED_BY_ID = define_query(
+    "users.is_blocked_by_id",
+    "SELECT is_blocked FROM users WHERE id = $1 LIMIT 1;",
+)
+IS_BLOCKED_BY_TELEGRAM_ID = define_query(
+    "users.is_blocked_by_telegram_id",
+    "SELECT is_blocked FROM users WHERE telegram_id = $1 LIMIT 1;",
+)
 
 
 async def upsert_user(
@@ -17,18 +72,8 @@ async def upsert_user(
     """Insert or update a user and return internal ID."""
     pool = await get_pool()
     async with pool.acquire() as connection:
-        row = await connection.fetchrow(
-            """
-            INSERT INTO users (telegram_id, username, first_name, last_name)
-            VALUES ($1, $2, $3, $4)
-            ON CONFLICT (telegram_id)
-            DO UPDATE SET
-                username = EXCLUDED.username,
-                first_name = EXCLUDED.first_name,
-                last_name = EXCLUDED.last_name,
-                updated_at = NOW()
-            RETURNING id;
-            """,
+        row = await UPSERT_USER.fetchrow(
+            connection,
             telegram_id,
             username,
             first_name,
@@ -39,44 +84,13 @@ async def upsert_user(
     return int(row["id"])
 
 
-async def _ensure_profile_columns(connection) -> None:
-    """Ensure optional profile columns exist."""
-    await connection.execute(
-        "ALTER TABLE users ADD COLUMN IF NOT EXISTS balance_cents BIGINT DEFAULT 0;"
-    )
-    await connection.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS bank_id TEXT;")
-    await connection.execute(
-        "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_verified BOOLEAN DEFAULT FALSE;"
-    )
-    await connection.execute(
-        "ALTER TABLE users ADD COLUMN IF NOT EXISTS display_name TEXT;"
-    )
-    await connection.execute(
-        "ALTER TABLE users ADD COLUMN IF NOT EXISTS whatsapp_number TEXT;"
-    )
-
-
 async def get_user_profile(telegram_id: int) -> Optional[Dict[str, Any]]:
     """Get extended profile info for a Telegram user."""
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_profile_columns(connection)
-        row = await connection.fetchrow(
-            """
-            SELECT
-                telegram_id,
-                username,
-                first_name,
-                last_name,
-                balance_cents,
-                bank_id,
-                is_verified,
-                display_name,
-                whatsapp_number
-            FROM users
-            WHERE telegram_id = $1
-            LIMIT 1;
-            """,
+        row = await GET_USER_PROFILE.fetchrow(
+            connection,
             telegram_id,
         )
     return dict(row) if row else None
@@ -116,9 +130,9 @@ async def update_user_profile(
     if not fields:
         return
 
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as connection:
-        await _ensure_profile_columns(connection)
         await connection.execute(
             f"""
             UPDATE users
@@ -133,14 +147,9 @@ async def update_user_profile(
 
 async def list_users(limit: int = 50) -> list:
     """List semua user."""
+    await ensure_schema()
     pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_blocked BOOLEAN DEFAULT FALSE;"
-        )
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS bot_blocked BOOLEAN DEFAULT FALSE;"
-        )
+    async with pool.acquire(readonly=True) as conn:
         rows = await conn.fetch(
             "SELECT * FROM users ORDER BY created_at DESC LIMIT $1;", limit
         )
@@ -149,11 +158,9 @@ async def list_users(limit: int = 50) -> list:
 
 async def block_user(user_id: int) -> None:
     """Blokir user."""
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_blocked BOOLEAN DEFAULT FALSE;"
-        )
         await conn.execute(
             """
             UPDATE users
@@ -167,11 +174,9 @@ async def block_user(user_id: int) -> None:
 
 async def unblock_user(user_id: int) -> None:
     """Unblokir user."""
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_blocked BOOLEAN DEFAULT FALSE;"
-        )
         await conn.execute(
             """
             UPDATE users
@@ -206,33 +211,22 @@ async def is_user_blocked(
     """Check whether user is blocked."""
     if user_id is None and telegram_id is None:
         raise ValueError("Provide user_id atau telegram_id.")
+    await ensure_schema()
     pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_blocked BOOLEAN DEFAULT FALSE;"
-        )
-        if user_id is not None:
-            row = await conn.fetchrow(
-                "SELECT is_blocked FROM users WHERE id = $1 LIMIT 1;", user_id
-            )
-        else:
-            row = await conn.fetchrow(
-                "SELECT is_blocked FROM users WHERE telegram_id = $1 LIMIT 1;",
-                telegram_id,
-            )
+    # Access gate: read the primary so a fresh block applies at once, via
+    # pool.fetchrow so the check does not pin the update's later reads.
+    if user_id is not None:
+        row = await IS_BLOCKED_BY_ID.fetchrow(pool, user_id)
+    else:
+        row = await IS_BLOCKED_BY_TELEGRAM_ID.fetchrow(pool, telegram_id)
     return bool(row["is_blocked"]) if row else False
 
 
 async def list_broadcast_targets() -> List[Dict[str, Any]]:
     """Return Telegram IDs that should receive broadcast (no blocked users)."""
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_blocked BOOLEAN DEFAULT FALSE;"
-        )
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS bot_blocked BOOLEAN DEFAULT FALSE;"
-        )
         rows = await conn.fetch(
             """
             SELECT id, telegram_id
@@ -246,11 +240,9 @@ async def list_broadcast_targets() -> List[Dict[str, Any]]:
 
 async def mark_user_bot_blocked(telegram_id: int, *, blocked: bool = True) -> None:
     """Mark that user has blocked the bot to skip future broadcasts."""
+    await ensure_schema()
     pool = await get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS bot_blocked BOOLEAN DEFAULT FALSE;"
-        )
         await conn.execute(
             """
             UPDATE users
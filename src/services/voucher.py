@@ -5,7 +5,10 @@ from __future__ import annotations
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
-from src.services.postgres import get_pool
+
+import asyncpg
+
+from src.services.postgres import Priority, admitted_at, get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -207,7 +210,7 @@ async def list_vouchers(
         List voucher
     """
     pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with pool.acquire(readonly=True) as conn:
         if include_expired:
             query = """
                 SELECT * FROM coupons
@@ -345,48 +348,50 @@ async def increment_voucher_usage(voucher_id: int) -> None:
     Raises:
         ValueError: Jika voucher tidak ditemukan atau sudah mencapai max_uses
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        async with conn.transaction():
-            # Lock row untuk update
-            voucher = await conn.fetchrow(
-                """
-                SELECT id, code, used_count, max_uses
-                FROM coupons
-                WHERE id = $1
-                FOR UPDATE;
-                """,
-                voucher_id,
-            )
 
-            if not voucher:
-                raise ValueError(f"Voucher dengan ID {voucher_id} tidak ditemukan")
+    async def _increment(conn: asyncpg.Connection) -> None:
+        # Lock row untuk update
+        voucher = await conn.fetchrow(
+            """
+            SELECT id, code, used_count, max_uses
+            FROM coupons
+            WHERE id = $1
+            FOR UPDATE;
+            """,
+            voucher_id,
+        )
 
-            # Check max_uses
-            if voucher["max_uses"] is not None:
-                if voucher["used_count"] >= voucher["max_uses"]:
-                    raise ValueError(
-                        f"Voucher '{voucher['code']}' sudah mencapai batas penggunaan "
-                        f"({voucher['max_uses']} kali)"
-                    )
+        if not voucher:
+            raise ValueError(f"Voucher dengan ID {voucher_id} tidak ditemukan")
 
-            # Increment used_count
-            await conn.execute(
-                """
-                UPDATE coupons
-                SET used_count = used_count + 1,
-                    updated_at = NOW()
-                WHERE id = $1;
-                """,
-                voucher_id,
-            )
+        # Check max_uses
+        if voucher["max_uses"] is not None:
+            if voucher["used_count"] >= voucher["max_uses"]:
+                raise ValueError(
+                    f"Voucher '{voucher['code']}' sudah mencapai batas penggunaan "
+                    f"({voucher['max_uses']} kali)"
+                )
 
-            logger.info(
-                "[voucher] Incremented usage for voucher id=%s code=%s (now %s uses)",
-                voucher_id,
-                voucher["code"],
-                voucher["used_count"] + 1,
-            )
+        # Increment used_count
+        await conn.execute(
+            """
+            UPDATE coupons
+            SET used_count = used_count + 1,
+                updated_at = NOW()
+            WHERE id = $1;
+            """,
+            voucher_id,
+        )
+
+        logger.info(
+            "[voucher] Incremented usage for voucher id=%s code=%s (now %s uses)",
+            voucher_id,
+            voucher["code"],
+            voucher["used_count"] + 1,
+        )
+
+    pool = await get_pool()
+    await pool.run_transaction(_increment, name="voucher.increment_voucher_usage")
 
 
 async def increment_voucher_usage_by_code(code: str) -> None:
@@ -426,6 +431,7 @@ async def calculate_discount(voucher: Dict[str, Any], total_cents: int) -> int:
     return min(discount_cents, total_cents)
 
 
+@admitted_at(Priority.BACKGROUND)
 async def get_voucher_usage_stats() -> List[Dict[str, Any]]:
     """
     Ambil statistik penggunaan voucher.
@@ -434,7 +440,7 @@ async def get_voucher_usage_stats() -> List[Dict[str, Any]]:
         List voucher dengan usage statistics
     """
     pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with pool.acquire(readonly=True) as conn:
         rows = await conn.fetch(
             """
             SELECT
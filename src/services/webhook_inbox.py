@@ -0,0 +1,268 @@
+"""Durable inbox for gateway callbacks, drained by background workers."""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict
+
+from src.services.postgres import get_pool
+from src.services.queries import define_query, purge_in_batches
+from src.services.schema import ensure_schema, register_schema
+
+
+logger = logging.getLogger(__name__)
+
+register_schema(
+    "webhook_inbox",
+    """
+    CREATE TABLE IF NOT EXISTS webhook_inbox (
+        id BIGSERIAL PRIMARY KEY,
+        source VARCHAR(32) NOT NULL,
+        payload JSONB NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        locked_until TIMESTAMPTZ,
+        processed_at TIMESTAMPTZ
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_webhook_inbox_ready
+        ON webhook_inbox (available_at, id)
+        WHERE status IN ('pending', 'processing');
+    """,
+    # Callbacks already applied, keyed by what the gateway retries with.
+    """
+    CREATE TABLE IF NOT EXISTS processed_webhooks (
+        source VARCHAR(32) NOT NULL,
+        gateway_order_id TEXT NOT NULL,
+        status VARCHAR(32) NOT NULL,
+        processed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (source, gateway_order_id, status)
+    );
+    """,
+)
+register_schema(
+    "webhook_inbox_retention",
+    """
+    CREATE INDEX IF NOT EXISTS idx_webhook_inbox_finished
+        ON webhook_inbox (processed_at)
+        WHERE status IN ('done', 'failed');
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_processed_webhooks_processed_at
+        ON processed_webhooks (processed_at);
+    """,
+)
+
+# Pakasir retries a callback for a while after the first delivery; the
+# dedupe keys must outlive that window or a late redelivery is reapplied.
+MIN_PROCESSED_RETENTION_DAYS = 7
+
+ENQUEUE = define_query(
+    "webhook_inbox.enqueue",
+    """
+    INSERT INTO webhook_inbox (source, payload)
+    VALUES ($1, $2::jsonb)
+    RETURNING id;
+    """,
+)
+# Claims the oldest ready row; a 'processing' row whose lease ran out belongs
+# to a worker that died and is picked up again. $1 = source, $2 = lease.
+CLAIM = define_query(
+    "webhook_inbox.claim",
+    """
+    UPDATE webhook_inbox w
+    SET status = 'processing',
+        attempts = w.attempts + 1,
+        locked_until = NOW() + $2::interval
+    FROM (
+        SELECT id
+        FROM webhook_inbox
+        WHERE source = $1
+          AND available_at <= NOW()
+          AND (
+              status = 'pending'
+              OR (status = 'processing' AND locked_until < NOW())
+          )
+        ORDER BY available_at, id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ) ready
+    WHERE w.id = ready.id
+    RETURNING w.id, w.payload, w.attempts;
+    """,
+)
+FINISH = define_query(
+    "webhook_inbox.finish",
+    """
+    UPDATE webhook_inbox
+    SET status = $2,
+        last_error = $3,
+        locked_until = NULL,
+        processed_at = NOW()
+    WHERE id = $1;
+    """,
+)
+RETRY = define_query(
+    "webhook_inbox.retry",
+    """
+    UPDATE webhook_inbox
+    SET status = 'pending',
+        last_error = $2,
+        locked_until = NULL,
+        available_at = NOW() + $3::interval
+    WHERE id = $1;
+    """,
+)
+PROCESSED_EXISTS = define_query(
+    "webhook_inbox.processed_exists",
+    """
+    SELECT EXISTS(
+        SELECT 1 FROM processed_webhooks
+        WHERE source = $1 AND gateway_order_id = $2 AND status = $3
+    ) AS processed;
+    """,
+)
+MARK_PROCESSED = define_query(
+    "webhook_inbox.mark_processed",
+    """
+    INSERT INTO processed_webhooks (source, gateway_order_id, status)
+    VALUES ($1, $2, $3)
+    ON CONFLICT DO NOTHING;
+    """,
+)
+# Retention: $1 = age, $2 = batch size.
+PURGE_FINISHED = define_query(
+    "webhook_inbox.purge_finished",
+    """
+    DELETE FROM webhook_inbox
+    WHERE id IN (
+        SELECT id
+        FROM webhook_inbox
+        WHERE status IN ('done', 'failed')
+          AND processed_at < NOW() - $1::interval
+        LIMIT $2
+    );
+    """,
+)
+PURGE_PROCESSED = define_query(
+    "webhook_inbox.purge_processed",
+    """
+    DELETE FROM processed_webhooks
+    WHERE ctid IN (
+        SELECT ctid
+        FROM processed_webhooks
+        WHERE processed_at < NOW() - $1::interval
+        LIMIT $2
+    );
+    """,
+)
+
+
+@dataclass(slots=True)
+class InboxEvent:
+    """One claimed inbox row."""
+
+    id: int
+    payload: Dict[str, Any]
+    attempts: int
+
+
+async def enqueue_webhook(source: str, payload: Dict[str, Any]) -> int:
+    """Persist a verified callback; returns the inbox row id."""
+    await ensure_schema()
+    pool = await get_pool()
+    row = await ENQUEUE.fetchrow(pool, source, json.dumps(payload))
+    return row["id"]
+
+
+async def claim_webhook(source: str, lease_seconds: int = 300) -> InboxEvent | None:
+    """Claim the next ready row for ``source`` (SKIP LOCKED) or ``None``."""
+    await ensure_schema()
+    pool = await get_pool()
+    row = await CLAIM.fetchrow(pool, source, timedelta(seconds=lease_seconds))
+    if row is None:
+        return None
+    payload = row["payload"]
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    return InboxEvent(id=row["id"], payload=payload, attempts=row["attempts"])
+
+
+async def complete_webhook(event_id: int) -> None:
+    pool = await get_pool()
+    await FINISH.execute(pool, event_id, "done", None)
+
+
+async def fail_webhook(
+    event_id: int, error: str, *, retry_in_seconds: float | None
+) -> None:
+    """Record a failed attempt; ``retry_in_seconds=None`` makes it final."""
+    pool = await get_pool()
+    if retry_in_seconds is None:
+        await FINISH.execute(pool, event_id, "failed", error)
+        logger.error("[webhook_inbox] Event %s gagal permanen: %s", event_id, error)
+    else:
+        await RETRY.execute(
+            pool, event_id, error, timedelta(seconds=retry_in_seconds)
+        )
+        logger.warning(
+            "[webhook_inbox] Event %s diulang dalam %.0fs: %s",
+            event_id,
+            retry_in_seconds,
+            error,
+        )
+
+
+async def is_webhook_processed(source: str, gateway_order_id: str, status: str) -> bool:
+    """True when this (order, status) callback was already applied."""
+    await ensure_schema()
+    pool = await get_pool()
+    row = await PROCESSED_EXISTS.fetchrow(pool, source, gateway_order_id, status)
+    return bool(row and row["processed"])
+
+
+async def mark_webhook_processed(
+    source: str, gateway_order_id: str, status: str
+) -> None:
+    pool = await get_pool()
+    await MARK_PROCESSED.execute(pool, source, gateway_order_id, status)
+
+
+async def purge_webhook_history(
+    *,
+    inbox_retention_days: int,
+    processed_retention_days: int,
+    batch_size: int = 5000,
+    max_batches: int = 20,
+) -> Dict[str, int]:
+    """Delete finished inbox rows and expired dedupe keys in batches.
+
+    ``processed_webhooks`` is kept for at least
+    :data:`MIN_PROCESSED_RETENTION_DAYS` regardless of configuration.
+    """
+    await ensure_schema()
+    pool = await get_pool()
+    processed_days = max(processed_retention_days, MIN_PROCESSED_RETENTION_DAYS)
+    return {
+        "inbox": await purge_in_batches(
+            pool,
+            PURGE_FINISHED,
+            timedelta(days=inbox_retention_days),
+            batch_size,
+            max_batches,
+        ),
+        "processed": await purge_in_batches(
+            pool,
+            PURGE_PROCESSED,
+            timedelta(days=processed_days),
+            batch_size,
+            max_batches,
+        ),
+    }
@@ -52,6 +52,12 @@ async def check_database() -> CheckResult:
             value = await connection.fetchval("SELECT 1;")
         ok = int(value or 0) == 1
         detail = "Database reachable" if ok else f"Unexpected result: {value}"
+        stats = pool.stats()
+        detail += (
+            f" (pool in_use={stats['in_use']} idle={stats['idle']}"
+            f" waiting={stats['waiting']} max={stats['max_size']},"
+            f" acquire p95={stats['acquire_wait']['p95_ms']}ms)"
+        )
         return CheckResult("database", ok, detail)
     except Exception as exc:
         return CheckResult("database", False, f"Exception: {exc}")
@@ -2,21 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
 import logging
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
 
 from aiohttp import web
 
 from src.core.config import get_settings
 from src.core.telemetry import TelemetryTracker
 from src.services.payment import PaymentService, PaymentError
+from src.services.postgres import PoolBusy, Priority, priority
+from src.services.webhook_inbox import (
+    claim_webhook,
+    complete_webhook,
+    enqueue_webhook,
+    fail_webhook,
+    is_webhook_processed,
+    mark_webhook_processed,
+)
 
 
 logger = logging.getLogger(__name__)
 
+WEBHOOK_SOURCE = "pakasir"
+# Statuses after which Pakasir redeliveries carry no new information.
+FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
 
 def verify_signature(
     raw_body: bytes, signature: str | None, secret: str | None
@@ -30,12 +45,47 @@ def verify_signature(
     return hmac.compare_digest(digest, signature)
 
 
+class ProcessedWebhooks:
+    """Recently applied (gateway_order_id, status) pairs.
+
+    An in-memory LRU answers hot redeliveries; misses fall back to the
+    ``processed_webhooks`` table, which other server processes share.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self._max_entries = max_entries
+        self._recent: OrderedDict[Tuple[str, str], None] = OrderedDict()
+
+    def _touch(self, key: Tuple[str, str]) -> None:
+        self._recent[key] = None
+        self._recent.move_to_end(key)
+        while len(self._recent) > self._max_entries:
+            self._recent.popitem(last=False)
+
+    async def seen(self, gateway_order_id: str, status: Any) -> bool:
+        if not isinstance(status, str) or status not in FINAL_STATUSES:
+            return False
+        key = (gateway_order_id, status)
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            return True
+        if await is_webhook_processed(WEBHOOK_SOURCE, gateway_order_id, status):
+            self._touch(key)
+            return True
+        return False
+
+    async def remember(self, gateway_order_id: str, status: Any) -> None:
+        if not isinstance(status, str) or status not in FINAL_STATUSES:
+            return
+        await mark_webhook_processed(WEBHOOK_SOURCE, gateway_order_id, status)
+        self._touch((gateway_order_id, status))
+
+
 async def handle_pakasir_webhook(
     request: web.Request,
-    payment_service: PaymentService,
-    telemetry: TelemetryTracker,
+    workers: PakasirWebhookWorkers,
 ) -> web.Response:
-    """Process Pakasir webhook request and update payment status."""
+    """Verify a Pakasir callback, store it in the inbox and ack immediately."""
     settings = get_settings()
     raw_body = await request.read()
     signature = request.headers.get("X-Pakasir-Signature")
@@ -48,9 +98,37 @@ async def handle_pakasir_webhook(
     except json.JSONDecodeError as exc:
         logger.error("Invalid JSON payload: %s", exc)
         raise web.HTTPBadRequest(text="Invalid JSON")
+    if not isinstance(payload, dict) or not payload.get("order_id"):
+        raise web.HTTPBadRequest(text="Missing order_id")
+    if not isinstance(payload.get("status"), str):
+        raise web.HTTPBadRequest(text="Invalid status")
 
     logger.info("📬 Pakasir webhook payload: %s", payload)
+    order_id = str(payload["order_id"])
 
+    try:
+        # Payment callbacks are never queued behind browsing traffic.
+        with priority(Priority.CRITICAL):
+            if await workers.processed.seen(order_id, payload.get("status")):
+                logger.info("[payment_replay] Webhook %s sudah diproses.", order_id)
+                return web.json_response({"ok": True, "duplicate": True})
+            event_id = await enqueue_webhook(WEBHOOK_SOURCE, payload)
+    except PoolBusy as exc:
+        logger.warning(
+            "Database sibuk saat menyimpan webhook %s: %s", order_id, exc
+        )
+        raise web.HTTPServiceUnavailable(text="Busy, retry later")
+
+    workers.wake()
+    return web.json_response({"ok": True, "event_id": event_id})
+
+
+async def process_pakasir_payload(
+    payment_service: PaymentService,
+    telemetry: TelemetryTracker,
+    payload: Dict[str, Any],
+) -> None:
+    """Apply one stored callback; safe to repeat (payment updates detect replays)."""
     status = payload.get("status")
     order_id = str(payload.get("order_id", ""))
     amount_rp = int(payload.get("amount", 0))
@@ -58,14 +136,10 @@ async def handle_pakasir_webhook(
     is_deposit = order_id.startswith("dp")
 
     if status == "completed":
-        try:
-            if is_deposit:
-                await payment_service.mark_deposit_completed(order_id, amount_cents)
-            else:
-                await payment_service.mark_payment_completed(order_id, amount_cents)
-        except PaymentError as exc:
-            logger.error("Failed to mark payment completed: %s", exc)
-            raise web.HTTPBadRequest(text=str(exc))
+        if is_deposit:
+            await payment_service.mark_deposit_completed(order_id, amount_cents)
+        else:
+            await payment_service.mark_payment_completed(order_id, amount_cents)
         await telemetry.increment("successful_transactions")
     elif status in {"failed", "expired", "cancelled"}:
         if is_deposit:
@@ -76,4 +150,96 @@ async def handle_pakasir_webhook(
     else:
         logger.warning("Unhandled Pakasir status: %s", status)
 
-    return web.json_response({"ok": True})
+
+class PakasirWebhookWorkers:
+    """Async workers draining Pakasir callbacks from ``webhook_inbox``.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED`` under a lease, so any
+    number of workers (and server processes) can share the inbox. A
+    :class:`PaymentError` is final; anything else is retried with backoff
+    until ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        payment_service: PaymentService,
+        telemetry: TelemetryTracker,
+        *,
+        concurrency: int = 4,
+        max_attempts: int = 8,
+        poll_interval: float = 5.0,
+    ) -> None:
+        self._payment_service = payment_service
+        self._telemetry = telemetry
+        self._concurrency = max(1, concurrency)
+        self._max_attempts = max(1, max_attempts)
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.processed = ProcessedWebhooks()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"pakasir-webhook-{index}")
+            for index in range(self._concurrency)
+        ]
+        logger.info("[webhook_inbox] %s worker Pakasir berjalan.", self._concurrency)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        with priority(Priority.BACKGROUND):
+            await self._loop()
+
+    async def _loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[webhook_inbox] Gagal mengambil event: %s", exc)
+                processed = False
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> bool:
+        """Claim and process one event; returns False when the inbox is empty."""
+        event = await claim_webhook(WEBHOOK_SOURCE)
+        if event is None:
+            return False
+        order_id = str(event.payload.get("order_id", ""))
+        status = event.payload.get("status")
+        try:
+            # Only the settlement itself may use the reserved connections.
+            with priority(Priority.CRITICAL):
+                # Redeliveries queued before the first one finished.
+                if not await self.processed.seen(order_id, status):
+                    await process_pakasir_payload(
+                        self._payment_service, self._telemetry, event.payload
+                    )
+                    await self.processed.remember(order_id, status)
+        except PaymentError as exc:
+            await fail_webhook(event.id, str(exc), retry_in_seconds=None)
+        except Exception as exc:
+            retry_in = None
+            if event.attempts < self._max_attempts:
+                retry_in = min(2**event.attempts, 300)
+            await fail_webhook(event.id, repr(exc), retry_in_seconds=retry_in)
+        else:
+            await complete_webhook(event.id)
+        return True
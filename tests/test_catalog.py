@@ -2,11 +2,15 @@ import unittest
 import asyncio
 from unittest.mock import MagicMock, patch
 
+import asyncpg
+
+from src.services import catalog
 from src.services.catalog import add_product, delete_product, get_product
 from src.services.product_content import add_content, get_content_count
 
 
 class TestCatalog(unittest.TestCase):
+    @patch("src.services.schema._pending", [])
     @patch("src.services.product_content.get_pool")
     @patch("src.services.catalog.get_pool")
     def test_delete_product(self, mock_get_pool_catalog, mock_get_pool_content):
@@ -34,7 +38,11 @@ class TestCatalog(unittest.TestCase):
             async def fetchrow(*args, **kwargs):
                 return {"id": 1}
 
+            async def execute_notify(*args, **kwargs):
+                return "SELECT 1"
+
             mock_conn.fetchrow = fetchrow
+            mock_conn.execute = execute_notify
             product_id = await add_product(
                 category_id=None,
                 code="TESTPROD",
@@ -62,16 +70,20 @@ class TestCatalog(unittest.TestCase):
 
             # 3. Verify that the product and its contents exist
             async def fetchrow_product(*args, **kwargs):
-                return {
-                    "id": 1,
-                    "code": "TESTPROD",
-                    "name": "Test Product",
-                    "description": "A product for testing",
-                    "price_cents": 10000,
-                    "stock": 2,
-                    "sold_count": 0,
-                    "category_id": None,
-                }
+                # Positional like an asyncpg.Record (see _PRODUCT_COLUMNS).
+                return (
+                    1,
+                    "TESTPROD",
+                    "Test Product",
+                    "A product for testing",
+                    10000,
+                    2,
+                    0,
+                    None,
+                    None,
+                    None,
+                    None,
+                )
 
             mock_conn.fetchrow = fetchrow_product
             product = await get_product(product_id)
@@ -113,5 +125,65 @@ class TestCatalog(unittest.TestCase):
         asyncio.run(run_test())
 
 
+class TestSearchProducts(unittest.TestCase):
+    def setUp(self) -> None:
+        catalog._search_cache.clear()
+        catalog._trigram_available = True
+
+    def tearDown(self) -> None:
+        catalog._search_cache.clear()
+        catalog._trigram_available = True
+
+    @staticmethod
+    def _row(product_id, name):
+        return (product_id, f"P{product_id}", name, None, 10000, 3, 0) + (None,) * 4
+
+    @patch("src.services.catalog.get_pool")
+    def test_search_is_cached_per_term(self, mock_get_pool) -> None:
+        async def run_test():
+            pool = MagicMock()
+            calls = []
+
+            async def fetch(query, *args, **kwargs):
+                calls.append((query, args))
+                return [self._row(1, "Netflix Premium")]
+
+            pool.fetch = fetch
+            mock_get_pool.return_value = pool
+
+            first = await catalog.search_products("  NetFlix ")
+            second = await catalog.search_products("netflix")
+            self.assertEqual([p.name for p in first], ["Netflix Premium"])
+            self.assertEqual(first, second)
+            self.assertEqual(calls, [(catalog.SEARCH_PRODUCTS, ("netflix", 10, True))])
+            self.assertEqual(await catalog.search_products("n"), [])
+
+        asyncio.run(run_test())
+
+    @patch("src.services.catalog.get_pool")
+    def test_falls_back_to_ilike_without_pg_trgm(self, mock_get_pool) -> None:
+        async def run_test():
+            pool = MagicMock()
+            calls = []
+
+            async def fetch(query, *args, **kwargs):
+                calls.append(query)
+                if query is catalog.SEARCH_PRODUCTS:
+                    raise asyncpg.exceptions.UndefinedFunctionError("<%")
+                self.assertEqual(args[0], "%50\\%%")
+                return []
+
+            pool.fetch = fetch
+            mock_get_pool.return_value = pool
+
+            self.assertEqual(await catalog.search_products("50%"), [])
+            self.assertEqual(
+                calls, [catalog.SEARCH_PRODUCTS, catalog.SEARCH_PRODUCTS_ILIKE]
+            )
+            self.assertFalse(catalog._trigram_available)
+
+        asyncio.run(run_test())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+from src.services import catalog
+
+
+def _row(product_id, stock=5, slug="games"):
+    # Positional like an asyncpg.Record in _PRODUCT_COLUMNS order.
+    return (
+        product_id,
+        f"P{product_id}",
+        f"Produk {product_id}",
+        None,
+        10000,
+        stock,
+        0,
+        1,
+        "Games",
+        slug,
+        "🎮",
+    )
+
+
+class TestCatalogCache(unittest.TestCase):
+    def _pool(self, products):
+        pool = MagicMock()
+        connection = MagicMock()
+        self.calls = []
+
+        async def fetch(query, *args):
+            self.calls.append(query)
+            await asyncio.sleep(0)
+            if query == catalog.LIST_CATEGORIES.sql:
+                return [(1, "Games", "games", "🎮")]
+            if query == catalog.REFRESH_PRODUCTS.sql:
+                return [products[i] for i in args[0] if i in products]
+            return list(products.values())
+
+        @asynccontextmanager
+        async def side_connection():
+            yield connection
+
+        connection.fetch = fetch
+        pool.side_connection = side_connection
+        return pool
+
+    @patch("src.services.catalog.get_pool")
+    def test_concurrent_misses_share_one_load(self, mock_get_pool) -> None:
+        async def run_test():
+            products = {1: _row(1), 2: _row(2, stock=0)}
+            mock_get_pool.return_value = self._pool(products)
+            cache = catalog._CatalogCache(ttl=60)
+
+            await asyncio.gather(*(cache.snapshot() for _ in range(10)))
+
+            self.assertEqual(len(self.calls), 2)
+            self.assertEqual(cache.version, 1)
+            self.assertEqual([p.id for p in cache.ordered()], [1, 2])
+            # Products of one category share the interned Category.
+            self.assertIs(cache.products[1].category, cache.products[2].category)
+            self.assertIs(cache.categories[0], cache.products[1].category)
+
+        asyncio.run(run_test())
+
+    @patch("src.services.catalog.get_pool")
+    def test_product_event_is_applied_incrementally(self, mock_get_pool) -> None:
+        async def run_test():
+            products = {1: _row(1), 2: _row(2)}
+            mock_get_pool.return_value = self._pool(products)
+            cache = catalog._CatalogCache(ttl=60)
+            await cache.load()
+            catalog._cache = cache
+
+            products[1] = _row(1, stock=0)
+            del products[2]
+            cache.apply("product:1")
+            cache.apply("product:2")
+            await cache._flush_task
+
+            self.assertEqual(self.calls[-1], catalog.REFRESH_PRODUCTS.sql)
+            self.assertEqual(cache.version, 2)
+            self.assertEqual(await catalog.list_products(), [])
+            remaining = await catalog.list_products_by_category(
+                "games", exclude_zero_stock=False
+            )
+            self.assertEqual([p.id for p in remaining], [1])
+
+            cache.apply("reload")
+            self.assertFalse(cache.fresh())
+
+        try:
+            asyncio.run(run_test())
+        finally:
+            catalog._cache = None
+
+
+class TestProductPage(unittest.TestCase):
+    def test_cached_pages_follow_cursor(self) -> None:
+        async def run_test():
+            cache = catalog._CatalogCache(ttl=60)
+            cache.loaded_at = catalog.time.monotonic()
+            for product_id in range(1, 8):
+                row = _row(product_id, stock=0 if product_id == 3 else 5)
+                cache.products[product_id] = catalog._product_from_row(row)
+            catalog._cache = cache
+
+            first = await catalog.list_products_page(page_size=3)
+            self.assertEqual([p.id for p in first.products], [1, 2, 4])
+            self.assertTrue(first.has_next)
+            self.assertFalse(first.has_prev)
+
+            second = await catalog.list_products_page(
+                after=first.last_id, page_size=3
+            )
+            self.assertEqual([p.id for p in second.products], [5, 6, 7])
+            self.assertFalse(second.has_next)
+
+            back = await catalog.list_products_page(
+                before=second.first_id, page_size=3
+            )
+            self.assertEqual([p.id for p in back.products], [1, 2, 4])
+            self.assertFalse(back.has_prev)
+
+        try:
+            asyncio.run(run_test())
+        finally:
+            catalog._cache = None
+
+    @patch("src.services.catalog.get_pool")
+    def test_database_page_fetches_one_extra_row(self, mock_get_pool) -> None:
+        async def run_test():
+            pool = MagicMock()
+            calls = []
+
+            async def fetch(query, *args, **kwargs):
+                calls.append((query, args))
+                return [_row(9), _row(8), _row(7)]
+
+            pool.fetch = fetch
+            mock_get_pool.return_value = pool
+
+            page = await catalog.list_products_page(
+                before=10, category_slug="games", page_size=2
+            )
+            self.assertEqual(
+                calls, [(catalog.PAGE_PRODUCTS_BEFORE, ("games", True, 10, 3))]
+            )
+            self.assertEqual([p.id for p in page.products], [8, 9])
+            self.assertTrue(page.has_prev)
+            self.assertTrue(page.has_next)
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from src.bot import keyboards
+from src.services.catalog import Category, Product, ProductPage
+
+
+def _product(product_id, category):
+    return Product(
+        id=product_id,
+        code=f"P{product_id}",
+        name=f"Produk {product_id}",
+        description=None,
+        price_cents=10000,
+        stock=5,
+        sold_count=0,
+        category=category,
+    )
+
+
+class TestProductPageCallback(unittest.TestCase):
+    def test_short_slug_is_kept(self) -> None:
+        self.assertEqual(
+            keyboards.product_page_callback("n", 42, 2, "games", 3),
+            "products:page:n:42:2:games",
+        )
+
+    def test_long_slug_falls_back_to_category_id(self) -> None:
+        category = Category(id=7, name="Langganan", slug="langganan-" * 6, emoji="📺")
+        page = ProductPage(
+            products=[_product(1234567, category), _product(1234568, category)],
+            has_next=True,
+            has_prev=True,
+        )
+
+        markup = keyboards.product_page_keyboard(page, 11, 2, category.slug)
+
+        callbacks = [button.callback_data for button in markup.inline_keyboard[0]]
+        self.assertEqual(
+            callbacks,
+            ["products:page:p:1234567:1:#7", "products:page:n:1234568:3:#7"],
+        )
+        for data in callbacks:
+            self.assertLessEqual(len(data.encode("utf-8")), 64)
+
+    def test_non_ascii_slug_without_id_drops_the_filter(self) -> None:
+        data = keyboards.product_page_callback("n", 99, 4, "é" * 40)
+        self.assertEqual(data, "products:page:n:99:4:all")
+
+
+if __name__ == "__main__":
+    unittest.main()
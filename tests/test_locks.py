@@ -0,0 +1,83 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from src.services.locks import LockNotAcquired, distributed_lock
+from src.services.postgres import PostgresPool, SessionStateUnavailable
+
+
+class _AsyncCtx:
+    def __init__(self, value=None):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestDistributedLock(unittest.TestCase):
+    def _pool(self, *, pgbouncer: bool, acquired: bool):
+        pool = MagicMock()
+        pool.pgbouncer = pgbouncer
+        connection = MagicMock()
+        queries = []
+
+        async def fetchval(query, *args):
+            queries.append(query)
+            return acquired
+
+        connection.fetchval = fetchval
+        connection.transaction.return_value = _AsyncCtx()
+        pool.side_connection.return_value = _AsyncCtx(connection)
+        return pool, connection, queries
+
+    @patch("src.services.locks.get_pool")
+    def test_pgbouncer_mode_uses_xact_lock(self, mock_get_pool):
+        async def run_test():
+            pool, connection, queries = self._pool(pgbouncer=True, acquired=True)
+
+            async def get_pool():
+                return pool
+
+            mock_get_pool.side_effect = get_pool
+            async with distributed_lock("job"):
+                pass
+            self.assertEqual(len(queries), 1)
+            self.assertIn("pg_try_advisory_xact_lock", queries[0])
+            connection.transaction.assert_called_once()
+
+        asyncio.run(run_test())
+
+    @patch("src.services.locks.get_pool")
+    def test_session_lock_is_released(self, mock_get_pool):
+        async def run_test():
+            pool, _, queries = self._pool(pgbouncer=False, acquired=True)
+
+            async def get_pool():
+                return pool
+
+            mock_get_pool.side_effect = get_pool
+            async with distributed_lock("job"):
+                pass
+            self.assertIn("pg_try_advisory_lock", queries[0])
+            self.assertIn("pg_advisory_unlock", queries[1])
+
+            pool, _, _ = self._pool(pgbouncer=False, acquired=False)
+            with self.assertRaises(LockNotAcquired):
+                async with distributed_lock("job"):
+                    pass
+
+        asyncio.run(run_test())
+
+    def test_require_session_state_fails_fast(self):
+        PostgresPool("postgresql://localhost/test").require_session_state("LISTEN")
+        pool = PostgresPool("postgresql://localhost/test", pgbouncer=True)
+        self.assertEqual(pool._statement_cache_size, 0)
+        with self.assertRaises(SessionStateUnavailable):
+            pool.require_session_state("LISTEN")
+
+
+if __name__ == "__main__":
+    unittest.main()
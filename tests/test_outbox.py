@@ -0,0 +1,61 @@
+import unittest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.services import outbox
+
+
+class TestOutboxDispatcher(unittest.TestCase):
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.outbox.get_pool")
+    def test_batch_outcomes(self, mock_get_pool) -> None:
+        async def run_test():
+            pool = MagicMock()
+            statements = []
+
+            async def fetch(query, *args, **kwargs):
+                return [
+                    {
+                        "id": 1,
+                        "topic": "ok",
+                        "payload": '{"order_id": "a"}',
+                        "attempts": 1,
+                    },
+                    {"id": 2, "topic": "flaky", "payload": {}, "attempts": 2},
+                    {"id": 3, "topic": "flaky", "payload": {}, "attempts": 3},
+                    {"id": 4, "topic": "unknown", "payload": {}, "attempts": 1},
+                ]
+
+            async def execute(query, *args):
+                statements.append((query, args))
+                return "UPDATE 1"
+
+            pool.fetch = fetch
+            pool.execute = execute
+            mock_get_pool.return_value = pool
+
+            seen = []
+
+            async def ok(payload):
+                seen.append(payload)
+
+            flaky = AsyncMock(side_effect=RuntimeError("timeout"))
+            dispatcher = outbox.OutboxDispatcher(
+                {"ok": ok, "flaky": flaky}, max_attempts=3
+            )
+
+            self.assertEqual(await dispatcher.run_once(), 4)
+
+            self.assertEqual(seen, [{"order_id": "a"}])
+            by_query = {}
+            for query, args in statements:
+                by_query.setdefault(query, []).append(args[0])
+            self.assertEqual(by_query[outbox.MARK_DONE.sql], [[1]])
+            self.assertEqual(by_query[outbox.RETRY.sql], [2])
+            self.assertEqual(sorted(by_query[outbox.MARK_DEAD.sql]), [3, 4])
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
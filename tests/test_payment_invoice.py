@@ -0,0 +1,138 @@
+import unittest
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.services import payment
+from src.services.cart import Cart
+from src.services.catalog import Product
+
+
+def _product(product_id, price_cents):
+    return Product(
+        id=product_id,
+        code=f"P{product_id}",
+        name=f"Produk {product_id}",
+        description=None,
+        price_cents=price_cents,
+        stock=10,
+        sold_count=0,
+    )
+
+
+class _Pool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def run_transaction(self, work, **kwargs):
+        return await work(self.connection)
+
+
+class TestCreateInvoice(unittest.TestCase):
+    def _service(self):
+        service = payment.PaymentService(MagicMock(), MagicMock(), sender=MagicMock())
+        service._record_manual_payment = AsyncMock()
+        service._telemetry.increment = AsyncMock()
+        return service
+
+    def _cart(self):
+        cart = Cart()
+        cart.add(_product(1, 10000), 2)
+        cart.add(_product(2, 2500), 1)
+        return cart
+
+    @patch("src.services.payment.get_settings")
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.payment.reserve_order_contents")
+    @patch("src.services.payment.get_pool")
+    def test_order_is_created_in_one_statement(
+        self, mock_get_pool, mock_reserve, mock_settings
+    ) -> None:
+        async def run_test():
+            connection = MagicMock()
+            statements = []
+
+            async def fetchrow(query, *args):
+                statements.append((query, args))
+                return {"id": "order-1", "created_at": None}
+
+            connection.fetchrow = fetchrow
+            mock_get_pool.return_value = _Pool(connection)
+            mock_settings.return_value = SimpleNamespace(content_reservation_minutes=30)
+            mock_reserve.return_value = [
+                {"product_id": 1, "quantity": 2, "reserved": 2},
+                {"product_id": 2, "quantity": 1, "reserved": 1},
+            ]
+
+            _, invoice = await self._service().create_invoice(
+                telegram_user={"id": 42, "username": "budi"},
+                cart=self._cart(),
+                method="deposit",
+            )
+
+            self.assertEqual(len(statements), 1)
+            query, args = statements[0]
+            self.assertEqual(query, payment.CREATE_ORDER.sql)
+            self.assertEqual(args[:5], (42, "budi", None, None, 22500))
+            self.assertEqual(args[5:8], ([1, 2], [2, 1], [10000, 2500]))
+            self.assertEqual(args[9:], ("deposit", 0, 22500))
+            self.assertEqual(invoice["order_id"], "order-1")
+
+        asyncio.run(run_test())
+
+    @patch("src.services.payment.get_settings")
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.payment.reserve_order_contents")
+    @patch("src.services.payment.get_pool")
+    def test_shortfall_aborts_the_transaction(
+        self, mock_get_pool, mock_reserve, mock_settings
+    ) -> None:
+        async def run_test():
+            connection = MagicMock()
+            connection.fetchrow = AsyncMock(return_value={"id": "order-1"})
+            mock_get_pool.return_value = _Pool(connection)
+            mock_settings.return_value = SimpleNamespace(content_reservation_minutes=30)
+            mock_reserve.return_value = [
+                {"product_id": 1, "quantity": 2, "reserved": 1},
+            ]
+            service = self._service()
+
+            with self.assertRaisesRegex(payment.PaymentError, "Produk 1"):
+                await service.create_invoice(
+                    telegram_user={"id": 42}, cart=self._cart(), method="deposit"
+                )
+            service._record_manual_payment.assert_not_awaited()
+
+        asyncio.run(run_test())
+
+    @patch("src.services.payment.get_settings")
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.payment.reserve_order_contents")
+    @patch("src.services.payment.get_pool")
+    def test_gateway_failure_releases_reservation(
+        self, mock_get_pool, mock_reserve, mock_settings
+    ) -> None:
+        async def run_test():
+            connection = MagicMock()
+            connection.fetchrow = AsyncMock(return_value={"id": "order-1"})
+            mock_get_pool.return_value = _Pool(connection)
+            mock_settings.return_value = SimpleNamespace(content_reservation_minutes=30)
+            mock_reserve.return_value = []
+            service = self._service()
+            service._pakasir_client.create_transaction = AsyncMock(
+                side_effect=RuntimeError("timeout")
+            )
+            service.mark_payment_failed = AsyncMock()
+
+            with self.assertRaises(payment.PaymentError):
+                await service.create_invoice(
+                    telegram_user={"id": 42}, cart=self._cart(), method="qris"
+                )
+            gateway_order_id = connection.fetchrow.await_args.args[9]
+            service.mark_payment_failed.assert_awaited_once_with(gateway_order_id)
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
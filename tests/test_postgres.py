@@ -0,0 +1,451 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import asyncpg
+
+from src.core.telemetry import LatencyHistogram
+from src.services import postgres
+from src.services.postgres import PostgresPool
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_follow_buckets(self) -> None:
+        histogram = LatencyHistogram(bounds_ms=(1, 10, 100))
+        for _ in range(90):
+            histogram.observe(0.5)
+        for _ in range(9):
+            histogram.observe(50)
+        histogram.observe(250)
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50_ms"], 1.0)
+        self.assertEqual(summary["p95_ms"], 100.0)
+        self.assertEqual(summary["p99_ms"], 100.0)
+        self.assertEqual(summary["max_ms"], 250)
+
+    def test_empty_histogram(self) -> None:
+        self.assertEqual(LatencyHistogram().percentile(0.99), 0.0)
+
+
+class TestPostgresPoolGauges(unittest.TestCase):
+    def test_acquire_updates_gauges(self) -> None:
+        async def run_test():
+            pool = PostgresPool("postgresql://localhost/test", acquire_timeout=1.0)
+            raw_pool = MagicMock()
+            connection = MagicMock()
+            acquire_kwargs = {}
+
+            async def acquire(**kwargs):
+                acquire_kwargs.update(kwargs)
+                return connection
+
+            async def release(conn):
+                return None
+
+            raw_pool.acquire = acquire
+            raw_pool.release = release
+            raw_pool.get_size.return_value = 2
+            raw_pool.get_idle_size.return_value = 1
+            pool._pool = raw_pool
+
+            async with pool.acquire() as conn:
+                self.assertIs(conn, connection)
+                self.assertEqual(pool.stats()["in_use"], 1)
+                self.assertEqual(pool.stats()["waiting"], 0)
+
+            stats = pool.stats()
+            self.assertEqual(acquire_kwargs, {"timeout": 1.0})
+            self.assertEqual(stats["in_use"], 0)
+            self.assertEqual(stats["idle"], 1)
+            self.assertEqual(stats["acquire_wait"]["count"], 1)
+
+        asyncio.run(run_test())
+
+
+class TestReplicaRouting(unittest.TestCase):
+    @staticmethod
+    def _raw_pool(name):
+        raw_pool = MagicMock(name=name)
+        connection = MagicMock(name=f"{name}_conn")
+
+        async def fetchval(query, *args):
+            return raw_pool.lag
+
+        async def acquire(**kwargs):
+            return connection
+
+        async def release(conn):
+            return None
+
+        class _Ctx:
+            async def __aenter__(self):
+                return connection
+
+            async def __aexit__(self, *exc):
+                return False
+
+        async def fetchrow(query, *args):
+            return None
+
+        connection.fetchval = fetchval
+        connection.fetchrow = fetchrow
+        raw_pool.lag = 0
+        raw_pool.acquire = MagicMock(side_effect=lambda **kwargs: _Ctx())
+        raw_pool.release = release
+        raw_pool.connection = connection
+        primary_acquire = acquire
+        return raw_pool, primary_acquire
+
+    def test_readonly_routes_to_replica_until_write(self) -> None:
+        async def run_test():
+            pool = PostgresPool(
+                "postgresql://localhost/test",
+                replica_dsn="postgresql://replica/test",
+                replica_max_lag=5.0,
+                read_after_write=60.0,
+            )
+            primary, primary_acquire = self._raw_pool("primary")
+            primary.acquire = primary_acquire
+            replica, _ = self._raw_pool("replica")
+            pool._pool = primary
+            pool._replica = replica
+
+            async with pool.acquire(readonly=True) as conn:
+                self.assertIs(conn, replica.connection)
+
+            # A primary read through fetchrow does not pin the task.
+            await pool.fetchrow("SELECT 1;")
+            async with pool.acquire(readonly=True) as conn:
+                self.assertIs(conn, replica.connection)
+
+            # A raw primary connection may write (upsert_user, block_user).
+            async with pool.acquire() as conn:
+                self.assertIs(conn, primary.connection)
+
+            # Read-after-write: the same task stays on the primary.
+            async with pool.acquire(readonly=True) as conn:
+                self.assertIs(conn, primary.connection)
+
+        postgres._last_write_at.set(None)
+        asyncio.run(run_test())
+
+    def test_lagging_replica_falls_back_to_primary(self) -> None:
+        async def run_test():
+            pool = PostgresPool(
+                "postgresql://localhost/test",
+                replica_dsn="postgresql://replica/test",
+                replica_max_lag=5.0,
+            )
+            primary, primary_acquire = self._raw_pool("primary")
+            primary.acquire = primary_acquire
+            replica, _ = self._raw_pool("replica")
+            replica.lag = 30.0
+            pool._pool = primary
+            pool._replica = replica
+
+            async with pool.acquire(readonly=True) as conn:
+                self.assertIs(conn, primary.connection)
+            self.assertEqual(pool.stats()["replica"]["lag_seconds"], 30.0)
+
+        asyncio.run(run_test())
+
+
+class TestUpdateSession(unittest.TestCase):
+    def test_session_reuses_one_connection(self) -> None:
+        async def run_test():
+            pool = PostgresPool("postgresql://localhost/test")
+            raw_pool = MagicMock()
+            connections = []
+            released = []
+
+            async def acquire(**kwargs):
+                connection = MagicMock()
+                connections.append(connection)
+                return connection
+
+            async def release(conn):
+                released.append(conn)
+
+            raw_pool.acquire = acquire
+            raw_pool.release = release
+            pool._pool = raw_pool
+
+            async with postgres.update_session("text_router") as session:
+                async with pool.acquire() as first:
+                    session._on_query(MagicMock(elapsed=0.004))
+                async with pool.acquire() as second:
+                    # Nested acquire while the session connection is lent out.
+                    async with pool.acquire() as nested:
+                        self.assertIsNot(nested, second)
+                self.assertIs(first, second)
+                self.assertEqual(pool.stats()["in_use"], 1)
+
+            self.assertEqual(len(connections), 2)
+            self.assertCountEqual(released, connections)
+            self.assertEqual(session.queries, 1)
+            self.assertAlmostEqual(session.db_time_ms, 4.0)
+            self.assertIsNone(postgres.current_session())
+            self.assertEqual(pool.stats()["in_use"], 0)
+            self.assertEqual(pool.stats()["update_queries"]["count"], 1)
+
+        asyncio.run(run_test())
+
+    def test_session_connection_is_returned_during_external_io(self) -> None:
+        async def run_test():
+            pool = PostgresPool("postgresql://localhost/test")
+            raw_pool = MagicMock()
+            connections = []
+
+            async def acquire(**kwargs):
+                connection = MagicMock()
+                connections.append(connection)
+                return connection
+
+            async def release(conn):
+                return None
+
+            raw_pool.acquire = acquire
+            raw_pool.release = release
+            pool._pool = raw_pool
+
+            async with postgres.update_session("callback_router"):
+                async with pool.acquire() as first:
+                    pass
+                # Stand-in for a Telegram send or gateway call.
+                await asyncio.sleep(0.01)
+                self.assertEqual(pool.stats()["in_use"], 0)
+                async with pool.acquire() as second:
+                    self.assertIsNot(first, second)
+
+            self.assertEqual(len(connections), 2)
+            self.assertEqual(pool.stats()["in_use"], 0)
+
+        asyncio.run(run_test())
+
+    def test_session_ending_on_a_read_checks_in_once(self) -> None:
+        async def run_test():
+            pool = PostgresPool("postgresql://localhost/test", max_size=3)
+            raw_pool = MagicMock()
+            released = []
+
+            async def acquire(**kwargs):
+                return MagicMock()
+
+            async def release(conn):
+                released.append(conn)
+                # Suspend like a real release so queued callbacks run.
+                await asyncio.sleep(0)
+
+            raw_pool.acquire = acquire
+            raw_pool.release = release
+            pool._pool = raw_pool
+
+            async with postgres.update_session("text_router"):
+                async with pool.acquire(readonly=True):
+                    pass
+            await asyncio.sleep(0.01)
+
+            self.assertEqual(len(released), 1)
+            self.assertEqual(pool.stats()["in_use"], 0)
+            self.assertEqual(pool._gate._free, 3)
+
+        asyncio.run(run_test())
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    def test_slow_query_reports_caller_and_param_types(self) -> None:
+        async def run_test():
+            pool = PostgresPool("postgresql://localhost/test", slow_query_ms=100)
+            raw_pool = MagicMock()
+
+            async def acquire(**kwargs):
+                return MagicMock()
+
+            async def release(conn):
+                return None
+
+            raw_pool.acquire = acquire
+            raw_pool.release = release
+            pool._pool = raw_pool
+            reported = []
+            pool.add_slow_query_listener(reported.append)
+
+            async with pool.acquire():
+                pool._on_query_logged(
+                    MagicMock(query="SELECT 1", args=(1, "x"), elapsed=0.01)
+                )
+                pool._on_query_logged(
+                    MagicMock(query="SELECT $1, $2", args=(1, "x"), elapsed=0.25)
+                )
+
+            self.assertEqual(len(reported), 1)
+            slow = reported[0]
+            self.assertEqual(slow.param_types, ["int", "str"])
+            self.assertAlmostEqual(slow.duration_ms, 250.0)
+            self.assertTrue(slow.caller.endswith(":run_test"))
+
+        asyncio.run(run_test())
+
+
+class TestRunTransaction(unittest.TestCase):
+    def _pool(self) -> PostgresPool:
+        pool = PostgresPool("postgresql://localhost/test")
+        raw_pool = MagicMock()
+        connection = MagicMock()
+
+        class _Tx:
+            async def __aenter__(self):
+                return None
+
+            async def __aexit__(self, *exc):
+                return False
+
+        connection.transaction.return_value = _Tx()
+
+        async def acquire(**kwargs):
+            return connection
+
+        async def release(conn):
+            return None
+
+        raw_pool.acquire = acquire
+        raw_pool.release = release
+        pool._pool = raw_pool
+        self.connection = connection
+        return pool
+
+    @patch("src.services.postgres.asyncio.sleep")
+    def test_retries_deadlock_then_succeeds(self, mock_sleep) -> None:
+        async def run_test():
+            pool = self._pool()
+            attempts = []
+
+            async def work(connection):
+                attempts.append(connection)
+                if len(attempts) < 3:
+                    raise asyncpg.exceptions.DeadlockDetectedError("deadlock")
+                return "ok"
+
+            result = await pool.run_transaction(
+                work, isolation="serializable", name="test.site"
+            )
+            self.assertEqual(result, "ok")
+            self.assertEqual(len(attempts), 3)
+            self.connection.transaction.assert_called_with(
+                isolation="serializable", readonly=False
+            )
+            self.assertEqual(pool.stats()["transaction_retries"], {"test.site": 2})
+
+        asyncio.run(run_test())
+
+    @patch("src.services.postgres.asyncio.sleep")
+    def test_gives_up_after_budget(self, mock_sleep) -> None:
+        async def run_test():
+            pool = self._pool()
+
+            async def work(connection):
+                raise asyncpg.exceptions.SerializationError("conflict")
+
+            with self.assertRaises(asyncpg.exceptions.SerializationError):
+                await pool.run_transaction(work, max_attempts=2, name="test.site")
+            self.assertEqual(pool.stats()["transaction_exhausted"], {"test.site": 1})
+
+            async def fails(connection):
+                raise ValueError("not retried")
+
+            with self.assertRaises(ValueError):
+                await pool.run_transaction(fails, name="test.other")
+            self.assertNotIn("test.other", pool.stats()["transaction_retries"])
+
+        asyncio.run(run_test())
+
+
+class TestAdmissionGate(unittest.TestCase):
+    def test_priority_order_reserve_and_shedding(self) -> None:
+        async def run_test():
+            gate = postgres._AdmissionGate(capacity=3, reserved=1, queue_limit=1)
+            Priority = postgres.Priority
+
+            await gate.acquire(Priority.INTERACTIVE, timeout=1)
+            await gate.acquire(Priority.INTERACTIVE, timeout=1)
+            # The last slot is reserved for payments.
+            with self.assertRaises(postgres.PoolBusy):
+                await gate.acquire(Priority.INTERACTIVE, timeout=0.01)
+            await gate.acquire(Priority.CRITICAL, timeout=1)
+
+            order = []
+
+            async def take(level, label):
+                await gate.acquire(level, timeout=1)
+                order.append(label)
+
+            background = asyncio.create_task(take(Priority.BACKGROUND, "admin"))
+            critical = asyncio.create_task(take(Priority.CRITICAL, "payment"))
+            await asyncio.sleep(0)
+            # Queue for the background class is full.
+            with self.assertRaises(postgres.PoolBusy):
+                await gate.acquire(Priority.BACKGROUND, timeout=1)
+
+            gate.release()
+            await asyncio.wait_for(critical, 1)
+            self.assertEqual(order, ["payment"])
+            self.assertFalse(background.done())
+            gate.release()
+            gate.release()
+            await asyncio.wait_for(background, 1)
+            self.assertEqual(order, ["payment", "admin"])
+            self.assertEqual(gate.shed[Priority.INTERACTIVE], 1)
+            self.assertEqual(gate.shed[Priority.BACKGROUND], 1)
+
+        asyncio.run(run_test())
+
+    def test_critical_is_admitted_past_a_full_interactive_queue(self) -> None:
+        async def run_test():
+            gate = postgres._AdmissionGate(capacity=2, reserved=1, queue_limit=2)
+            Priority = postgres.Priority
+            await gate.acquire(Priority.INTERACTIVE, timeout=1)
+            await gate.acquire(Priority.CRITICAL, timeout=1)
+
+            browsing = [
+                asyncio.create_task(gate.acquire(Priority.INTERACTIVE, timeout=1))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            with self.assertRaises(postgres.PoolBusy):
+                await gate.acquire(Priority.INTERACTIVE, timeout=1)
+
+            # More payments than queue_limit still queue instead of shedding.
+            payments = [
+                asyncio.create_task(gate.acquire(Priority.CRITICAL, timeout=1))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            self.assertEqual(gate.depth[Priority.CRITICAL], 3)
+            gate.release()
+            await asyncio.wait_for(payments[0], 1)
+            self.assertFalse(any(task.done() for task in browsing))
+            self.assertEqual(gate.shed[Priority.CRITICAL], 0)
+
+            for task in payments + browsing:
+                task.cancel()
+            await asyncio.gather(*payments, *browsing, return_exceptions=True)
+
+        asyncio.run(run_test())
+
+    def test_scheduled_jobs_run_as_background(self) -> None:
+        from src.core import tasks
+
+        seen = []
+
+        async def job(context):
+            seen.append(postgres._priority.get())
+
+        asyncio.run(tasks.background_job(job)(None))
+        self.assertEqual(seen, [postgres.Priority.BACKGROUND])
+        self.assertEqual(postgres._priority.get(), postgres.Priority.INTERACTIVE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,327 @@
+import unittest
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from src.services import product_content
+
+
+class _Pool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def run_transaction(self, work, **kwargs):
+        return await work(self.connection)
+
+
+class TestStockCounter(unittest.TestCase):
+    @patch("src.services.product_content.get_pool")
+    def test_sale_applies_delta_instead_of_count(self, mock_get_pool) -> None:
+        async def run_test():
+            connection = MagicMock()
+            statements = []
+
+            async def fetchrow(query, *args):
+                return {"product_id": 5, "is_used": False, "reserved_by_order_id": None}
+
+            async def execute(query, *args):
+                statements.append((query, args))
+                return "UPDATE 1"
+
+            connection.fetchrow = fetchrow
+            connection.execute = execute
+            mock_get_pool.return_value = _Pool(connection)
+
+            self.assertTrue(await product_content.mark_content_as_used(9, "order"))
+            self.assertIn((product_content.ADJUST_STOCK.sql, (5, -1)), statements)
+            self.assertFalse(any("COUNT(*)" in query for query, _ in statements))
+
+        asyncio.run(run_test())
+
+    @patch("src.services.product_content.get_pool")
+    def test_reconcile_fixes_only_drifted_products(self, mock_get_pool) -> None:
+        async def run_test():
+            connection = MagicMock()
+            locked = []
+
+            async def execute(query, *args):
+                if "FOR UPDATE" in query:
+                    locked.append(args[0])
+                return "SELECT 1"
+
+            async def fetchval(query, product_id):
+                # Product 2 was fixed by a concurrent writer meanwhile.
+                return 7 if product_id == 1 else None
+
+            async def fetch(query, *args):
+                return [{"id": 1}, {"id": 2}]
+
+            connection.execute = execute
+            connection.fetch = fetch
+            connection.fetchval = fetchval
+            mock_get_pool.return_value = _Pool(connection)
+
+            self.assertEqual(await product_content.reconcile_stock(), [1])
+            self.assertEqual(locked, [1, 2])
+
+        asyncio.run(run_test())
+
+
+class TestAllocateOrderContents(unittest.TestCase):
+    def test_one_statement_claims_all_items(self) -> None:
+        async def run_test():
+            connection = MagicMock()
+            fetched = []
+            notified = []
+
+            async def fetch(query, *args):
+                fetched.append((query, args))
+                return [
+                    {"product_id": 1, "quantity": 2, "allocated": 2},
+                    {"product_id": 4, "quantity": 3, "allocated": 1},
+                ]
+
+            async def execute(query, *args):
+                notified.append(args[1])
+                return "SELECT 1"
+
+            connection.fetch = fetch
+            connection.execute = execute
+
+            with self.assertLogs("src.services.product_content", "ERROR") as logs:
+                allocations = await product_content.allocate_order_contents(
+                    connection, "order-1"
+                )
+
+            self.assertEqual(
+                fetched, [(product_content.ALLOCATE_ORDER_CONTENTS.sql, ("order-1",))]
+            )
+            self.assertEqual([a["allocated"] for a in allocations], [2, 1])
+            self.assertEqual(notified, ["product:1", "product:4"])
+            self.assertEqual(len(logs.records), 1)
+
+        asyncio.run(run_test())
+
+
+class TestBulkImport(unittest.TestCase):
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.product_content.get_pool")
+    def test_copy_import_reports_every_line(self, mock_get_pool) -> None:
+        async def run_test():
+            connection = MagicMock()
+            copied = []
+            statements = []
+
+            async def fetchval(query, *args):
+                return True
+
+            async def execute(query, *args):
+                statements.append((query, args))
+                return "SELECT 1"
+
+            async def copy_records_to_table(table, *, records, columns):
+                copied.extend(records)
+
+            async def fetch(query, *args):
+                # "bbb" already exists in the database.
+                return [
+                    {"content_sha256": digest}
+                    for _, content, digest in copied
+                    if content != "bbb"
+                ]
+
+            connection.fetchval = fetchval
+            connection.execute = execute
+            connection.copy_records_to_table = copy_records_to_table
+            connection.fetch = fetch
+            mock_get_pool.return_value = _Pool(connection)
+
+            result = await product_content.add_bulk_product_content(
+                7, ["aaa", " ", "bbb", "aaa ", "ccc"]
+            )
+
+            self.assertEqual([line for line, _, _ in copied], [1, 3, 5])
+            self.assertEqual(
+                [line["status"] for line in result["lines"]],
+                ["added", "empty", "exists", "duplicate", "added"],
+            )
+            self.assertEqual(result["success"], 2)
+            self.assertEqual(result["failed"], 3)
+            self.assertEqual(
+                [error.split(":")[0] for error in result["errors"]],
+                ["Baris 2", "Baris 3", "Baris 4"],
+            )
+            self.assertIn((product_content.ADJUST_STOCK.sql, (7, 2)), statements)
+
+        asyncio.run(run_test())
+
+
+class TestContentHash(unittest.TestCase):
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.product_content.get_pool")
+    def test_backfill_runs_until_short_batch(self, mock_get_pool) -> None:
+        async def run_test():
+            connection = MagicMock()
+            results = iter(["UPDATE 2", "UPDATE 2", "UPDATE 1"])
+            batches = []
+
+            async def execute(query, *args):
+                if query == product_content.BACKFILL_CONTENT_HASHES.sql:
+                    batches.append(args)
+                    return next(results)
+                return "SET"
+
+            connection.execute = execute
+            mock_get_pool.return_value = _Pool(connection)
+
+            total = await product_content.backfill_content_hashes(batch_size=2)
+
+            self.assertEqual(total, 5)
+            self.assertEqual(batches, [(2,), (2,), (2,)])
+
+        asyncio.run(run_test())
+
+
+class TestArchive(unittest.TestCase):
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.product_content.get_pool")
+    def test_batches_create_month_partitions_once(self, mock_get_pool) -> None:
+        async def run_test():
+            connection = MagicMock()
+            march = datetime(2025, 3, 1)
+            april = datetime(2025, 4, 1)
+            batches = iter(
+                [
+                    [{"id": 1, "month": march}, {"id": 2, "month": april}],
+                    [{"id": 3, "month": april}],
+                ]
+            )
+            statements = []
+
+            async def fetch(query, *args):
+                return next(batches)
+
+            async def execute(query, *args):
+                statements.append((query, args))
+                return "INSERT 0 1"
+
+            async def fetchval(query, name, start, end):
+                # Stand-in for format('%I ... %L') on the server.
+                return (
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF "
+                    f"product_contents_archive FOR VALUES FROM "
+                    f"('{start.isoformat()}') TO ('{end.isoformat()}');"
+                )
+
+            connection.fetch = fetch
+            connection.execute = execute
+            connection.fetchval = fetchval
+            mock_get_pool.return_value = _Pool(connection)
+
+            with patch.object(product_content, "_archive_partitions", set()):
+                moved = await product_content.archive_used_contents(batch_size=2)
+
+            self.assertEqual(moved, 3)
+            ddl = [query for query, _ in statements if "PARTITION OF" in query]
+            self.assertEqual(len(ddl), 2)
+            self.assertIn("product_contents_archive_202503", ddl[0])
+            self.assertIn("TO ('2025-05-01T00:00:00+00:00')", ddl[1])
+            locks = [query for query, _ in statements if "advisory_xact_lock" in query]
+            self.assertEqual(len(locks), 1)
+            moves = [
+                args
+                for query, args in statements
+                if query == product_content.ARCHIVE_CONTENTS.sql
+            ]
+            self.assertEqual(moves, [([1, 2],), ([3],)])
+
+        asyncio.run(run_test())
+
+
+class TestReservations(unittest.TestCase):
+    def test_reserve_notifies_only_reserved_products(self) -> None:
+        async def run_test():
+            connection = MagicMock()
+            fetched = []
+            notified = []
+
+            async def fetch(query, *args):
+                fetched.append((query, args))
+                return [
+                    {"product_id": 1, "quantity": 2, "reserved": 2},
+                    {"product_id": 4, "quantity": 1, "reserved": 0},
+                ]
+
+            async def execute(query, *args):
+                notified.append(args[1])
+                return "SELECT 1"
+
+            connection.fetch = fetch
+            connection.execute = execute
+
+            reservations = await product_content.reserve_order_contents(
+                connection, "order-1", "until"
+            )
+
+            self.assertEqual(
+                fetched,
+                [(product_content.RESERVE_ORDER_CONTENTS.sql, ("order-1", "until"))],
+            )
+            self.assertEqual([r["reserved"] for r in reservations], [2, 0])
+            self.assertEqual(notified, ["product:1"])
+
+        asyncio.run(run_test())
+
+    def test_release_returns_released_count(self) -> None:
+        async def run_test():
+            connection = MagicMock()
+            notified = []
+
+            async def fetch(query, *args):
+                self.assertEqual(query, product_content.RELEASE_ORDER_RESERVATIONS.sql)
+                return [
+                    {"product_id": 1, "released": 2},
+                    {"product_id": 3, "released": 1},
+                ]
+
+            async def execute(query, *args):
+                notified.append(args[1])
+                return "SELECT 1"
+
+            connection.fetch = fetch
+            connection.execute = execute
+
+            released = await product_content.release_order_reservations(
+                connection, "order-1"
+            )
+
+            self.assertEqual(released, 3)
+            self.assertEqual(notified, ["product:1", "product:3"])
+
+        asyncio.run(run_test())
+
+    @patch("src.services.product_content.get_pool")
+    def test_marking_reserved_content_keeps_stock(self, mock_get_pool) -> None:
+        async def run_test():
+            connection = MagicMock()
+            statements = []
+
+            async def fetchrow(query, *args):
+                return {"product_id": 5, "is_used": False, "reserved_by_order_id": "o"}
+
+            async def execute(query, *args):
+                statements.append(query)
+                return "UPDATE 1"
+
+            connection.fetchrow = fetchrow
+            connection.execute = execute
+            mock_get_pool.return_value = _Pool(connection)
+
+            self.assertTrue(await product_content.mark_content_as_used(9, "o"))
+            self.assertNotIn(product_content.ADJUST_STOCK.sql, statements)
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import asyncio
+from unittest.mock import patch
+
+from src.services import queries
+
+
+class TestQueryCatalog(unittest.TestCase):
+    @patch.dict(queries._catalog, {}, clear=True)
+    @patch.dict(queries._stats, {}, clear=True)
+    def test_named_query_records_stats(self) -> None:
+        async def run_test():
+            query = queries.define_query("demo.list", "SELECT 1;")
+            self.assertIs(queries.define_query("demo.list", "SELECT 1;"), query)
+            self.assertIs(queries.get_query("demo.list"), query)
+            with self.assertRaises(ValueError):
+                queries.define_query("demo.list", "SELECT 2;")
+
+            class Executor:
+                async def fetch(self, sql, *args):
+                    return [{"n": 1}, {"n": 2}]
+
+                async def execute(self, sql, *args):
+                    return "UPDATE 3"
+
+                async def fetchrow(self, sql, *args):
+                    raise RuntimeError("boom")
+
+            executor = Executor()
+            rows = await query.fetch(executor)
+            self.assertEqual(len(rows), 2)
+            await query.execute(executor)
+            with self.assertRaises(RuntimeError):
+                await query.fetchrow(executor)
+
+            stats = queries.query_stats()["demo.list"]
+            self.assertEqual(stats["calls"], 3)
+            self.assertEqual(stats["rows"], 5)
+            self.assertEqual(stats["errors"], 1)
+            self.assertEqual(stats["count"], 3)
+
+        asyncio.run(run_test())
+
+    @patch.dict(queries._catalog, {}, clear=True)
+    @patch.dict(queries._stats, {}, clear=True)
+    def test_pool_runs_queries_by_name(self) -> None:
+        from src.services.postgres import PostgresPool
+
+        async def run_test():
+            query = queries.define_query("demo.by_name", "SELECT $1::int AS n;")
+            pool = PostgresPool("postgresql://localhost/test")
+            calls = []
+
+            async def fetchrow(sql, *args, **kwargs):
+                calls.append((sql, args, kwargs))
+                return {"n": args[0]}
+
+            pool.fetchrow = fetchrow
+
+            row = await pool.fetchrow_named("demo.by_name", 7, readonly=True)
+            self.assertEqual(row, {"n": 7})
+            self.assertEqual(calls, [(query, (7,), {"readonly": True})])
+            with self.assertRaises(KeyError):
+                await pool.fetch_named("demo.missing")
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
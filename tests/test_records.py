@@ -0,0 +1,51 @@
+import unittest
+import asyncio
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+from src.services.queries import define_query
+from src.services.records import Interner, RowMapper
+
+
+@dataclass(slots=True)
+class _Item:
+    id: int
+    name: str
+
+
+class TestRowMapper(unittest.TestCase):
+    def test_positional_mapping_and_fetch(self) -> None:
+        async def run_test():
+            mapper = RowMapper.positional(_Item)
+            executor = MagicMock()
+
+            async def fetch(query, *args, **kwargs):
+                return [(1, "a"), (2, "b")]
+
+            async def fetchrow(query, *args, **kwargs):
+                return None
+
+            executor.fetch = fetch
+            executor.fetchrow = fetchrow
+
+            query = define_query("test.records_items", "SELECT id, name FROM items;")
+            items = await mapper.fetch(executor, query)
+            self.assertEqual(items, [_Item(1, "a"), _Item(2, "b")])
+            self.assertIsNone(await mapper.fetchrow(executor, "SELECT 1;"))
+
+        asyncio.run(run_test())
+
+
+class TestInterner(unittest.TestCase):
+    def test_same_values_share_instance(self) -> None:
+        interner = Interner(_Item, max_size=2)
+        first = interner.get(1, "a")
+        self.assertIs(first, interner.get(1, "a"))
+        # An edited row gets its own instance.
+        self.assertIsNot(first, interner.get(1, "b"))
+        interner.get(2, "c")
+        self.assertEqual(len(interner), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+
+from src.bot import keyboards
+from src.bot.render_cache import RenderCache, RenderedView
+from src.services.catalog import Product
+
+
+class TestRenderCache(unittest.TestCase):
+    @patch("src.bot.render_cache.catalog_version")
+    def test_entries_follow_catalog_version(self, mock_version) -> None:
+        cache = RenderCache(max_entries=2)
+        view = RenderedView(text="<b>x</b>", keyboard=None, product_ids=(1, 2))
+
+        mock_version.return_value = 0
+        cache.put(("products", None), view)
+        self.assertIsNone(cache.get(("products", None)))
+
+        mock_version.return_value = 3
+        cache.put(("products", None), view)
+        self.assertIs(cache.get(("products", None)), view)
+
+        cache.put(("stock",), view)
+        cache.put(("products", "games"), view)
+        # Oldest entry evicted once the LRU is full.
+        self.assertIsNone(cache.get(("products", None)))
+
+        mock_version.return_value = 4
+        self.assertIsNone(cache.get(("stock",)))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class TestCachedKeyboards(unittest.TestCase):
+    def test_product_keyboard_is_shared(self) -> None:
+        product = Product(
+            id=7,
+            code="P7",
+            name="Produk",
+            description=None,
+            price_cents=150000,
+            stock=1,
+            sold_count=0,
+        )
+        first = keyboards.product_inline_keyboard(product, 1)
+        self.assertIs(first, keyboards.product_inline_keyboard(product, 3))
+        self.assertIsNot(first, keyboards.product_inline_keyboard(product, 0))
+        self.assertEqual(product.formatted_price, "Rp 1.500,00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from src.services import schema
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    @patch.object(schema, "_pending", [])
+    @patch.dict(schema._registry, {}, clear=True)
+    @patch("src.services.schema.get_pool")
+    def test_apply_schema_runs_once(self, mock_get_pool):
+        async def run_test():
+            executed = []
+            mock_pool = MagicMock()
+            mock_conn = MagicMock()
+
+            async def async_magic(*args, **kwargs):
+                return mock_conn
+
+            mock_pool.acquire.return_value.__aenter__ = async_magic
+            mock_conn.transaction.return_value.__aenter__ = async_magic
+
+            async def execute(query, *args):
+                executed.append(query)
+                return "OK"
+
+            mock_conn.execute = execute
+
+            async def get_pool():
+                return mock_pool
+
+            mock_get_pool.return_value = await get_pool()
+
+            schema.register_schema("alpha", "CREATE TABLE a ();")
+            schema.register_schema("beta", "CREATE TABLE b ();", "CREATE INDEX b_idx;")
+            # Registering the same DDL twice is harmless.
+            schema.register_schema("alpha", "CREATE TABLE a ();")
+
+            applied = await schema.apply_schema()
+            self.assertEqual(applied, ["alpha", "beta"])
+            self.assertIn("pg_advisory_xact_lock", executed[0])
+            self.assertEqual(
+                executed[1:],
+                ["CREATE TABLE a ();", "CREATE TABLE b ();", "CREATE INDEX b_idx;"],
+            )
+
+            executed.clear()
+            await schema.ensure_schema()
+            self.assertEqual(executed, [])
+
+            with self.assertRaises(ValueError):
+                schema.register_schema("alpha", "CREATE TABLE other ();")
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
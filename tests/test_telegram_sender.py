@@ -0,0 +1,36 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock
+
+from src.services.telegram_sender import TelegramSender
+
+
+class TestTelegramSender(unittest.TestCase):
+    def test_fan_out_is_concurrent_and_isolates_failures(self) -> None:
+        async def run_test():
+            bot = MagicMock()
+            in_flight = 0
+            peak = 0
+
+            async def send_message(chat_id, text, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                if chat_id == 3:
+                    raise RuntimeError("Forbidden: bot was blocked by the user")
+
+            bot.send_message = send_message
+            sender = TelegramSender(bot, max_concurrency=2)
+
+            results = await sender.fan_out([1, 2, 3, 4, 2], "Pembayaran berhasil")
+
+            self.assertEqual(results, {1: True, 2: True, 3: False, 4: True})
+            self.assertEqual(peak, 2)
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
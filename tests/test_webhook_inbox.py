@@ -0,0 +1,191 @@
+import unittest
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.services import webhook_inbox
+from src.services.payment import PaymentError
+from src.services.webhook_inbox import InboxEvent
+from src.webhooks import pakasir
+
+
+class TestPakasirWebhook(unittest.TestCase):
+    @patch("src.webhooks.pakasir.get_settings")
+    @patch("src.webhooks.pakasir.enqueue_webhook", new_callable=AsyncMock)
+    def test_handler_stores_payload_and_acks(self, mock_enqueue, mock_settings) -> None:
+        async def run_test():
+            mock_settings.return_value.pakasir_webhook_secret = None
+            mock_enqueue.return_value = 42
+            payload = {"order_id": "tg1-abc", "status": "completed", "amount": 1000}
+            request = MagicMock()
+            request.read = AsyncMock(return_value=json.dumps(payload).encode())
+            request.headers = {}
+            workers = MagicMock()
+            workers.processed.seen = AsyncMock(return_value=False)
+
+            response = await pakasir.handle_pakasir_webhook(request, workers)
+
+            self.assertEqual(response.status, 200)
+            mock_enqueue.assert_awaited_once_with("pakasir", payload)
+            workers.wake.assert_called_once()
+
+        asyncio.run(run_test())
+
+    @patch("src.webhooks.pakasir.get_settings")
+    @patch("src.webhooks.pakasir.enqueue_webhook", new_callable=AsyncMock)
+    def test_non_string_status_is_rejected(self, mock_enqueue, mock_settings) -> None:
+        async def run_test():
+            mock_settings.return_value.pakasir_webhook_secret = None
+            payload = {"order_id": "tg1-abc", "status": ["completed"]}
+            request = MagicMock()
+            request.read = AsyncMock(return_value=json.dumps(payload).encode())
+            request.headers = {}
+
+            with self.assertRaises(pakasir.web.HTTPBadRequest):
+                await pakasir.handle_pakasir_webhook(request, MagicMock())
+            mock_enqueue.assert_not_awaited()
+
+        asyncio.run(run_test())
+
+
+class TestProcessedWebhooks(unittest.TestCase):
+    @patch("src.webhooks.pakasir.mark_webhook_processed", new_callable=AsyncMock)
+    @patch("src.webhooks.pakasir.is_webhook_processed", new_callable=AsyncMock)
+    def test_lru_answers_before_table(self, mock_exists, mock_mark) -> None:
+        async def run_test():
+            mock_exists.return_value = False
+            processed = pakasir.ProcessedWebhooks(max_entries=1)
+
+            self.assertFalse(await processed.seen("tg1", "completed"))
+            await processed.remember("tg1", "completed")
+            self.assertTrue(await processed.seen("tg1", "completed"))
+            self.assertEqual(mock_exists.await_count, 1)
+
+            # Evicted from the LRU, still found in processed_webhooks.
+            await processed.remember("tg2", "completed")
+            mock_exists.return_value = True
+            self.assertTrue(await processed.seen("tg1", "completed"))
+            self.assertEqual(mock_exists.await_count, 2)
+
+            # Non-final statuses are never deduplicated.
+            self.assertFalse(await processed.seen("tg3", "pending"))
+            self.assertEqual(mock_mark.await_count, 2)
+
+        asyncio.run(run_test())
+
+
+class TestPakasirWebhookWorkers(unittest.TestCase):
+    def _workers(self, service, seen=False):
+        telemetry = MagicMock()
+        telemetry.increment = AsyncMock()
+        workers = pakasir.PakasirWebhookWorkers(service, telemetry, max_attempts=3)
+        workers.processed = MagicMock()
+        workers.processed.seen = AsyncMock(return_value=seen)
+        workers.processed.remember = AsyncMock()
+        return workers
+
+    def _event(self, attempts=1, status="completed"):
+        payload = {"order_id": "tg1-abc", "status": status, "amount": 1500}
+        return InboxEvent(id=7, payload=payload, attempts=attempts)
+
+    @patch("src.webhooks.pakasir.complete_webhook", new_callable=AsyncMock)
+    @patch("src.webhooks.pakasir.claim_webhook", new_callable=AsyncMock)
+    def test_processes_claimed_event(self, mock_claim, mock_complete) -> None:
+        async def run_test():
+            mock_claim.side_effect = [self._event(), None]
+            service = MagicMock()
+            service.mark_payment_completed = AsyncMock()
+            workers = self._workers(service)
+
+            self.assertTrue(await workers.run_once())
+            self.assertFalse(await workers.run_once())
+
+            service.mark_payment_completed.assert_awaited_once_with("tg1-abc", 150000)
+            workers.processed.remember.assert_awaited_once_with("tg1-abc", "completed")
+            mock_complete.assert_awaited_once_with(7)
+
+        asyncio.run(run_test())
+
+    @patch("src.webhooks.pakasir.complete_webhook", new_callable=AsyncMock)
+    @patch("src.webhooks.pakasir.claim_webhook", new_callable=AsyncMock)
+    def test_queued_duplicate_skips_payment(self, mock_claim, mock_complete) -> None:
+        async def run_test():
+            mock_claim.return_value = self._event()
+            service = MagicMock()
+            service.mark_payment_completed = AsyncMock()
+            workers = self._workers(service, seen=True)
+
+            self.assertTrue(await workers.run_once())
+
+            service.mark_payment_completed.assert_not_awaited()
+            mock_complete.assert_awaited_once_with(7)
+
+        asyncio.run(run_test())
+
+    @patch("src.webhooks.pakasir.fail_webhook", new_callable=AsyncMock)
+    @patch("src.webhooks.pakasir.claim_webhook", new_callable=AsyncMock)
+    def test_payment_error_is_final_and_others_retry(
+        self, mock_claim, mock_fail
+    ) -> None:
+        async def run_test():
+            service = MagicMock()
+            service.mark_payment_completed = AsyncMock(
+                side_effect=[
+                    PaymentError("Nominal pembayaran tidak cocok."),
+                    RuntimeError("telegram timeout"),
+                    RuntimeError("telegram timeout"),
+                ]
+            )
+            workers = self._workers(service)
+            mock_claim.side_effect = [
+                self._event(),
+                self._event(attempts=2),
+                self._event(attempts=3),
+            ]
+
+            for _ in range(3):
+                await workers.run_once()
+
+            retries = [
+                call.kwargs["retry_in_seconds"] for call in mock_fail.await_args_list
+            ]
+            self.assertEqual(retries, [None, 4, None])
+
+        asyncio.run(run_test())
+
+
+class TestWebhookRetention(unittest.TestCase):
+    @patch("src.services.schema._pending", [])
+    @patch("src.services.webhook_inbox.get_pool")
+    def test_purge_batches_and_keeps_redelivery_window(self, mock_get_pool) -> None:
+        async def run_test():
+            pool = MagicMock()
+            calls = []
+            results = {
+                webhook_inbox.PURGE_FINISHED.sql: ["DELETE 2", "DELETE 1"],
+                webhook_inbox.PURGE_PROCESSED.sql: ["DELETE 0"],
+            }
+
+            async def execute(query, *args):
+                calls.append((query, args))
+                return results[query].pop(0)
+
+            pool.execute = execute
+            mock_get_pool.return_value = pool
+
+            purged = await webhook_inbox.purge_webhook_history(
+                inbox_retention_days=14, processed_retention_days=1, batch_size=2
+            )
+
+            self.assertEqual(purged, {"inbox": 3, "processed": 0})
+            self.assertEqual(len(calls), 3)
+            processed_age = calls[-1][1][0]
+            self.assertEqual(
+                processed_age.days, webhook_inbox.MIN_PROCESSED_RETENTION_DAYS
+            )
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()